@@ -0,0 +1,96 @@
+"""
+Microbenchmark for the per-step system database overhead.
+
+Runs a workflow made of trivial steps, so nearly all of the time is spent
+checking and recording step outputs in the system database, and reports the
+mean overhead per step. Also times the raw check/record calls on their own.
+
+Usage (requires a reachable Postgres, configured like the test suite):
+
+    python benchmarks/bench_sys_db.py [--steps 1000] [--rounds 5]
+"""
+
+import argparse
+import os
+import time
+import uuid
+
+from dbos import DBOS, ConfigFile, SetWorkflowID
+
+
+def bench_config() -> ConfigFile:
+    return {
+        "name": "bench-sys-db",
+        "language": "python",
+        "database": {
+            "hostname": os.environ.get("PGHOST", "localhost"),
+            "port": int(os.environ.get("PGPORT", "5432")),
+            "username": os.environ.get("PGUSER", "postgres"),
+            "password": os.environ.get("PGPASSWORD", "dbos"),
+            "app_db_name": "dbos_bench_sys_db",
+        },
+        "runtimeConfig": {
+            "start": ["python3 main.py"],
+        },
+        "telemetry": {},
+        "env": {},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    dbos = DBOS(config=bench_config())
+
+    @DBOS.step()
+    def noop_step(i: int) -> int:
+        return i
+
+    @DBOS.workflow()
+    def many_steps(n: int) -> None:
+        for i in range(n):
+            noop_step(i)
+
+    DBOS.launch()
+    sys_db = dbos._sys_db
+
+    # Warm up pools, compiled statement caches and prepared statements
+    many_steps(50)
+
+    step_us = []
+    for _ in range(args.rounds):
+        with SetWorkflowID(str(uuid.uuid4())):
+            start = time.perf_counter()
+            many_steps(args.steps)
+            step_us.append((time.perf_counter() - start) / args.steps * 1e6)
+
+    op_us = []
+    wfid = str(uuid.uuid4())
+    with SetWorkflowID(wfid):
+        many_steps(0)
+    sys_db.wait_for_buffer_flush()
+    for r in range(args.rounds):
+        start = time.perf_counter()
+        for i in range(args.steps):
+            function_id = r * args.steps + i
+            sys_db.check_operation_execution(wfid, function_id)
+            sys_db.record_operation_result(
+                {
+                    "workflow_uuid": wfid,
+                    "function_id": function_id,
+                    "output": "null",
+                    "error": None,
+                }
+            )
+        op_us.append((time.perf_counter() - start) / args.steps * 1e6)
+
+    print(f"step overhead:       {min(step_us):8.1f} us/step (best of {args.rounds})")
+    print(f"check+record calls:  {min(op_us):8.1f} us/op   (best of {args.rounds})")
+    DBOS.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,9 @@ from functools import partial
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import TYPE_CHECKING, Any, List, TypedDict
 
+from ._db_pool import pool_usage
 from ._logger import dbos_logger
+from ._metrics import Gauge, dbos_metrics
 from ._recovery import recover_pending_workflows
 
 if TYPE_CHECKING:
@@ -17,6 +19,8 @@ _health_check_path = "/dbos-healthz"
 _workflow_recovery_path = "/dbos-workflow-recovery"
 _deactivate_path = "/deactivate"
 _workflow_queues_metadata_path = "/dbos-workflow-queues-metadata"
+_metrics_path = "/dbos-metrics"
+_perf_path = "/dbos-perf"
 # /workflows/:workflow_id/cancel
 # /workflows/:workflow_id/resume
 # /workflows/:workflow_id/restart
@@ -85,6 +89,17 @@ class AdminRequestHandler(BaseHTTPRequestHandler):
             self.send_response(200)
             self._end_headers()
             self.wfile.write(json.dumps(queue_metadata_array).encode("utf-8"))
+        elif self.path == _perf_path:
+            utilization = self.dbos._executor.utilization()
+            self.send_response(200)
+            self._end_headers()
+            self.wfile.write(json.dumps(utilization).encode("utf-8"))
+        elif self.path == _metrics_path:
+            body = dbos_metrics.render_prometheus(self._gauges())
+            self.send_response(200)
+            self.send_header("Content-type", "text/plain; version=0.0.4; charset=utf-8")
+            self.end_headers()
+            self.wfile.write(body.encode("utf-8"))
         else:
             self.send_response(404)
             self._end_headers()
@@ -128,6 +143,89 @@ class AdminRequestHandler(BaseHTTPRequestHandler):
                 self.send_response(404)
                 self._end_headers()
 
+    def _gauges(self) -> List[Gauge]:
+        # Sampled on each request, so only the request pays for them
+        gauges: List[Gauge] = []
+        try:
+            queue_depths = self.dbos._sys_db.get_queue_depths()
+            gauges.append(
+                Gauge(
+                    "dbos_queue_depth",
+                    "Workflows in a queue that have not completed, including those running",
+                    ["queue"],
+                    {(name,): depth for name, depth in queue_depths.items()},
+                )
+            )
+        except Exception as e:
+            dbos_logger.warning(f"Error reading queue depths: {e}")
+        buffer_sizes = self.dbos._sys_db.buffer_sizes()
+        gauges.append(
+            Gauge(
+                "dbos_workflow_buffer_entries",
+                "Workflow statuses and inputs buffered for writing to the system database",
+                ["buffer"],
+                {
+                    ("statuses",): buffer_sizes["statuses"],
+                    ("inputs",): buffer_sizes["inputs"],
+                },
+            )
+        )
+        gauges.append(
+            Gauge(
+                "dbos_workflow_buffer_bytes",
+                "Approximate size of the buffered workflow statuses and inputs",
+                values={(): buffer_sizes["bytes"]},
+            )
+        )
+        executor = self.dbos._executor_field
+        if executor is not None:
+            gauges.append(
+                Gauge(
+                    "dbos_executor_threads",
+                    "Threads started by the workflow thread pool",
+                    values={(): len(executor._threads)},
+                )
+            )
+            gauges.append(
+                Gauge(
+                    "dbos_executor_queued_tasks",
+                    "Tasks submitted to the workflow thread pool and waiting for a thread",
+                    values={(): executor._work_queue.qsize()},
+                )
+            )
+            gauges.append(
+                Gauge(
+                    "dbos_executor_active_tasks",
+                    "Tasks running on the workflow thread pool, excluding background tasks",
+                    values={(): executor.active_tasks()},
+                )
+            )
+            gauges.append(
+                Gauge(
+                    "dbos_executor_utilization",
+                    "Fraction of the workflow thread pool's thread time spent running tasks, over a sliding window",
+                    values={(): executor.utilization()["utilization"]},
+                )
+            )
+        usage = pool_usage()
+        gauges.append(
+            Gauge(
+                "dbos_db_pool_checked_out",
+                "Database connections currently checked out from a pool",
+                ["pool"],
+                {(pool,): checked_out for pool, (checked_out, _) in usage.items()},
+            )
+        )
+        gauges.append(
+            Gauge(
+                "dbos_db_pool_capacity",
+                "Connections a pool can open, including overflow",
+                ["pool"],
+                {(pool,): capacity for pool, (_, capacity) in usage.items()},
+            )
+        )
+        return gauges
+
     def log_message(self, format: str, *args: Any) -> None:
         return  # Disable admin server request logging
 
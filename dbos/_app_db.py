@@ -1,10 +1,14 @@
-from typing import Optional, TypedDict
+import asyncio
+import threading
+from typing import Dict, Optional, Tuple, TypedDict
 
 import sqlalchemy as sa
 import sqlalchemy.dialects.postgresql as pg
 from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import Session, sessionmaker
 
+from ._db_pool import create_pooled_async_engine, create_pooled_engine
 from ._dbos_config import ConfigFile
 from ._error import DBOSWorkflowConflictIDError
 from ._schemas.application_database import ApplicationSchema
@@ -27,9 +31,17 @@ class RecordedResult(TypedDict):
 
 class ApplicationDatabase:
 
-    def __init__(self, config: ConfigFile):
+    def __init__(self, config: ConfigFile, engine: Optional[sa.Engine] = None):
         self.config = config
 
+        if engine is not None:
+            # The system tables are colocated in this database, so share the system database's pool
+            self.engine = engine
+            self.sessionmaker = sessionmaker(bind=self.engine)
+            self._init_async_engines()
+            self._create_schema()
+            return
+
         app_db_name = config["database"]["app_db_name"]
 
         # If the application database does not already exist, create it
@@ -60,11 +72,24 @@ class ApplicationDatabase:
             port=config["database"]["port"],
             database=app_db_name,
         )
-        self.engine = sa.create_engine(
-            app_db_url, pool_size=20, max_overflow=5, pool_timeout=30
+        self.engine = create_pooled_engine(
+            app_db_url,
+            config["database"].get("app_db_pool"),
+            "application",
+            transaction_pooling=config["database"].get("pgbouncer_transaction_mode")
+            or False,
         )
         self.sessionmaker = sessionmaker(bind=self.engine)
+        self._init_async_engines()
+        self._create_schema()
+
+    def _init_async_engines(self) -> None:
+        # Async engines pool connections that are bound to the event loop they were created on,
+        # so keep one engine per running loop.
+        self._async_engines: Dict[asyncio.AbstractEventLoop, AsyncEngine] = {}
+        self._async_engines_lock = threading.Lock()
 
+    def _create_schema(self) -> None:
         # Create the dbos schema and transaction_outputs table in the application database
         with self.engine.begin() as conn:
             schema_creation_query = sa.text(
@@ -75,6 +100,70 @@ class ApplicationDatabase:
 
     def destroy(self) -> None:
         self.engine.dispose()
+        with self._async_engines_lock:
+            for async_engine in self._async_engines.values():
+                # The owning event loops may be gone, so drop the pools without awaiting their connections
+                async_engine.sync_engine.dispose(close=False)
+            self._async_engines.clear()
+
+    def _get_async_engine(self) -> AsyncEngine:
+        loop = asyncio.get_running_loop()
+        with self._async_engines_lock:
+            async_engine = self._async_engines.get(loop)
+            if async_engine is None:
+                # Release the engines of event loops that have since been closed
+                for closed_loop in [l for l in self._async_engines if l.is_closed()]:
+                    self._async_engines.pop(closed_loop).sync_engine.dispose(
+                        close=False
+                    )
+                async_engine = create_pooled_async_engine(
+                    self.engine.url,
+                    self.config["database"].get("app_db_pool"),
+                    "application",
+                    transaction_pooling=self.config["database"].get(
+                        "pgbouncer_transaction_mode"
+                    )
+                    or False,
+                )
+                self._async_engines[loop] = async_engine
+            return async_engine
+
+    def async_session(self) -> AsyncSession:
+        return AsyncSession(bind=self._get_async_engine())
+
+    async def dispose_async_engine(self) -> None:
+        """Close the connections pooled for the running event loop, before the loop is closed."""
+        loop = asyncio.get_running_loop()
+        with self._async_engines_lock:
+            async_engine = self._async_engines.pop(loop, None)
+        if async_engine is not None:
+            await async_engine.dispose()
+
+    @staticmethod
+    def _insert_transaction_output(
+        output: TransactionResultInternal, result: Optional[str], error: Optional[str]
+    ) -> sa.Insert:
+        return pg.insert(ApplicationSchema.transaction_outputs).values(
+            workflow_uuid=output["workflow_uuid"],
+            function_id=output["function_id"],
+            output=result,
+            error=error,
+            txn_id=sa.text("(select pg_current_xact_id_if_assigned()::text)"),
+            txn_snapshot=output["txn_snapshot"],
+            executor_id=(output["executor_id"] if output["executor_id"] else None),
+        )
+
+    @staticmethod
+    def _select_transaction_output(
+        workflow_uuid: str, function_id: int
+    ) -> "sa.Select[Tuple[Optional[str], Optional[str]]]":
+        return sa.select(
+            ApplicationSchema.transaction_outputs.c.output,
+            ApplicationSchema.transaction_outputs.c.error,
+        ).where(
+            ApplicationSchema.transaction_outputs.c.workflow_uuid == workflow_uuid,
+            ApplicationSchema.transaction_outputs.c.function_id == function_id,
+        )
 
     @staticmethod
     def record_transaction_output(
@@ -82,16 +171,23 @@ class ApplicationDatabase:
     ) -> None:
         try:
             session.execute(
-                pg.insert(ApplicationSchema.transaction_outputs).values(
-                    workflow_uuid=output["workflow_uuid"],
-                    function_id=output["function_id"],
-                    output=output["output"],
-                    error=None,
-                    txn_id=sa.text("(select pg_current_xact_id_if_assigned()::text)"),
-                    txn_snapshot=output["txn_snapshot"],
-                    executor_id=(
-                        output["executor_id"] if output["executor_id"] else None
-                    ),
+                ApplicationDatabase._insert_transaction_output(
+                    output, output["output"], None
+                )
+            )
+        except DBAPIError as dbapi_error:
+            if dbapi_error.orig.sqlstate == "23505":  # type: ignore
+                raise DBOSWorkflowConflictIDError(output["workflow_uuid"])
+            raise
+
+    @staticmethod
+    async def record_transaction_output_async(
+        session: AsyncSession, output: TransactionResultInternal
+    ) -> None:
+        try:
+            await session.execute(
+                ApplicationDatabase._insert_transaction_output(
+                    output, output["output"], None
                 )
             )
         except DBAPIError as dbapi_error:
@@ -103,18 +199,23 @@ class ApplicationDatabase:
         try:
             with self.engine.begin() as conn:
                 conn.execute(
-                    pg.insert(ApplicationSchema.transaction_outputs).values(
-                        workflow_uuid=output["workflow_uuid"],
-                        function_id=output["function_id"],
-                        output=None,
-                        error=output["error"],
-                        txn_id=sa.text(
-                            "(select pg_current_xact_id_if_assigned()::text)"
-                        ),
-                        txn_snapshot=output["txn_snapshot"],
-                        executor_id=(
-                            output["executor_id"] if output["executor_id"] else None
-                        ),
+                    ApplicationDatabase._insert_transaction_output(
+                        output, None, output["error"]
+                    )
+                )
+        except DBAPIError as dbapi_error:
+            if dbapi_error.orig.sqlstate == "23505":  # type: ignore
+                raise DBOSWorkflowConflictIDError(output["workflow_uuid"])
+            raise
+
+    async def record_transaction_error_async(
+        self, output: TransactionResultInternal
+    ) -> None:
+        try:
+            async with self._get_async_engine().begin() as conn:
+                await conn.execute(
+                    ApplicationDatabase._insert_transaction_output(
+                        output, None, output["error"]
                     )
                 )
         except DBAPIError as dbapi_error:
@@ -127,12 +228,25 @@ class ApplicationDatabase:
         session: Session, workflow_uuid: str, function_id: int
     ) -> Optional[RecordedResult]:
         rows = session.execute(
-            sa.select(
-                ApplicationSchema.transaction_outputs.c.output,
-                ApplicationSchema.transaction_outputs.c.error,
-            ).where(
-                ApplicationSchema.transaction_outputs.c.workflow_uuid == workflow_uuid,
-                ApplicationSchema.transaction_outputs.c.function_id == function_id,
+            ApplicationDatabase._select_transaction_output(workflow_uuid, function_id)
+        ).all()
+        if len(rows) == 0:
+            return None
+        result: RecordedResult = {
+            "output": rows[0][0],
+            "error": rows[0][1],
+        }
+        return result
+
+    @staticmethod
+    async def check_transaction_execution_async(
+        session: AsyncSession, workflow_uuid: str, function_id: int
+    ) -> Optional[RecordedResult]:
+        rows = (
+            await session.execute(
+                ApplicationDatabase._select_transaction_output(
+                    workflow_uuid, function_id
+                )
             )
         ).all()
         if len(rows) == 0:
@@ -0,0 +1,122 @@
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Any, Dict, List
+
+# File header: magic, generation. Records: payload length, CRC32 of the payload, generation.
+# Resetting the file only bumps the header's generation, which invalidates every earlier record.
+_MAGIC = b"DBOSBUF1"
+_HEADER = struct.Struct("<8sQ")
+_RECORD = struct.Struct("<IIQ")
+_INITIAL_SIZE = 1 << 20
+
+
+class WorkflowBufferSpill:
+    """
+    An append-only, memory-mapped log of buffered workflow statuses and inputs.
+
+    Entries are appended before they are buffered and synced to disk in groups: a caller waiting
+    for its entry to be durable also syncs every entry appended before it. After a crash, the
+    entries are read back on startup so they can be flushed to the system database.
+    The file may only be used by one process at a time.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "a+b")
+        try:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._file.close()
+            raise
+        if os.path.getsize(path) < _INITIAL_SIZE:
+            self._file.truncate(_INITIAL_SIZE)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+        # _lock guards appends and the end of the log. _sync_lock serializes syncs and resizes.
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        magic, self._generation = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            self._generation = 0
+            self._write_header()
+        self._end = _HEADER.size
+        self._synced = self._end
+
+    @property
+    def size(self) -> int:
+        return self._end
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Read back the entries of the current generation, stopping at the first incomplete one."""
+        records: List[Dict[str, Any]] = []
+        with self._lock:
+            offset = _HEADER.size
+            while offset + _RECORD.size <= len(self._mmap):
+                length, checksum, generation = _RECORD.unpack_from(self._mmap, offset)
+                start = offset + _RECORD.size
+                if (
+                    length == 0
+                    or generation != self._generation
+                    or start + length > len(self._mmap)
+                ):
+                    break
+                payload = self._mmap[start : start + length]
+                if zlib.crc32(payload) != checksum:
+                    break
+                records.append(json.loads(payload))
+                offset = start + length
+            self._end = offset
+            self._synced = offset
+        return records
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Append an entry, returning the offset to pass to sync() to make it durable."""
+        payload = json.dumps(record).encode()
+        with self._lock:
+            end = self._end + _RECORD.size + len(payload)
+            if end > len(self._mmap):
+                with self._sync_lock:
+                    self._mmap.resize(max(end, 2 * len(self._mmap)))
+            _RECORD.pack_into(
+                self._mmap,
+                self._end,
+                len(payload),
+                zlib.crc32(payload),
+                self._generation,
+            )
+            self._mmap[self._end + _RECORD.size : end] = payload
+            self._end = end
+            return end
+
+    def sync(self, offset: int) -> None:
+        """Block until everything up to offset is on disk."""
+        with self._sync_lock:
+            if self._synced >= offset:
+                # Another caller's sync covered this entry
+                return
+            end = self._end
+            start = self._synced - self._synced % mmap.ALLOCATIONGRANULARITY
+            self._mmap.flush(start, end - start)
+            self._synced = end
+
+    def reset(self) -> None:
+        """Discard every entry, once they have all been flushed to the database."""
+        with self._lock, self._sync_lock:
+            self._generation += 1
+            self._write_header()
+            self._end = _HEADER.size
+            self._synced = self._end
+
+    def close(self) -> None:
+        with self._lock, self._sync_lock:
+            self._mmap.close()
+            self._file.close()
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, self._generation)
+        self._mmap.flush(0, mmap.PAGESIZE)
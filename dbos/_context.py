@@ -2,14 +2,16 @@ from __future__ import annotations
 
 import json
 import os
+import time
 import uuid
 from contextlib import AbstractContextManager
 from contextvars import ContextVar
 from enum import Enum
 from types import TracebackType
-from typing import List, Literal, Optional, Type, TypedDict
+from typing import TYPE_CHECKING, List, Literal, Optional, Tuple, Type, TypedDict, Union
 
 from opentelemetry.trace import Span, Status, StatusCode
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from dbos._utils import GlobalParams
@@ -18,6 +20,9 @@ from ._logger import dbos_logger
 from ._request import Request
 from ._tracer import dbos_tracer
 
+if TYPE_CHECKING:
+    from ._sys_db import WorkflowStatusInternal
+
 
 # These are used to tag OTel traces
 class OperationType(Enum):
@@ -64,10 +69,21 @@ class DBOSContext:
         self.parent_workflow_fid: int = -1
         self.workflow_id: str = ""
         self.function_id: int = -1
+        # Set when this execution created the workflow's status row, so nothing can be recorded yet
+        self.is_first_execution: bool = False
+        # With the system tables colocated, a single-transaction workflow's status and serialized
+        # inputs, left for its transaction to commit along with its output
+        self.temp_txn_workflow_record: Optional[Tuple[WorkflowStatusInternal, str]] = (
+            None
+        )
+        self.temp_txn_workflow_committed: bool = False
+        # When the workflow last checked the database for its cancellation
+        self.cancellation_checked_at: float = 0.0
 
         self.curr_step_function_id: int = -1
         self.curr_tx_function_id: int = -1
         self.sql_session: Optional[Session] = None
+        self.async_sql_session: Optional[AsyncSession] = None
         self.spans: list[Span] = []
 
         self.authenticated_user: Optional[str] = None
@@ -114,6 +130,7 @@ class DBOSContext:
             self.id_assigned_for_next_workflow = ""
         self.workflow_id = wfid
         self.function_id = 0
+        self.cancellation_checked_at = time.monotonic()
         if not is_temp_workflow:
             self._start_span(attributes)
 
@@ -122,6 +139,9 @@ class DBOSContext:
     ) -> None:
         self.workflow_id = ""
         self.function_id = -1
+        self.is_first_execution = False
+        self.temp_txn_workflow_record = None
+        self.temp_txn_workflow_committed = False
         if not is_temp_workflow:
             self._end_span(exc_value)
 
@@ -136,7 +156,7 @@ class DBOSContext:
         )
 
     def is_transaction(self) -> bool:
-        return self.sql_session is not None
+        return self.sql_session is not None or self.async_sql_session is not None
 
     def is_step(self) -> bool:
         return self.curr_step_function_id >= 0
@@ -154,14 +174,21 @@ class DBOSContext:
         self._end_span(exc_value)
 
     def start_transaction(
-        self, ses: Session, fid: int, attributes: TracedAttributes
+        self,
+        ses: Union[Session, AsyncSession],
+        fid: int,
+        attributes: TracedAttributes,
     ) -> None:
-        self.sql_session = ses
+        if isinstance(ses, AsyncSession):
+            self.async_sql_session = ses
+        else:
+            self.sql_session = ses
         self.curr_tx_function_id = fid
         self._start_span(attributes)
 
     def end_transaction(self, exc_value: Optional[BaseException]) -> None:
         self.sql_session = None
+        self.async_sql_session = None
         self.curr_tx_function_id = -1
         self._end_span(exc_value)
 
@@ -430,7 +457,9 @@ class EnterDBOSStep:
 
 
 class EnterDBOSTransaction:
-    def __init__(self, sqls: Session, attributes: TracedAttributes) -> None:
+    def __init__(
+        self, sqls: Union[Session, AsyncSession], attributes: TracedAttributes
+    ) -> None:
         self.sqls = sqls
         self.attributes = attributes
 
@@ -12,7 +12,10 @@ from typing import (
     Any,
     Callable,
     Coroutine,
+    Dict,
     Generic,
+    Iterator,
+    List,
     Optional,
     Tuple,
     TypeVar,
@@ -24,7 +27,7 @@ from typing import (
 from dbos._outcome import Immediate, NoResult, Outcome, Pending
 from dbos._utils import GlobalParams
 
-from ._app_db import ApplicationDatabase, TransactionResultInternal
+from ._app_db import ApplicationDatabase, RecordedResult, TransactionResultInternal
 
 if sys.version_info < (3, 10):
     from typing_extensions import ParamSpec
@@ -56,6 +59,7 @@ from ._error import (
     DBOSWorkflowConflictIDError,
     DBOSWorkflowFunctionNotFoundError,
 )
+from ._metrics import dbos_metrics
 from ._registrations import (
     DEFAULT_MAX_RECOVERY_ATTEMPTS,
     get_config_name,
@@ -73,6 +77,7 @@ from ._serialization import WorkflowInputs
 from ._sys_db import (
     GetEventWorkflowContext,
     OperationResultInternal,
+    SystemDatabase,
     WorkflowStatusInternal,
     WorkflowStatusString,
 )
@@ -88,6 +93,7 @@ if TYPE_CHECKING:
     )
 
 from sqlalchemy.exc import DBAPIError, InvalidRequestError
+from sqlalchemy.sql.expression import UpdateBase
 
 P = ParamSpec("P")  # A generic type for workflow parameters
 R = TypeVar("R", covariant=True)  # A generic type for workflow return values
@@ -136,23 +142,15 @@ class WorkflowHandlePolling(Generic[R]):
         return stat
 
 
-def _init_workflow(
-    dbos: "DBOS",
+def _new_workflow_status(
     ctx: DBOSContext,
-    inputs: WorkflowInputs,
+    wfid: str,
     wf_name: str,
     class_name: Optional[str],
     config_name: Optional[str],
-    temp_wf_type: Optional[str],
-    queue: Optional[str] = None,
-    max_recovery_attempts: int = DEFAULT_MAX_RECOVERY_ATTEMPTS,
+    queue: Optional[str],
 ) -> WorkflowStatusInternal:
-    wfid = (
-        ctx.workflow_id
-        if len(ctx.workflow_id) > 0
-        else ctx.id_assigned_for_next_workflow
-    )
-    status: WorkflowStatusInternal = {
+    return {
         "workflow_uuid": wfid,
         "status": (
             WorkflowStatusString.PENDING.value
@@ -181,6 +179,25 @@ def _init_workflow(
         "updated_at": None,
     }
 
+
+def _init_workflow(
+    dbos: "DBOS",
+    ctx: DBOSContext,
+    inputs: WorkflowInputs,
+    wf_name: str,
+    class_name: Optional[str],
+    config_name: Optional[str],
+    temp_wf_type: Optional[str],
+    queue: Optional[str] = None,
+    max_recovery_attempts: int = DEFAULT_MAX_RECOVERY_ATTEMPTS,
+) -> WorkflowStatusInternal:
+    wfid = (
+        ctx.workflow_id
+        if len(ctx.workflow_id) > 0
+        else ctx.id_assigned_for_next_workflow
+    )
+    status = _new_workflow_status(ctx, wfid, wf_name, class_name, config_name, queue)
+
     # If we have a class name, the first arg is the instance and do not serialize
     if class_name is not None:
         inputs = {"args": inputs["args"][1:], "kwargs": inputs["kwargs"]}
@@ -190,11 +207,19 @@ def _init_workflow(
         # Synchronously record the status and inputs for workflows and single-step workflows
         # We also have to do this for single-step workflows because of the foreign key constraint on the operation outputs table
         # TODO: Make this transactional (and with the queue step below)
-        wf_status = dbos._sys_db.insert_workflow_status(
+        wf_status, inserted = dbos._sys_db.insert_workflow_status(
             status, max_recovery_attempts=max_recovery_attempts
         )
+        # A workflow running right after creating its status row skips the per-operation
+        # lookups of recorded outputs. Recovered, resumed, and dequeued executions stay checked.
+        ctx.is_first_execution = (
+            inserted and wf_status == WorkflowStatusString.PENDING.value
+        )
         # TODO: Modify the inputs if they were changed by `update_workflow_inputs`
         dbos._sys_db.update_workflow_inputs(wfid, _serialization.serialize_args(inputs))
+    elif dbos._sys_db.colocated:
+        # The transaction of a single-transaction workflow records its status and inputs when it commits
+        ctx.temp_txn_workflow_record = (status, _serialization.serialize_args(inputs))
     else:
         # Buffer the inputs for single-transaction workflows, but don't buffer the status
         dbos._sys_db.buffer_workflow_inputs(wfid, _serialization.serialize_args(inputs))
@@ -209,16 +234,25 @@ def _init_workflow(
 def _get_wf_invoke_func(
     dbos: "DBOS",
     status: WorkflowStatusInternal,
+    relaxed_status: bool = False,
 ) -> Callable[[Callable[[], R]], R]:
+    dbos._registry.workflow_started(status["workflow_uuid"])
+
     def persist(func: Callable[[], R]) -> R:
+        dbos_metrics.workflows_started.inc(status["name"])
         try:
             output = func()
+            if _take_temp_txn_workflow_record(dbos):
+                # Its transaction already committed the workflow's final status
+                dbos_metrics.workflows_completed.inc(status["name"])
+                return output
             status["status"] = "SUCCESS"
             status["output"] = _serialization.serialize(output)
             if status["queue_name"] is not None:
                 queue = dbos._registry.queue_info_map[status["queue_name"]]
                 dbos._sys_db.remove_from_queue(status["workflow_uuid"], queue)
             dbos._sys_db.buffer_workflow_status(status)
+            dbos_metrics.workflows_completed.inc(status["name"])
             return output
         except DBOSWorkflowConflictIDError:
             # Retrieve the workflow handle and wait for the result.
@@ -231,17 +265,98 @@ def _get_wf_invoke_func(
         except DBOSWorkflowCancelledError as error:
             raise
         except Exception as error:
+            _take_temp_txn_workflow_record(dbos)
             status["status"] = "ERROR"
             status["error"] = _serialization.serialize_exception(error)
             if status["queue_name"] is not None:
                 queue = dbos._registry.queue_info_map[status["queue_name"]]
                 dbos._sys_db.remove_from_queue(status["workflow_uuid"], queue)
-            dbos._sys_db.update_workflow_status(status)
+            if relaxed_status:
+                # Recovery replays the workflow to the same error if it is lost before the flush
+                dbos._sys_db.buffer_workflow_status(status)
+            else:
+                dbos._sys_db.update_workflow_status(status)
+            dbos_metrics.workflows_failed.inc(status["name"])
             raise
+        finally:
+            dbos._registry.workflow_finished(status["workflow_uuid"])
 
     return persist
 
 
+def _temp_txn_workflow_statements(
+    ctx: DBOSContext, txn_output: TransactionResultInternal
+) -> List[Tuple[UpdateBase, Dict[str, Any]]]:
+    if ctx.temp_txn_workflow_record is None:
+        return []
+    status, inputs = ctx.temp_txn_workflow_record
+    final_status = status.copy()
+    final_status["status"] = WorkflowStatusString.SUCCESS.value
+    final_status["output"] = txn_output["output"]
+    return SystemDatabase.temp_txn_workflow_statements(final_status, inputs)
+
+
+def _commit_temp_txn_workflow_record(
+    ctx: DBOSContext, txn_output: TransactionResultInternal
+) -> None:
+    # Called once the transaction has committed, and with it the workflow's status and inputs
+    if ctx.temp_txn_workflow_record is not None:
+        status, _ = ctx.temp_txn_workflow_record
+        status["status"] = WorkflowStatusString.SUCCESS.value
+        status["output"] = txn_output["output"]
+        ctx.temp_txn_workflow_record = None
+        ctx.temp_txn_workflow_committed = True
+
+
+def _take_temp_txn_workflow_record(dbos: "DBOS") -> bool:
+    # Returns whether a colocated single-transaction workflow's transaction committed its
+    # status and inputs. If it did not (it replayed or failed), buffer the inputs instead.
+    ctx = get_local_dbos_context()
+    if ctx is None:
+        return False
+    if ctx.temp_txn_workflow_record is not None:
+        status, inputs = ctx.temp_txn_workflow_record
+        ctx.temp_txn_workflow_record = None
+        dbos._sys_db.buffer_workflow_inputs(status["workflow_uuid"], inputs)
+    return ctx.temp_txn_workflow_committed
+
+
+def _cancellation_check_due(dbos: "DBOS", ctx: DBOSContext) -> bool:
+    now = time.monotonic()
+    if now - ctx.cancellation_checked_at < dbos._cancellation_check_interval_secs:
+        return False
+    ctx.cancellation_checked_at = now
+    return True
+
+
+def _is_cancelled_in_db(dbos: "DBOS", ctx: DBOSContext) -> bool:
+    if dbos._sys_db.is_workflow_cancelled(ctx.workflow_id):
+        dbos._registry.cancel_workflow(ctx.workflow_id)
+        return True
+    return False
+
+
+def _check_cancelled_in_db(dbos: "DBOS", ctx: DBOSContext) -> bool:
+    # Cancellations by other processes normally arrive by notification. In case one was missed,
+    # check the database, at most once per interval so steps do not each pay for a query.
+    return _cancellation_check_due(dbos, ctx) and _is_cancelled_in_db(dbos, ctx)
+
+
+async def _check_cancelled_in_db_async(dbos: "DBOS", ctx: DBOSContext) -> bool:
+    # As _check_cancelled_in_db, running the query off the event loop
+    return _cancellation_check_due(dbos, ctx) and await asyncio.to_thread(
+        _is_cancelled_in_db, dbos, ctx
+    )
+
+
+async def _run_pending_workflow(dbos: "DBOS", result: Pending[R]) -> R:
+    try:
+        return await result()
+    finally:
+        # Async transactions pool connections per event loop, so release them before this loop closes
+        await dbos._app_db.dispose_async_engine()
+
+
 def _execute_workflow_wthread(
     dbos: "DBOS",
     status: WorkflowStatusInternal,
@@ -254,18 +369,22 @@ def _execute_workflow_wthread(
         "name": func.__name__,
         "operationType": OperationType.WORKFLOW.value,
     }
+    fi = get_func_info(func)
+    relaxed_status = fi is not None and fi.relaxed_status
     with DBOSContextSwap(ctx):
         with EnterDBOSWorkflow(attributes):
             try:
                 result = (
                     Outcome[R]
                     .make(functools.partial(func, *args, **kwargs))
-                    .then(_get_wf_invoke_func(dbos, status))
+                    .then(_get_wf_invoke_func(dbos, status, relaxed_status))
                 )
                 if isinstance(result, Immediate):
                     return cast(Immediate[R], result)()
                 else:
-                    return asyncio.run(cast(Pending[R], result)())
+                    return asyncio.run(
+                        _run_pending_workflow(dbos, cast(Pending[R], result))
+                    )
             except Exception:
                 dbos.logger.error(
                     f"Exception encountered in asynchronous workflow: {traceback.format_exc()}"
@@ -276,10 +395,20 @@ def _execute_workflow_wthread(
 def execute_workflow_by_id(
     dbos: "DBOS", workflow_id: str, startNew: bool = False
 ) -> "WorkflowHandle[Any]":
-    status = dbos._sys_db.get_workflow_status(workflow_id)
-    if not status:
+    record = dbos._sys_db.get_workflow_with_inputs(workflow_id)
+    return execute_workflow_from_record(dbos, workflow_id, record, startNew)
+
+
+def execute_workflow_from_record(
+    dbos: "DBOS",
+    workflow_id: str,
+    record: Optional[Tuple[WorkflowStatusInternal, Optional[WorkflowInputs]]],
+    startNew: bool = False,
+) -> "WorkflowHandle[Any]":
+    """Execute a workflow from its status and inputs, as fetched by `get_workflow(s)_with_inputs`."""
+    if not record:
         raise DBOSRecoveryError(workflow_id, "Workflow status not found")
-    inputs = dbos._sys_db.get_workflow_inputs(workflow_id)
+    status, inputs = record
     if not inputs:
         raise DBOSRecoveryError(workflow_id, "Workflow inputs not found")
     wf_func = dbos._registry.workflow_info_map.get(status["name"], None)
@@ -444,6 +573,52 @@ def start_workflow(
     return WorkflowHandleFuture(new_wf_id, future, dbos)
 
 
+def enqueue_workflows(
+    dbos: "DBOS",
+    queue_name: str,
+    calls: List[Tuple["Workflow[..., Any]", str, Tuple[Any, ...], Dict[str, Any]]],
+) -> List[str]:
+    """
+    Enqueue many workflow calls, each a function, workflow ID, args and kwargs, in one transaction.
+
+    Calls whose workflow IDs already exist are skipped. Returns the IDs of the calls enqueued.
+    """
+    workflows: List[Tuple[WorkflowStatusInternal, str]] = []
+    with DBOSContextEnsure():
+        ctx = assert_current_dbos_context()
+        for func, workflow_id, args, kwargs in calls:
+            # If the function has a class, add the class object as its first argument
+            fself: Optional[object] = getattr(func, "__self__", None)
+            if fself is not None:
+                args = (fself,) + args
+            fi = get_func_info(func)
+            if fi is None:
+                raise DBOSWorkflowFunctionNotFoundError(
+                    "<NONE>",
+                    f"enqueue_workflows: function {func.__name__} is not registered",
+                )
+            orig_func = func.__orig_func  # type: ignore
+            class_name = get_dbos_class_name(fi, orig_func, args)
+            status = _new_workflow_status(
+                ctx,
+                workflow_id,
+                get_dbos_func_name(orig_func),
+                class_name,
+                get_config_name(fi, orig_func, args),
+                queue_name,
+            )
+            # If we have a class name, the first arg is the instance and do not serialize
+            if class_name is not None:
+                args = args[1:]
+            workflows.append(
+                (
+                    status,
+                    _serialization.serialize_args({"args": args, "kwargs": kwargs}),
+                )
+            )
+    return dbos._sys_db.enqueue_workflows(workflows)
+
+
 if sys.version_info < (3, 12):
 
     def _mark_coroutine(func: Callable[P, R]) -> Callable[P, R]:
@@ -464,11 +639,13 @@ def workflow_wrapper(
     dbosreg: "DBOSRegistry",
     func: Callable[P, R],
     max_recovery_attempts: int = DEFAULT_MAX_RECOVERY_ATTEMPTS,
+    relaxed_status: bool = False,
 ) -> Callable[P, R]:
     func.__orig_func = func  # type: ignore
 
     fi = get_or_create_func_info(func)
     fi.max_recovery_attempts = max_recovery_attempts
+    fi.relaxed_status = relaxed_status
 
     @wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> R:
@@ -513,7 +690,7 @@ def workflow_wrapper(
                 f"Running workflow, id: {ctx.workflow_id}, name: {get_dbos_func_name(func)}"
             )
 
-            return _get_wf_invoke_func(dbos, status)
+            return _get_wf_invoke_func(dbos, status, relaxed_status)
 
         outcome = (
             wfOutcome.wrap(init_wf)
@@ -526,61 +703,104 @@ def workflow_wrapper(
 
 
 def decorate_workflow(
-    reg: "DBOSRegistry", max_recovery_attempts: int
+    reg: "DBOSRegistry", max_recovery_attempts: int, relaxed_status: bool = False
 ) -> Callable[[Callable[P, R]], Callable[P, R]]:
     def _workflow_decorator(func: Callable[P, R]) -> Callable[P, R]:
-        wrapped_func = workflow_wrapper(reg, func, max_recovery_attempts)
+        wrapped_func = workflow_wrapper(
+            reg, func, max_recovery_attempts, relaxed_status
+        )
         reg.register_wf_function(func.__qualname__, wrapped_func, "workflow")
         return wrapped_func
 
     return _workflow_decorator
 
 
+def _transaction_retry_waits() -> Iterator[float]:
+    # Transactions failing with serialization errors are retried with exponential backoff
+    wait_seconds = 0.001
+    while True:
+        yield wait_seconds
+        wait_seconds = min(wait_seconds * 1.5, 2.0)
+
+
 def decorate_transaction(
     dbosreg: "DBOSRegistry", isolation_level: "IsolationLevel" = "SERIALIZABLE"
 ) -> Callable[[F], F]:
     def decorator(func: F) -> F:
-        def invoke_tx(*args: Any, **kwargs: Any) -> Any:
+        def get_dbos() -> "DBOS":
             if dbosreg.dbos is None:
                 raise DBOSException(
                     f"Function {func.__name__} invoked before DBOS initialized"
                 )
+            return dbosreg.dbos
 
-            ctx = assert_current_dbos_context()
-            if dbosreg.is_workflow_cancelled(ctx.workflow_id):
-                raise DBOSWorkflowCancelledError(
-                    f"Workflow {ctx.workflow_id} is cancelled. Aborting transaction {func.__name__}."
+        def cancelled_error(ctx: DBOSContext) -> DBOSWorkflowCancelledError:
+            return DBOSWorkflowCancelledError(
+                f"Workflow {ctx.workflow_id} is cancelled. Aborting transaction {func.__name__}."
+            )
+
+        def new_txn_output(ctx: DBOSContext) -> TransactionResultInternal:
+            return {
+                "workflow_uuid": ctx.workflow_id,
+                "function_id": ctx.function_id,
+                "output": None,
+                "error": None,
+                "txn_snapshot": "",  # TODO: add actual snapshot
+                "executor_id": None,
+                "txn_id": None,
+            }
+
+        def replay_recorded_output(
+            dbos: "DBOS", ctx: DBOSContext, recorded_output: RecordedResult
+        ) -> Any:
+            dbos.logger.debug(
+                f"Replaying transaction, id: {ctx.function_id}, name: {func.__name__}"
+            )
+            if recorded_output["error"]:
+                raise _serialization.deserialize_exception(recorded_output["error"])
+            elif recorded_output["output"]:
+                return _serialization.deserialize(recorded_output["output"])
+            else:
+                raise Exception("Output and error are both None")
+
+        def retry_wait(
+            dbos: "DBOS",
+            ctx: DBOSContext,
+            error: Exception,
+            retry_waits: Iterator[float],
+        ) -> Optional[float]:
+            # Serialization failures are retried, after the returned wait
+            if isinstance(error, DBAPIError) and error.orig.sqlstate == "40001":  # type: ignore
+                wait_seconds = next(retry_waits)
+                ctx.get_current_span().add_event(
+                    "Transaction Serialization Failure",
+                    {"retry_wait_seconds": wait_seconds},
                 )
+                return wait_seconds
+            if isinstance(error, InvalidRequestError):
+                dbos.logger.error(
+                    f"InvalidRequestError in transaction {func.__qualname__} \033[1m Hint: Do not call commit() or rollback() within a DBOS transaction.\033[0m"
+                )
+            return None
 
-            dbos = dbosreg.dbos
+        def invoke_tx(*args: Any, **kwargs: Any) -> Any:
+            dbos = get_dbos()
             with dbos._app_db.sessionmaker() as session:
                 attributes: TracedAttributes = {
                     "name": func.__name__,
                     "operationType": OperationType.TRANSACTION.value,
                 }
-                with EnterDBOSTransaction(session, attributes=attributes):
+                txn_timer = dbos_metrics.transaction_duration.time(func.__qualname__)
+                with txn_timer, EnterDBOSTransaction(session, attributes=attributes):
                     ctx = assert_current_dbos_context()
-                    txn_output: TransactionResultInternal = {
-                        "workflow_uuid": ctx.workflow_id,
-                        "function_id": ctx.function_id,
-                        "output": None,
-                        "error": None,
-                        "txn_snapshot": "",  # TODO: add actual snapshot
-                        "executor_id": None,
-                        "txn_id": None,
-                    }
-                    retry_wait_seconds = 0.001
-                    backoff_factor = 1.5
-                    max_retry_wait_seconds = 2.0
+                    txn_output = new_txn_output(ctx)
+                    retry_waits = _transaction_retry_waits()
                     while True:
-
-                        if dbosreg.is_workflow_cancelled(ctx.workflow_id):
-                            raise DBOSWorkflowCancelledError(
-                                f"Workflow {ctx.workflow_id} is cancelled. Aborting transaction {func.__name__}."
-                            )
-
+                        if dbosreg.is_workflow_cancelled(
+                            ctx.workflow_id
+                        ) or _check_cancelled_in_db(dbos, ctx):
+                            raise cancelled_error(ctx)
                         has_recorded_error = False
-                        txn_error: Optional[Exception] = None
                         try:
                             with session.begin():
                                 # This must be the first statement in the transaction!
@@ -592,35 +812,19 @@ def decorate_transaction(
                                 # Check recorded output for OAOO
                                 recorded_output = (
                                     ApplicationDatabase.check_transaction_execution(
-                                        session,
-                                        ctx.workflow_id,
-                                        ctx.function_id,
+                                        session, ctx.workflow_id, ctx.function_id
                                     )
+                                    if not ctx.is_first_execution
+                                    else None
                                 )
                                 if recorded_output:
-                                    dbos.logger.debug(
-                                        f"Replaying transaction, id: {ctx.function_id}, name: {attributes['name']}"
-                                    )
-                                    if recorded_output["error"]:
-                                        deserialized_error = (
-                                            _serialization.deserialize_exception(
-                                                recorded_output["error"]
-                                            )
-                                        )
-                                        has_recorded_error = True
-                                        raise deserialized_error
-                                    elif recorded_output["output"]:
-                                        return _serialization.deserialize(
-                                            recorded_output["output"]
-                                        )
-                                    else:
-                                        raise Exception(
-                                            "Output and error are both None"
-                                        )
-                                else:
-                                    dbos.logger.debug(
-                                        f"Running transaction, id: {ctx.function_id}, name: {attributes['name']}"
+                                    has_recorded_error = bool(recorded_output["error"])
+                                    return replay_recorded_output(
+                                        dbos, ctx, recorded_output
                                     )
+                                dbos.logger.debug(
+                                    f"Running transaction, id: {ctx.function_id}, name: {func.__name__}"
+                                )
 
                                 output = func(*args, **kwargs)
                                 txn_output["output"] = _serialization.serialize(output)
@@ -630,44 +834,105 @@ def decorate_transaction(
                                 ApplicationDatabase.record_transaction_output(
                                     ctx.sql_session, txn_output
                                 )
+                                for stmt, params in _temp_txn_workflow_statements(
+                                    ctx, txn_output
+                                ):
+                                    ctx.sql_session.execute(stmt, params)
                                 break
-                        except DBAPIError as dbapi_error:
-                            if dbapi_error.orig.sqlstate == "40001":  # type: ignore
-                                # Retry on serialization failure
-                                ctx.get_current_span().add_event(
-                                    "Transaction Serialization Failure",
-                                    {"retry_wait_seconds": retry_wait_seconds},
-                                )
-                                time.sleep(retry_wait_seconds)
-                                retry_wait_seconds = min(
-                                    retry_wait_seconds * backoff_factor,
-                                    max_retry_wait_seconds,
-                                )
+                        except Exception as error:
+                            wait_seconds = retry_wait(dbos, ctx, error, retry_waits)
+                            if wait_seconds is not None:
+                                time.sleep(wait_seconds)
                                 continue
-                            txn_error = dbapi_error
-                            raise
-                        except InvalidRequestError as invalid_request_error:
-                            dbos.logger.error(
-                                f"InvalidRequestError in transaction {func.__qualname__} \033[1m Hint: Do not call commit() or rollback() within a DBOS transaction.\033[0m"
-                            )
-                            txn_error = invalid_request_error
+                            # Don't record the error if it was already recorded
+                            if not has_recorded_error:
+                                txn_output["error"] = (
+                                    _serialization.serialize_exception(error)
+                                )
+                                dbos._app_db.record_transaction_error(txn_output)
                             raise
+            _commit_temp_txn_workflow_record(ctx, txn_output)
+            return output
+
+        async def invoke_tx_async(*args: Any, **kwargs: Any) -> Any:
+            dbos = get_dbos()
+            async with dbos._app_db.async_session() as session:
+                attributes: TracedAttributes = {
+                    "name": func.__name__,
+                    "operationType": OperationType.TRANSACTION.value,
+                }
+                txn_timer = dbos_metrics.transaction_duration.time(func.__qualname__)
+                with txn_timer, EnterDBOSTransaction(session, attributes=attributes):
+                    ctx = assert_current_dbos_context()
+                    txn_output = new_txn_output(ctx)
+                    retry_waits = _transaction_retry_waits()
+                    while True:
+                        if dbosreg.is_workflow_cancelled(
+                            ctx.workflow_id
+                        ) or await _check_cancelled_in_db_async(dbos, ctx):
+                            raise cancelled_error(ctx)
+                        has_recorded_error = False
+                        try:
+                            async with session.begin():
+                                # This must be the first statement in the transaction!
+                                await session.connection(
+                                    execution_options={
+                                        "isolation_level": isolation_level
+                                    }
+                                )
+                                # Check recorded output for OAOO
+                                recorded_output = (
+                                    await ApplicationDatabase.check_transaction_execution_async(
+                                        session, ctx.workflow_id, ctx.function_id
+                                    )
+                                    if not ctx.is_first_execution
+                                    else None
+                                )
+                                if recorded_output:
+                                    has_recorded_error = bool(recorded_output["error"])
+                                    return replay_recorded_output(
+                                        dbos, ctx, recorded_output
+                                    )
+                                dbos.logger.debug(
+                                    f"Running transaction, id: {ctx.function_id}, name: {func.__name__}"
+                                )
+
+                                output = await func(*args, **kwargs)
+                                txn_output["output"] = _serialization.serialize(output)
+                                assert (
+                                    ctx.async_sql_session is not None
+                                ), "Cannot find a database connection"
+                                await ApplicationDatabase.record_transaction_output_async(
+                                    ctx.async_sql_session, txn_output
+                                )
+                                for stmt, params in _temp_txn_workflow_statements(
+                                    ctx, txn_output
+                                ):
+                                    await ctx.async_sql_session.execute(stmt, params)
+                                break
                         except Exception as error:
-                            txn_error = error
-                            raise
-                        finally:
+                            wait_seconds = retry_wait(dbos, ctx, error, retry_waits)
+                            if wait_seconds is not None:
+                                await asyncio.sleep(wait_seconds)
+                                continue
                             # Don't record the error if it was already recorded
-                            if txn_error and not has_recorded_error:
+                            if not has_recorded_error:
                                 txn_output["error"] = (
-                                    _serialization.serialize_exception(txn_error)
+                                    _serialization.serialize_exception(error)
                                 )
-                                dbos._app_db.record_transaction_error(txn_output)
+                                await dbos._app_db.record_transaction_error_async(
+                                    txn_output
+                                )
+                            raise
+            _commit_temp_txn_workflow_record(ctx, txn_output)
             return output
 
-        if inspect.iscoroutinefunction(func):
-            raise DBOSException(
-                f"Function {func.__name__} is a coroutine function, but DBOS.transaction does not support coroutine functions"
-            )
+        async def invoke_tx_async_as(
+            rr: Optional[str], *args: Any, **kwargs: Any
+        ) -> Any:
+            # The role is assumed while the transaction runs, not just while its coroutine is created
+            with DBOSAssumeRole(rr):
+                return await invoke_tx_async(*args, **kwargs)
 
         fi = get_or_create_func_info(func)
 
@@ -682,6 +947,8 @@ def decorate_transaction(
                 assert (
                     ctx.is_workflow()
                 ), "Transactions must be called from within workflows"
+                if inspect.iscoroutinefunction(func):
+                    return invoke_tx_async_as(rr, *args, **kwargs)
                 with DBOSAssumeRole(rr):
                     return invoke_tx(*args, **kwargs)
             else:
@@ -689,9 +956,22 @@ def decorate_transaction(
                 assert tempwf
                 return tempwf(*args, **kwargs)
 
-        def temp_wf(*args: Any, **kwargs: Any) -> Any:
+        wrapper = (
+            _mark_coroutine(wrapper) if inspect.iscoroutinefunction(func) else wrapper  # type: ignore
+        )
+
+        def temp_wf_sync(*args: Any, **kwargs: Any) -> Any:
             return wrapper(*args, **kwargs)
 
+        async def temp_wf_async(*args: Any, **kwargs: Any) -> Any:
+            return await wrapper(*args, **kwargs)
+
+        # Other code in transact-py depends on the name of temporary workflow functions to be "temp_wf"
+        # so set the name of both sync and async temporary workflow functions explicitly
+        temp_wf_sync.__name__ = "temp_wf"
+        temp_wf_async.__name__ = "temp_wf"
+
+        temp_wf = temp_wf_async if inspect.iscoroutinefunction(func) else temp_wf_sync
         wrapped_wf = workflow_wrapper(dbosreg, temp_wf)
         set_dbos_func_name(temp_wf, "<temp>." + func.__qualname__)
         set_temp_workflow_type(temp_wf, "transaction")
@@ -777,8 +1057,16 @@ def decorate_step(
 
             def check_existing_result() -> Union[NoResult, R]:
                 ctx = assert_current_dbos_context()
-                recorded_output = dbos._sys_db.check_operation_execution(
-                    ctx.workflow_id, ctx.function_id
+                if _check_cancelled_in_db(dbos, ctx):
+                    raise DBOSWorkflowCancelledError(
+                        f"Workflow {ctx.workflow_id} is cancelled. Aborting step {func.__name__}."
+                    )
+                recorded_output = (
+                    dbos._sys_db.check_operation_execution(
+                        ctx.workflow_id, ctx.function_id
+                    )
+                    if not ctx.is_first_execution
+                    else None
                 )
                 if recorded_output:
                     dbos.logger.debug(
@@ -806,6 +1094,9 @@ def decorate_step(
                 stepOutcome = stepOutcome.retry(
                     max_attempts, on_exception, lambda i: DBOSMaxStepRetriesExceeded()
                 )
+            stepOutcome = stepOutcome.also(
+                dbos_metrics.step_duration.time(func.__qualname__)
+            )
 
             outcome = (
                 stepOutcome.then(record_step_result)
@@ -27,6 +27,7 @@ import calendar
 import copy
 import datetime
 import inspect
+import itertools
 import math
 import random
 import re
@@ -1297,3 +1298,237 @@ EXPANDERS = OrderedDict(
         ("hash", HashExpander),
     ]
 )
+
+
+def _next_bit(mask, x):
+    """Return the lowest set bit of `mask` at or above `x`, or -1 if there is none."""
+    m = mask >> x
+    if not m:
+        return -1
+    return x + (m & -m).bit_length() - 1
+
+
+def _prev_bit(mask, x):
+    """Return the highest set bit of `mask` at or below `x`, or -1 if there is none."""
+    if x < 0:
+        return -1
+    m = mask & ((2 << x) - 1)
+    return m.bit_length() - 1
+
+
+def _field_mask(values, low, high):
+    if values[0] == "*":
+        values = range(low, high + 1)
+    mask = 0
+    for v in values:
+        if isinstance(v, int):
+            mask |= 1 << v
+    return mask
+
+
+class CompiledCron(object):
+    """
+    A cron expression expanded once into a bitset of the values each field matches.
+
+    The next or previous fire time is found by looking up the nearest set bit of each field in
+    turn, instead of the datetime arithmetic `croniter` performs on every call. The days that
+    match in a month are computed once per month and cached.
+
+    Expressions using the nth day of week or a year field, and datetimes in time zones other
+    than UTC, are delegated to `croniter`.
+    """
+
+    # Bounds the months whose matching days are cached
+    MAX_CACHED_MONTHS = 1024
+
+    def __init__(
+        self,
+        expr_format,
+        second_at_beginning=False,
+        hash_id=None,
+        max_years_between_matches=50,
+    ):
+        self.expr_format = expr_format
+        self.second_at_beginning = second_at_beginning
+        self.hash_id = hash_id
+        self.max_years_between_matches = max(int(max_years_between_matches), 1)
+        if isinstance(hash_id, str):
+            hash_id = hash_id.encode("UTF-8")
+
+        # Expanding validates the expression, raising CroniterBadCronError
+        expanded, nth_weekday_of_month = croniter.expand(
+            expr_format, hash_id=hash_id, second_at_beginning=second_at_beginning
+        )
+        self.compiled = not nth_weekday_of_month and len(expanded) < YEAR_CRON_LEN
+
+        self._second_mask = (
+            _field_mask(expanded[SECOND_FIELD], 0, 59)
+            if len(expanded) > SECOND_FIELD
+            else 1
+        )
+        self._minute_mask = _field_mask(expanded[MINUTE_FIELD], 0, 59)
+        self._hour_mask = _field_mask(expanded[HOUR_FIELD], 0, 23)
+        self._month_mask = _field_mask(expanded[MONTH_FIELD], 1, 12)
+        self._dom_mask = _field_mask(expanded[DAY_FIELD], 1, 31)
+        self._dom_last = "l" in expanded[DAY_FIELD]
+        self._dow_mask = _field_mask(expanded[DOW_FIELD], 0, 6)
+        if self._dow_mask & (1 << 7):
+            # Sunday may also be written as 7
+            self._dow_mask = (self._dow_mask | 1) & ~(1 << 7)
+        # As in cron, when both day fields are restricted a day matching either one matches
+        self._day_or = expanded[DAY_FIELD][0] != "*" and expanded[DOW_FIELD][0] != "*"
+        self._day_masks = {}
+
+    def _days(self, year, month):
+        """Return the bitset of the days matching in a month."""
+        key = (year, month)
+        mask = self._day_masks.get(key)
+        if mask is not None:
+            return mask
+        first_weekday, days_in_month = calendar.monthrange(year, month)
+        mask = 0
+        for day in range(1, days_in_month + 1):
+            dom = (self._dom_mask >> day) & 1 or (
+                self._dom_last and day == days_in_month
+            )
+            # calendar counts weekdays from Monday = 0, cron from Sunday = 0
+            dow = (self._dow_mask >> ((first_weekday + day) % 7)) & 1
+            if (dom or dow) if self._day_or else (dom and dow):
+                mask |= 1 << day
+        if len(self._day_masks) >= self.MAX_CACHED_MONTHS:
+            self._day_masks.clear()
+        self._day_masks[key] = mask
+        return mask
+
+    def _next(self, y, mo, d, h, mi, s):
+        # The earliest match at or after the given time
+        max_year = y + self.max_years_between_matches
+        while y <= max_year:
+            next_mo = _next_bit(self._month_mask, mo)
+            if next_mo < 0:
+                y, mo, d, h, mi, s = y + 1, 1, 1, 0, 0, 0
+                continue
+            if next_mo != mo:
+                mo, d, h, mi, s = next_mo, 1, 0, 0, 0
+            next_d = _next_bit(self._days(y, mo), d)
+            if next_d < 0:
+                mo, d, h, mi, s = mo + 1, 1, 0, 0, 0
+                continue
+            if next_d != d:
+                d, h, mi, s = next_d, 0, 0, 0
+            next_h = _next_bit(self._hour_mask, h)
+            if next_h < 0:
+                d, h, mi, s = d + 1, 0, 0, 0
+                continue
+            if next_h != h:
+                h, mi, s = next_h, 0, 0
+            next_mi = _next_bit(self._minute_mask, mi)
+            if next_mi < 0:
+                h, mi, s = h + 1, 0, 0
+                continue
+            if next_mi != mi:
+                mi, s = next_mi, 0
+            next_s = _next_bit(self._second_mask, s)
+            if next_s < 0:
+                mi, s = mi + 1, 0
+                continue
+            return y, mo, d, h, mi, next_s
+        raise CroniterBadDateError("failed to find next date")
+
+    def _prev(self, y, mo, d, h, mi, s):
+        # The latest match at or before the given time
+        min_year = max(y - self.max_years_between_matches, datetime.MINYEAR)
+        while y >= min_year:
+            prev_mo = _prev_bit(self._month_mask, mo)
+            if prev_mo < 0:
+                y, mo, d, h, mi, s = y - 1, 12, 31, 23, 59, 59
+                continue
+            if prev_mo != mo:
+                mo, d, h, mi, s = prev_mo, 31, 23, 59, 59
+            prev_d = _prev_bit(self._days(y, mo), d)
+            if prev_d < 0:
+                mo, d, h, mi, s = mo - 1, 31, 23, 59, 59
+                continue
+            if prev_d != d:
+                d, h, mi, s = prev_d, 23, 59, 59
+            prev_h = _prev_bit(self._hour_mask, h)
+            if prev_h < 0:
+                d, h, mi, s = d - 1, 23, 59, 59
+                continue
+            if prev_h != h:
+                h, mi, s = prev_h, 59, 59
+            prev_mi = _prev_bit(self._minute_mask, mi)
+            if prev_mi < 0:
+                h, mi, s = h - 1, 59, 59
+                continue
+            if prev_mi != mi:
+                mi, s = prev_mi, 59
+            prev_s = _prev_bit(self._second_mask, s)
+            if prev_s < 0:
+                mi, s = mi - 1, 59
+                continue
+            return y, mo, d, h, mi, prev_s
+        raise CroniterBadDateError("failed to find prev date")
+
+    def _is_compiled_for(self, start_time):
+        tzinfo = start_time.tzinfo
+        return self.compiled and (
+            tzinfo is None
+            or tzinfo is datetime.timezone.utc
+            or isinstance(tzinfo, tzutc)
+        )
+
+    def _croniter(self, start_time):
+        return croniter(
+            self.expr_format,
+            start_time,
+            hash_id=self.hash_id,
+            second_at_beginning=self.second_at_beginning,
+            max_years_between_matches=self.max_years_between_matches,
+        )
+
+    def iter_next(self, start_time):
+        """Yield the fire times after `start_time`, in order."""
+        if not self._is_compiled_for(start_time):
+            it = self._croniter(start_time)
+            while True:
+                yield it.get_next(datetime.datetime)
+        t = start_time.replace(microsecond=0) + datetime.timedelta(seconds=1)
+        y, mo, d, h, mi, s = t.year, t.month, t.day, t.hour, t.minute, t.second
+        tzinfo = start_time.tzinfo
+        while True:
+            y, mo, d, h, mi, s = self._next(y, mo, d, h, mi, s)
+            yield datetime.datetime(y, mo, d, h, mi, s, tzinfo=tzinfo)
+            s += 1
+
+    def iter_prev(self, start_time):
+        """Yield the fire times before `start_time`, latest first."""
+        if not self._is_compiled_for(start_time):
+            it = self._croniter(start_time)
+            while True:
+                yield it.get_prev(datetime.datetime)
+        t = start_time.replace(microsecond=0)
+        if t == start_time:
+            t -= datetime.timedelta(seconds=1)
+        y, mo, d, h, mi, s = t.year, t.month, t.day, t.hour, t.minute, t.second
+        tzinfo = start_time.tzinfo
+        while True:
+            y, mo, d, h, mi, s = self._prev(y, mo, d, h, mi, s)
+            yield datetime.datetime(y, mo, d, h, mi, s, tzinfo=tzinfo)
+            s -= 1
+
+    def get_next(self, start_time):
+        """Return the first fire time after `start_time`."""
+        return next(self.iter_next(start_time))
+
+    def get_prev(self, start_time):
+        """Return the last fire time before `start_time`."""
+        return next(self.iter_prev(start_time))
+
+    def next_n(self, start_time, n):
+        """Return the next `n` fire times after `start_time`, in order."""
+        return list(itertools.islice(self.iter_next(start_time), n))
+
+    def prev_n(self, start_time, n):
+        """Return the last `n` fire times before `start_time`, latest first."""
+        return list(itertools.islice(self.iter_prev(start_time), n))
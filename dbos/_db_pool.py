@@ -0,0 +1,162 @@
+import threading
+import weakref
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+
+import sqlalchemy as sa
+from opentelemetry.metrics import Observation
+from sqlalchemy.engine.interfaces import ExecutionContext
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+from ._dbos_config import ConnectionPoolConfig
+from ._metrics import dbos_metrics
+
+_DEFAULT_POOL_SIZE = 20
+_DEFAULT_MAX_OVERFLOW = 5
+_DEFAULT_POOL_TIMEOUT = 30
+
+# Pool classes are created per (base class, pool name) so the name survives pool.recreate()
+_pool_classes: Dict[Tuple[Type[QueuePool], str], Type[QueuePool]] = {}
+_pool_classes_lock = threading.Lock()
+
+# Live engines and the name their pool reports metrics under
+_pooled_engines: "weakref.WeakKeyDictionary[sa.Engine, str]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _instrumented_pool_class(base: Type[QueuePool], pool_name: str) -> Type[QueuePool]:
+    with _pool_classes_lock:
+        pool_class = _pool_classes.get((base, pool_name))
+        if pool_class is None:
+
+            def _do_get(self: QueuePool) -> ConnectionPoolEntry:
+                dbos_metrics.pool_checkouts.inc(pool_name)
+                with dbos_metrics.pool_checkout_wait.time(pool_name):
+                    return base._do_get(self)
+
+            # SQLAlchemy names a pool's logger after its class's module, which keeps pool logging
+            # under sqlalchemy.pool rather than the dbos logger
+            pool_class = type(
+                f"DBOSInstrumented{base.__name__}",
+                (base,),
+                {"_do_get": _do_get, "__module__": base.__module__},
+            )
+            _pool_classes[(base, pool_name)] = pool_class
+        return pool_class
+
+
+def _engine_kwargs(
+    pool_config: Optional[ConnectionPoolConfig],
+    pool_class: Type[QueuePool],
+    transaction_pooling: bool,
+) -> Dict[str, Any]:
+    pool_config = pool_config or {}
+
+    def get(key: str, default: Any) -> Any:
+        value = pool_config.get(key)
+        return default if value is None else value
+
+    kwargs: Dict[str, Any] = {
+        "poolclass": pool_class,
+        "pool_size": get("pool_size", _DEFAULT_POOL_SIZE),
+        "max_overflow": get("max_overflow", _DEFAULT_MAX_OVERFLOW),
+        "pool_timeout": get("pool_timeout", _DEFAULT_POOL_TIMEOUT),
+        "pool_pre_ping": get("pool_pre_ping", False),
+        "pool_recycle": get("pool_recycle", -1),
+    }
+    if pool_config.get("query_cache_size") is not None:
+        kwargs["query_cache_size"] = pool_config["query_cache_size"]
+    if transaction_pooling:
+        # Server-side prepared statements do not survive the pooler switching backends between transactions
+        kwargs["connect_args"] = {"prepare_threshold": None}
+    elif "prepare_threshold" in pool_config:
+        kwargs["connect_args"] = {"prepare_threshold": pool_config["prepare_threshold"]}
+    return kwargs
+
+
+def _do_execute(
+    cursor: Any, statement: str, parameters: Any, context: ExecutionContext
+) -> Optional[bool]:
+    # Statements marked with the dbos_prepare execution option are prepared server-side on first use,
+    # instead of after psycopg's prepare_threshold executions. Skip this where prepares are disabled.
+    if (
+        context.execution_options.get("dbos_prepare")
+        and cursor.connection.prepare_threshold is not None
+    ):
+        cursor.execute(statement, parameters, prepare=True)
+        return True
+    return None
+
+
+def _on_engine_disposed(engine: sa.Engine) -> None:
+    _pooled_engines.pop(engine, None)
+
+
+def _track_engine(engine: sa.Engine, pool_name: str) -> None:
+    _pooled_engines[engine] = pool_name
+    sa.event.listen(engine, "engine_disposed", _on_engine_disposed)
+
+
+def create_pooled_engine(
+    url: sa.URL,
+    pool_config: Optional[ConnectionPoolConfig],
+    pool_name: str,
+    *,
+    transaction_pooling: bool = False,
+) -> sa.Engine:
+    """Create an engine whose connection pool is sized from config and reports checkout wait and saturation metrics."""
+    engine = sa.create_engine(
+        url,
+        **_engine_kwargs(
+            pool_config,
+            _instrumented_pool_class(QueuePool, pool_name),
+            transaction_pooling,
+        ),
+    )
+    sa.event.listen(engine, "do_execute", _do_execute)
+    _track_engine(engine, pool_name)
+    return engine
+
+
+def create_pooled_async_engine(
+    url: sa.URL,
+    pool_config: Optional[ConnectionPoolConfig],
+    pool_name: str,
+    *,
+    transaction_pooling: bool = False,
+) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        **_engine_kwargs(
+            pool_config,
+            _instrumented_pool_class(AsyncAdaptedQueuePool, pool_name),
+            transaction_pooling,
+        ),
+    )
+    _track_engine(engine.sync_engine, pool_name)
+    return engine
+
+
+def pool_usage() -> Dict[str, Tuple[int, int]]:
+    """Return the checked-out connections and capacity (including overflow) of each named pool."""
+    usage: Dict[str, Tuple[int, int]] = {}
+    for engine, pool_name in list(_pooled_engines.items()):
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        checked_out, capacity = usage.get(pool_name, (0, 0))
+        usage[pool_name] = (
+            checked_out + pool.checkedout(),
+            capacity + pool.size() + max(pool._max_overflow, 0),
+        )
+    return usage
+
+
+def _observe_pool_saturation() -> Iterable[Observation]:
+    for pool_name, (checked_out, cap) in pool_usage().items():
+        if cap > 0:
+            yield Observation(checked_out / cap, {"pool": pool_name})
+
+
+dbos_metrics.add_pool_saturation_source(_observe_pool_saturation)
@@ -9,7 +9,6 @@ import os
 import sys
 import threading
 import traceback
-from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from logging import Logger
 from typing import (
@@ -49,6 +48,8 @@ from ._core import (
     start_workflow,
     workflow_wrapper,
 )
+from ._executor import DBOSThreadPoolExecutor
+from ._metrics import dbos_metrics
 from ._queue import Queue, queue_thread
 from ._recovery import recover_pending_workflows, startup_recovery_thread
 from ._registrations import (
@@ -59,16 +60,17 @@ from ._registrations import (
     set_temp_workflow_type,
 )
 from ._roles import default_required_roles, required_roles
-from ._scheduler import ScheduledWorkflow, scheduled
+from ._scheduler import ScheduledWorkflow, Scheduler, SchedulerCatchUp, scheduled
 from ._sys_db import reset_system_database
 from ._tracer import dbos_tracer
 
 if TYPE_CHECKING:
     from fastapi import FastAPI
-    from ._kafka import _KafkaConsumerWorkflow
+    from ._kafka import _KafkaBatchConsumerWorkflow, _KafkaConsumerWorkflow
     from ._request import Request
     from flask import Flask
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ._request import Request
@@ -126,6 +128,9 @@ IsolationLevel = Literal[
 _dbos_global_instance: Optional[DBOS] = None
 _dbos_global_registry: Optional[DBOSRegistry] = None
 
+# How often a running workflow checks the database for a cancellation whose notification it missed
+_DEFAULT_CANCELLATION_CHECK_INTERVAL_SECS = 10.0
+
 
 def _get_dbos_instance() -> DBOS:
     global _dbos_global_instance
@@ -158,6 +163,10 @@ class DBOSRegistry:
         self.dbos: Optional[DBOS] = None
         self.config: Optional[ConfigFile] = None
         self.workflow_cancelled_map: dict[str, bool] = {}
+        # Executions of each workflow running in this process, so cancellations only track those
+        self._running_workflows: dict[str, int] = {}
+        self._running_workflows_lock = threading.Lock()
+        self.scheduler: Optional[Scheduler] = None
 
     def register_wf_function(self, name: str, wrapped_func: F, functype: str) -> None:
         if name in self.function_type_map:
@@ -184,7 +193,7 @@ class DBOSRegistry:
     ) -> None:
         if self.dbos and self.dbos._launched:
             self.dbos.stop_events.append(evt)
-            self.dbos._executor.submit(func, *args, **kwargs)
+            self.dbos._executor.submit_background(func, *args, **kwargs)
         else:
             self.pollers.append((evt, func, args, kwargs))
 
@@ -209,6 +218,31 @@ class DBOSRegistry:
     def clear_workflow_cancelled(self, workflow_id: str) -> None:
         self.workflow_cancelled_map.pop(workflow_id, None)
 
+    def set_workflow_cancelled(self, workflow_id: str, cancelled: bool) -> None:
+        if cancelled:
+            # Every process is notified of every cancellation, but only workflows running here need stopping
+            with self._running_workflows_lock:
+                if workflow_id in self._running_workflows:
+                    self.cancel_workflow(workflow_id)
+        else:
+            self.clear_workflow_cancelled(workflow_id)
+
+    def workflow_started(self, workflow_id: str) -> None:
+        with self._running_workflows_lock:
+            self._running_workflows[workflow_id] = (
+                self._running_workflows.get(workflow_id, 0) + 1
+            )
+
+    def workflow_finished(self, workflow_id: str) -> None:
+        with self._running_workflows_lock:
+            count = self._running_workflows.get(workflow_id, 0) - 1
+            if count > 0:
+                self._running_workflows[workflow_id] = count
+            else:
+                # Its cancellation is no longer needed once no execution of it is running here
+                self._running_workflows.pop(workflow_id, None)
+                self.workflow_cancelled_map.pop(workflow_id, None)
+
     def compute_app_version(self) -> str:
         """
         An application's version is computed from a hash of the source of its workflows.
@@ -310,6 +344,7 @@ class DBOS:
             config = load_config()
         set_env_vars(config)
         dbos_tracer.config(config)
+        dbos_metrics.config(config)
         dbos_logger.info("Initializing DBOS")
         self.config: ConfigFile = config
         self._launched: bool = False
@@ -321,8 +356,16 @@ class DBOS:
         self.stop_events: List[threading.Event] = []
         self.fastapi: Optional["FastAPI"] = fastapi
         self.flask: Optional["Flask"] = flask
-        self._executor_field: Optional[ThreadPoolExecutor] = None
+        self._executor_field: Optional[DBOSThreadPoolExecutor] = None
         self._background_threads: List[threading.Thread] = []
+        cancellation_check_interval = config.get("runtimeConfig", {}).get(
+            "cancellation_check_interval_secs"
+        )
+        self._cancellation_check_interval_secs: float = (
+            _DEFAULT_CANCELLATION_CHECK_INTERVAL_SECS
+            if cancellation_check_interval is None
+            else cancellation_check_interval
+        )
 
         # If using FastAPI, set up middleware and lifecycle events
         if self.fastapi is not None:
@@ -351,10 +394,10 @@ class DBOS:
             handler.flush()
 
     @property
-    def _executor(self) -> ThreadPoolExecutor:
+    def _executor(self) -> DBOSThreadPoolExecutor:
         if self._executor_field is None:
             raise DBOSException("Executor accessed before DBOS was launched")
-        rv: ThreadPoolExecutor = self._executor_field
+        rv: DBOSThreadPoolExecutor = self._executor_field
         return rv
 
     @property
@@ -394,9 +437,12 @@ class DBOS:
             if GlobalParams.app_version == "":
                 GlobalParams.app_version = self._registry.compute_app_version()
             dbos_logger.info(f"Application version: {GlobalParams.app_version}")
-            self._executor_field = ThreadPoolExecutor(max_workers=64)
+            self._executor_field = DBOSThreadPoolExecutor(max_workers=64)
             self._sys_db_field = SystemDatabase(self.config)
-            self._app_db_field = ApplicationDatabase(self.config)
+            self._app_db_field = ApplicationDatabase(
+                self.config,
+                engine=self._sys_db.engine if self._sys_db.colocated else None,
+            )
             admin_port = self.config["runtimeConfig"].get("admin_port")
             if admin_port is None:
                 admin_port = 3001
@@ -414,9 +460,14 @@ class DBOS:
                     f"No workflows to recover from application version {GlobalParams.app_version}"
                 )
 
-            self._executor.submit(startup_recovery_thread, self, workflow_ids)
+            self._executor.submit_background(
+                startup_recovery_thread, self, workflow_ids
+            )
 
-            # Listen to notifications
+            # Listen to notifications, including cancellations by other processes
+            self._sys_db.workflow_cancellation_callback = (
+                self._registry.set_workflow_cancelled
+            )
             notification_listener_thread = threading.Thread(
                 target=self._sys_db._notification_listener,
                 daemon=True,
@@ -506,10 +557,22 @@ class DBOS:
     # Decorators for DBOS functionality
     @classmethod
     def workflow(
-        cls, *, max_recovery_attempts: int = DEFAULT_MAX_RECOVERY_ATTEMPTS
+        cls,
+        *,
+        max_recovery_attempts: int = DEFAULT_MAX_RECOVERY_ATTEMPTS,
+        relaxed_status: bool = False,
     ) -> Callable[[Callable[P, R]], Callable[P, R]]:
-        """Decorate a function for use as a DBOS workflow."""
-        return decorate_workflow(_get_or_create_dbos_registry(), max_recovery_attempts)
+        """
+        Decorate a function for use as a DBOS workflow.
+
+        Args:
+            max_recovery_attempts(int): Maximum number of recovery attempts before the workflow is marked `RETRIES_EXCEEDED`
+            relaxed_status(bool): If true, record the final status in background batches even when the workflow fails, so it becomes visible shortly after the workflow returns
+
+        """
+        return decorate_workflow(
+            _get_or_create_dbos_registry(), max_recovery_attempts, relaxed_status
+        )
 
     @classmethod
     def transaction(
@@ -593,24 +656,92 @@ class DBOS:
         return required_roles(roles)
 
     @classmethod
-    def scheduled(cls, cron: str) -> Callable[[ScheduledWorkflow], ScheduledWorkflow]:
-        """Decorate a workflow function with its invocation schedule."""
+    def scheduled(
+        cls,
+        cron: str,
+        catch_up: SchedulerCatchUp = "skip",
+        catch_up_limit: int = 100,
+    ) -> Callable[[ScheduledWorkflow], ScheduledWorkflow]:
+        """
+        Decorate a workflow function with its invocation schedule.
+
+        Args:
+            cron(str): The crontab schedule, with an optional leading seconds field
+            catch_up(SchedulerCatchUp): Whether firings missed while no scheduler was running are skipped (`skip`), run once (`latest`), or all run (`all`)
+            catch_up_limit(int): Maximum number of missed firings run by the `all` policy
 
-        return scheduled(_get_or_create_dbos_registry(), cron)
+        """
 
+        return scheduled(_get_or_create_dbos_registry(), cron, catch_up, catch_up_limit)
+
+    @overload
     @classmethod
     def kafka_consumer(
         cls,
         config: dict[str, Any],
         topics: list[str],
         in_order: bool = False,
-    ) -> Callable[[_KafkaConsumerWorkflow], _KafkaConsumerWorkflow]:
-        """Decorate a function to be used as a Kafka consumer."""
+        max_batch_size: int = 1,
+        batch_linger_secs: float = 1.0,
+        batch: Literal[False] = False,
+        manual_commit: bool = False,
+        consumer_threads: int = 1,
+    ) -> Callable[[_KafkaConsumerWorkflow], _KafkaConsumerWorkflow]: ...
+
+    @overload
+    @classmethod
+    def kafka_consumer(
+        cls,
+        config: dict[str, Any],
+        topics: list[str],
+        in_order: bool = False,
+        max_batch_size: int = 1,
+        batch_linger_secs: float = 1.0,
+        *,
+        batch: Literal[True],
+        manual_commit: bool = False,
+        consumer_threads: int = 1,
+    ) -> Callable[[_KafkaBatchConsumerWorkflow], _KafkaBatchConsumerWorkflow]: ...
+
+    @classmethod
+    def kafka_consumer(
+        cls,
+        config: dict[str, Any],
+        topics: list[str],
+        in_order: bool = False,
+        max_batch_size: int = 1,
+        batch_linger_secs: float = 1.0,
+        batch: bool = False,
+        manual_commit: bool = False,
+        consumer_threads: int = 1,
+    ) -> Callable[[Callable[..., None]], Callable[..., None]]:
+        """
+        Decorate a function to be used as a Kafka consumer.
+
+        Args:
+            config(dict): The Kafka consumer configuration
+            topics(list[str]): The topics to consume from
+            in_order(bool): If true, the messages of each topic are processed one at a time, in order
+            max_batch_size(int): Maximum number of messages consumed and enqueued together, in one transaction
+            batch_linger_secs(float): How long to wait for a batch to fill before enqueueing the messages consumed so far
+            batch(bool): If true, the function receives a list of the consumed messages of one partition, in offset order, instead of one message
+            manual_commit(bool): If true, auto-commit is disabled and offsets are committed asynchronously as soon as their messages are enqueued, so a restart or rebalance only consumes again the messages since the last commit
+            consumer_threads(int): Number of consumers, each on its own thread and in the same consumer group, among which the topics' partitions are divided
+
+        """
         try:
             from ._kafka import kafka_consumer
 
             return kafka_consumer(
-                _get_or_create_dbos_registry(), config, topics, in_order
+                _get_or_create_dbos_registry(),
+                config,
+                topics,
+                in_order,
+                max_batch_size,
+                batch_linger_secs,
+                batch,
+                manual_commit,
+                consumer_threads,
             )
         except ModuleNotFoundError as e:
             raise DBOSException(
@@ -888,7 +1019,20 @@ class DBOS:
         ctx = assert_current_dbos_context()
         assert ctx.is_transaction(), "db is only available within a transaction."
         rv = ctx.sql_session
-        assert rv
+        assert (
+            rv
+        ), "db is only available as an AsyncSession within an async transaction. Use DBOS.async_sql_session."
+        return rv
+
+    @classproperty
+    def async_sql_session(cls) -> AsyncSession:
+        """Return the SQLAlchemy `AsyncSession` for the current context, which must be within an async transaction function."""
+        ctx = assert_current_dbos_context()
+        assert ctx.is_transaction(), "db is only available within a transaction."
+        rv = ctx.async_sql_session
+        assert (
+            rv
+        ), "async db is only available within an async transaction. Use DBOS.sql_session."
         return rv
 
     @classproperty
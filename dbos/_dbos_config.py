@@ -20,6 +20,32 @@ class RuntimeConfig(TypedDict, total=False):
     start: List[str]
     setup: Optional[List[str]]
     admin_port: Optional[int]
+    cancellation_check_interval_secs: Optional[float]
+    recovery_concurrency: Optional[int]
+    scheduler_leader_election: Optional[bool]
+    scheduler_lease_secs: Optional[float]
+
+
+class ConnectionPoolConfig(TypedDict, total=False):
+    pool_size: Optional[int]
+    max_overflow: Optional[int]
+    pool_timeout: Optional[float]
+    pool_pre_ping: Optional[bool]
+    pool_recycle: Optional[int]
+    query_cache_size: Optional[int]
+    prepare_threshold: Optional[int]
+
+
+class WorkflowBufferConfig(TypedDict, total=False):
+    flush_batch_size: Optional[int]
+    flush_interval_secs: Optional[float]
+    max_buffer_bytes: Optional[int]
+    spill_path: Optional[str]
+
+
+class WorkflowStatusCacheConfig(TypedDict, total=False):
+    max_entries: Optional[int]
+    ttl_secs: Optional[float]
 
 
 class DatabaseConfig(TypedDict, total=False):
@@ -30,17 +56,26 @@ class DatabaseConfig(TypedDict, total=False):
     connectionTimeoutMillis: Optional[int]
     app_db_name: str
     sys_db_name: Optional[str]
+    sys_db_in_app_db: Optional[bool]
     ssl: Optional[bool]
     ssl_ca: Optional[str]
     local_suffix: Optional[bool]
     app_db_client: Optional[str]
     migrate: Optional[List[str]]
     rollback: Optional[List[str]]
+    app_db_pool: Optional[ConnectionPoolConfig]
+    sys_db_pool: Optional[ConnectionPoolConfig]
+    pgbouncer_transaction_mode: Optional[bool]
+    listener_hostname: Optional[str]
+    listener_port: Optional[int]
+    workflow_buffer: Optional[WorkflowBufferConfig]
+    workflow_status_cache: Optional[WorkflowStatusCacheConfig]
 
 
 class OTLPExporterConfig(TypedDict, total=False):
     logsEndpoint: Optional[str]
     tracesEndpoint: Optional[str]
+    metricsEndpoint: Optional[str]
 
 
 class LoggerConfig(TypedDict, total=False):
@@ -0,0 +1,124 @@
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Tuple, TypeVar
+
+if TYPE_CHECKING:
+    from ._admin_server import PerfUtilization
+
+T = TypeVar("T")
+
+_DEFAULT_UTILIZATION_WINDOW_SECS = 60.0
+_UTILIZATION_BUCKET_SECS = 1.0
+
+
+class _BusyTime:
+    """
+    Thread time spent running tasks, over a sliding window.
+
+    The time of finished tasks is kept in per-second buckets covering the window. The time of
+    running tasks is added up to the moment it is measured.
+    """
+
+    def __init__(self, window_secs: float) -> None:
+        self._num_buckets = max(1, int(window_secs / _UTILIZATION_BUCKET_SECS))
+        self._lock = threading.Lock()
+        self._buckets: Dict[int, float] = {}
+        self._running: Dict[int, float] = {}
+        self._tokens = itertools.count()
+
+    def start(self) -> int:
+        token = next(self._tokens)
+        start_time = time.monotonic()
+        with self._lock:
+            self._running[token] = start_time
+        return token
+
+    def finish(self, token: int) -> None:
+        end_time = time.monotonic()
+        with self._lock:
+            start_time = self._running.pop(token)
+            # Only the part of the task within the window is kept
+            first = max(
+                int(start_time / _UTILIZATION_BUCKET_SECS),
+                int(end_time / _UTILIZATION_BUCKET_SECS) - self._num_buckets + 1,
+            )
+            last = int(end_time / _UTILIZATION_BUCKET_SECS)
+            for bucket in range(first, last + 1):
+                overlap = min(end_time, (bucket + 1) * _UTILIZATION_BUCKET_SECS) - max(
+                    start_time, bucket * _UTILIZATION_BUCKET_SECS
+                )
+                self._buckets[bucket] = self._buckets.get(bucket, 0.0) + overlap
+            for bucket in [b for b in self._buckets if b <= last - self._num_buckets]:
+                del self._buckets[bucket]
+
+    def window_start(self, now: float) -> float:
+        # The window is made of whole buckets, the last of which is still filling
+        return (
+            int(now / _UTILIZATION_BUCKET_SECS) - self._num_buckets + 1
+        ) * _UTILIZATION_BUCKET_SECS
+
+    def measure(self, now: float) -> Tuple[float, int]:
+        """Return the busy thread time in the window ending now, and the number of running tasks."""
+        window_start = self.window_start(now)
+        first = int(window_start / _UTILIZATION_BUCKET_SECS)
+        with self._lock:
+            busy = sum(t for bucket, t in self._buckets.items() if bucket >= first)
+            busy += sum(
+                now - max(start, window_start) for start in self._running.values()
+            )
+            return busy, len(self._running)
+
+
+class DBOSThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    The thread pool running workflows, which measures how busy its threads are.
+
+    Tasks submitted with `submit` count as work. Long-running background tasks, such as pollers,
+    are submitted with `submit_background`; the threads they hold are not counted as capacity.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        utilization_window_secs: float = _DEFAULT_UTILIZATION_WINDOW_SECS,
+    ) -> None:
+        super().__init__(max_workers=max_workers)
+        self.max_workers = max_workers
+        self._created_at = time.monotonic()
+        self._busy = _BusyTime(utilization_window_secs)
+        self._background = _BusyTime(utilization_window_secs)
+
+    @staticmethod
+    def _run(busy: _BusyTime, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        token = busy.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            busy.finish(token)
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+        return super().submit(self._run, self._busy, fn, *args, **kwargs)
+
+    def submit_background(
+        self, fn: Callable[..., T], /, *args: Any, **kwargs: Any
+    ) -> Future[T]:
+        return super().submit(self._run, self._background, fn, *args, **kwargs)
+
+    def active_tasks(self) -> int:
+        return self._busy.measure(time.monotonic())[1]
+
+    def utilization(self) -> "PerfUtilization":
+        """Return the thread time, in milliseconds, spent running tasks and idle over the utilization window."""
+        now = time.monotonic()
+        elapsed = now - max(self._busy.window_start(now), self._created_at)
+        active, _ = self._busy.measure(now)
+        background, _ = self._background.measure(now)
+        capacity = max(self.max_workers * elapsed - background, active)
+        idle = capacity - active
+        return {
+            "idle": idle * 1000,
+            "active": active * 1000,
+            "utilization": active / capacity if capacity > 0 else 0.0,
+        }
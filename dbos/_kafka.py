@@ -1,20 +1,26 @@
 import re
 import threading
-from typing import TYPE_CHECKING, Any, Callable, NoReturn
+from typing import TYPE_CHECKING, Any, Callable, NoReturn, Optional
 
-from confluent_kafka import Consumer, KafkaError, KafkaException
+from confluent_kafka import (
+    Consumer,
+    KafkaError,
+    KafkaException,
+    Message,
+    TopicPartition,
+)
 
 from ._queue import Queue
 
 if TYPE_CHECKING:
     from ._dbos import DBOSRegistry
 
-from ._context import SetWorkflowID
-from ._error import DBOSInitializationError
+from ._error import DBOSException, DBOSInitializationError
 from ._kafka_message import KafkaMessage
 from ._logger import dbos_logger
 
 _KafkaConsumerWorkflow = Callable[[KafkaMessage], None]
+_KafkaBatchConsumerWorkflow = Callable[[list[KafkaMessage]], None]
 
 _kafka_queue: Queue
 _in_order_kafka_queues: dict[str, Queue] = {}
@@ -28,83 +34,269 @@ def safe_group_name(method_name: str, topics: list[str]) -> str:
     return f"dbos-kafka-group-{safe_group_id}"[:255]
 
 
-def _kafka_consumer_loop(
+def _kafka_message(cmsg: Message) -> KafkaMessage:
+    return KafkaMessage(
+        headers=cmsg.headers(),
+        key=cmsg.key(),
+        latency=cmsg.latency(),
+        leader_epoch=cmsg.leader_epoch(),
+        offset=cmsg.offset(),
+        partition=cmsg.partition(),
+        timestamp=cmsg.timestamp(),
+        topic=cmsg.topic(),
+        value=cmsg.value(),
+    )
+
+
+def _enqueue_calls(
+    dbosreg: "DBOSRegistry",
+    func: Callable[..., None],
+    calls: list[tuple[str, str, tuple[Any, ...]]],
+) -> set[str]:
+    # Enqueue calls, each a queue name, workflow ID and args, returning the IDs enqueued
+    from ._core import enqueue_workflows
+
+    assert dbosreg.dbos is not None
+    calls_by_queue: dict[
+        str, list[tuple[Callable[..., Any], str, tuple[Any, ...], dict[str, Any]]]
+    ] = {}
+    for queue_name, workflow_id, args in calls:
+        calls_by_queue.setdefault(queue_name, []).append((func, workflow_id, args, {}))
+    enqueued: set[str] = set()
+    for queue_name, queue_calls in calls_by_queue.items():
+        enqueued.update(enqueue_workflows(dbosreg.dbos, queue_name, queue_calls))
+    return enqueued
+
+
+def _queue_name(msg: KafkaMessage, in_order: bool) -> str:
+    # Messages for in-order processing go to their topic's queue
+    if in_order:
+        assert msg.topic is not None
+        return _in_order_kafka_queues[msg.topic].name
+    return _kafka_queue.name
+
+
+def _enqueue_messages(
+    dbosreg: "DBOSRegistry",
     func: _KafkaConsumerWorkflow,
+    messages: list[KafkaMessage],
+    group_id: str,
+    in_order: bool,
+) -> None:
+    _enqueue_calls(
+        dbosreg,
+        func,
+        [
+            (
+                _queue_name(msg, in_order),
+                f"kafka-unique-id-{msg.topic}-{msg.partition}-{group_id}-{msg.offset}",
+                (msg,),
+            )
+            for msg in messages
+        ],
+    )
+
+
+def _batch_workflow_id(chunk: list[KafkaMessage], group_id: str) -> str:
+    return f"kafka-batch-id-{chunk[0].topic}-{chunk[0].partition}-{group_id}-{chunk[0].offset}"
+
+
+def _enqueue_message_batches(
+    dbosreg: "DBOSRegistry",
+    func: _KafkaBatchConsumerWorkflow,
+    messages: list[KafkaMessage],
+    group_id: str,
+    in_order: bool,
+) -> None:
+    """
+    Enqueue one workflow for the messages of each partition, in offset order.
+
+    A workflow is identified by the first offset of its chunk. Consumption resumes from the offset
+    after a chunk, so when messages are consumed again after a restart or rebalance, each chunk
+    starts where an earlier one did. If that chunk was already enqueued, only the messages after
+    its last offset are enqueued, as a chunk starting after it.
+    """
+    assert dbosreg.dbos is not None
+    chunks: dict[tuple[Optional[str], Optional[int]], list[KafkaMessage]] = {}
+    for msg in messages:
+        chunks.setdefault((msg.topic, msg.partition), []).append(msg)
+    pending = list(chunks.values())
+    while len(pending) > 0:
+        enqueued = _enqueue_calls(
+            dbosreg,
+            func,
+            [
+                (
+                    _queue_name(chunk[0], in_order),
+                    _batch_workflow_id(chunk, group_id),
+                    (chunk,),
+                )
+                for chunk in pending
+            ],
+        )
+        remaining: list[list[KafkaMessage]] = []
+        for chunk in pending:
+            workflow_id = _batch_workflow_id(chunk, group_id)
+            if workflow_id in enqueued:
+                continue
+            record = dbosreg.dbos._sys_db.get_workflow_with_inputs(workflow_id)
+            if record is None or record[1] is None:
+                # Let the consumer loop retry the batch after its backoff
+                raise DBOSException(
+                    f"Cannot enqueue Kafka batch workflow {workflow_id}: it conflicts with a workflow whose messages cannot be read"
+                )
+            last_offset = max(msg.offset or 0 for msg in record[1]["args"][0])
+            rest = [
+                msg
+                for msg in chunk
+                if msg.offset is not None and msg.offset > last_offset
+            ]
+            if len(rest) > 0:
+                remaining.append(rest)
+        pending = remaining
+
+
+def _config_flag(value: Any) -> bool:
+    # Boolean properties may be given as booleans or, as librdkafka also accepts, as strings
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "t", "1")
+    return bool(value)
+
+
+def _consumed_offsets(messages: list[KafkaMessage]) -> list[TopicPartition]:
+    # The offset to commit for a partition is that of the next message to consume
+    offsets: dict[tuple[str, int], int] = {}
+    for msg in messages:
+        assert msg.topic is not None and msg.partition is not None
+        assert msg.offset is not None
+        key = (msg.topic, msg.partition)
+        offsets[key] = max(offsets.get(key, -1), msg.offset + 1)
+    return [
+        TopicPartition(topic, partition, offset)
+        for (topic, partition), offset in offsets.items()
+    ]
+
+
+def _kafka_consumer_loop(
+    dbosreg: "DBOSRegistry",
+    func: Callable[..., None],
     config: dict[str, Any],
     topics: list[str],
     stop_event: threading.Event,
     in_order: bool,
+    max_batch_size: int,
+    batch_linger_secs: float,
+    batch: bool,
+    manual_commit: bool,
 ) -> None:
 
     def on_error(err: KafkaError) -> NoReturn:
         raise KafkaException(err)
 
+    def on_commit(err: Optional[KafkaError], partitions: list[TopicPartition]) -> None:
+        # A failed commit is covered by the next one, or its messages are consumed again and deduplicated
+        if err is not None:
+            dbos_logger.warning(f"Error committing Kafka offsets: {err}")
+
     config["error_cb"] = on_error
     if "auto.offset.reset" not in config:
         config["auto.offset.reset"] = "earliest"
+    if manual_commit:
+        # Offsets are committed as soon as their messages are enqueued
+        config["enable.auto.commit"] = False
+        if "on_commit" not in config:
+            config["on_commit"] = on_commit
+    # Offsets are stored for commit only once their messages are enqueued
+    elif "enable.auto.offset.store" not in config:
+        config["enable.auto.offset.store"] = False
+    store_offsets = not manual_commit and not _config_flag(
+        config["enable.auto.offset.store"]
+    )
 
     if config.get("group.id") is None:
         config["group.id"] = safe_group_name(func.__qualname__, topics)
         dbos_logger.warning(
             f"Consumer group ID not found. Using generated group.id {config['group.id']}"
         )
+    group_id = config["group.id"]
 
     consumer = Consumer(config)
     try:
         consumer.subscribe(topics)
         while not stop_event.is_set():
-            cmsg = consumer.poll(1.0)
+            cmsgs = consumer.consume(
+                num_messages=max_batch_size, timeout=batch_linger_secs
+            )
 
             if stop_event.is_set():
                 return
 
-            if cmsg is None:
-                continue
+            messages: list[KafkaMessage] = []
+            for cmsg in cmsgs:
+                err = cmsg.error()
+                if err is not None:
+                    dbos_logger.error(
+                        f"Kafka error {err.code()} ({err.name()}): {err.str()}"
+                    )
+                    # fatal errors require an updated consumer instance
+                    if err.code() == KafkaError._FATAL or err.fatal():
+                        original_consumer = consumer
+                        try:
+                            consumer = Consumer(config)
+                            consumer.subscribe(topics)
+                        finally:
+                            original_consumer.close()
+                        # The new consumer resumes from the committed offsets
+                        messages = []
+                        break
+                else:
+                    messages.append(_kafka_message(cmsg))
 
-            err = cmsg.error()
-            if err is not None:
-                dbos_logger.error(
-                    f"Kafka error {err.code()} ({err.name()}): {err.str()}"
-                )
-                # fatal errors require an updated consumer instance
-                if err.code() == KafkaError._FATAL or err.fatal():
-                    original_consumer = consumer
-                    try:
-                        consumer = Consumer(config)
-                        consumer.subscribe(topics)
-                    finally:
-                        original_consumer.close()
-            else:
-                msg = KafkaMessage(
-                    headers=cmsg.headers(),
-                    key=cmsg.key(),
-                    latency=cmsg.latency(),
-                    leader_epoch=cmsg.leader_epoch(),
-                    offset=cmsg.offset(),
-                    partition=cmsg.partition(),
-                    timestamp=cmsg.timestamp(),
-                    topic=cmsg.topic(),
-                    value=cmsg.value(),
-                )
-                groupID = config.get("group.id")
-                with SetWorkflowID(
-                    f"kafka-unique-id-{msg.topic}-{msg.partition}-{groupID}-{msg.offset}"
-                ):
-                    if in_order:
-                        assert msg.topic is not None
-                        queue = _in_order_kafka_queues[msg.topic]
-                        queue.enqueue(func, msg)
+            if len(messages) == 0:
+                continue
+            # The batch is retried until it is enqueued, as its messages will not be consumed again
+            while True:
+                try:
+                    if batch:
+                        _enqueue_message_batches(
+                            dbosreg, func, messages, group_id, in_order
+                        )
                     else:
-                        _kafka_queue.enqueue(func, msg)
+                        _enqueue_messages(dbosreg, func, messages, group_id, in_order)
+                    break
+                except Exception as e:
+                    dbos_logger.error(f"Error enqueueing Kafka messages: {e}")
+                    if stop_event.wait(1):
+                        return
+            if manual_commit:
+                consumer.commit(offsets=_consumed_offsets(messages), asynchronous=True)
+            elif store_offsets:
+                consumer.store_offsets(offsets=_consumed_offsets(messages))
 
     finally:
         consumer.close()
 
 
 def kafka_consumer(
-    dbosreg: "DBOSRegistry", config: dict[str, Any], topics: list[str], in_order: bool
-) -> Callable[[_KafkaConsumerWorkflow], _KafkaConsumerWorkflow]:
-    def decorator(func: _KafkaConsumerWorkflow) -> _KafkaConsumerWorkflow:
+    dbosreg: "DBOSRegistry",
+    config: dict[str, Any],
+    topics: list[str],
+    in_order: bool,
+    max_batch_size: int = 1,
+    batch_linger_secs: float = 1.0,
+    batch: bool = False,
+    manual_commit: bool = False,
+    consumer_threads: int = 1,
+) -> Callable[[Callable[..., None]], Callable[..., None]]:
+    def decorator(func: Callable[..., None]) -> Callable[..., None]:
+        if max_batch_size < 1:
+            raise DBOSInitializationError(
+                f"Error: the Kafka consumer batch size must be at least 1 ({max_batch_size})"
+            )
+        if consumer_threads < 1:
+            raise DBOSInitializationError(
+                f"Error: the number of Kafka consumer threads must be at least 1 ({consumer_threads})"
+            )
         if in_order:
             for topic in topics:
                 if topic.startswith("^"):
@@ -117,9 +309,22 @@ def kafka_consumer(
             global _kafka_queue
             _kafka_queue = Queue("_dbos_internal_queue")
         stop_event = threading.Event()
-        dbosreg.register_poller(
-            stop_event, _kafka_consumer_loop, func, config, topics, stop_event, in_order
-        )
+        # Each thread runs its own consumer in the same group, so the group's partitions are divided among them
+        for _ in range(consumer_threads):
+            dbosreg.register_poller(
+                stop_event,
+                _kafka_consumer_loop,
+                dbosreg,
+                func,
+                dict(config),
+                topics,
+                stop_event,
+                in_order,
+                max_batch_size,
+                batch_linger_secs,
+                batch,
+                manual_commit,
+            )
         return func
 
     return decorator
@@ -0,0 +1,358 @@
+import bisect
+import threading
+import time
+import weakref
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from opentelemetry import metrics
+from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+from opentelemetry.metrics import CallbackOptions, Observation
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+
+if TYPE_CHECKING:
+    from ._dbos_config import ConfigFile
+
+
+Labels = Tuple[str, ...]
+
+# Upper bounds, in seconds, of the buckets of latency histograms
+_LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _ThreadShards:
+    """
+    Per-thread values of a metric, indexed by label values.
+
+    Each thread only writes its own shard, so recording a value takes no lock. Collection merges
+    the shards, folding those of finished threads into a retired total so their values are kept.
+    """
+
+    def __init__(self, width: int) -> None:
+        self._width = width
+        self._local = threading.local()
+        # Taken when a thread first records a value, and on collection
+        self._lock = threading.Lock()
+        self._shards: List[
+            Tuple["weakref.ref[threading.Thread]", Dict[Labels, List[float]]]
+        ] = []
+        self._retired: Dict[Labels, List[float]] = {}
+
+    def values(self, labels: Labels) -> List[float]:
+        shard: Optional[Dict[Labels, List[float]]] = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+            self._local.shard = shard
+        values = shard.get(labels)
+        if values is None:
+            values = shard[labels] = [0.0] * self._width
+        return values
+
+    @staticmethod
+    def _merge(
+        into: Dict[Labels, List[float]], shard: Dict[Labels, List[float]]
+    ) -> None:
+        # Copies are taken first, as the shard's thread may be writing to it
+        for labels, values in shard.copy().items():
+            total = into.get(labels)
+            if total is None:
+                into[labels] = list(values)
+            else:
+                for i, value in enumerate(list(values)):
+                    total[i] += value
+
+    def collect(self) -> Dict[Labels, List[float]]:
+        with self._lock:
+            live = []
+            for ref, shard in self._shards:
+                thread = ref()
+                if thread is None or not thread.is_alive():
+                    self._merge(self._retired, shard)
+                else:
+                    live.append((ref, shard))
+            self._shards = live
+            totals = {labels: list(values) for labels, values in self._retired.items()}
+        for _, shard in live:
+            self._merge(totals, shard)
+        return totals
+
+
+def _format_labels(label_names: Sequence[str], labels: Labels, extra: str = "") -> str:
+    pairs = [
+        f'{name}="{_escape_label_value(value)}"'
+        for name, value in zip(label_names, labels)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    """A monotonically increasing count, recorded without locks."""
+
+    def __init__(
+        self, name: str, description: str, label_names: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._shards = _ThreadShards(1)
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._shards.values(labels)[0] += amount
+
+    def collect(self) -> Dict[Labels, float]:
+        return {labels: values[0] for labels, values in self._shards.collect().items()}
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels, value in sorted(self.collect().items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            )
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: "Histogram", labels: Labels) -> None:
+        self._histogram = histogram
+        self._labels = labels
+        self._start_time = 0.0
+
+    def __enter__(self) -> None:
+        self._start_time = time.perf_counter()
+
+    def __exit__(self, *args: Any) -> Literal[False]:
+        self._histogram.observe(time.perf_counter() - self._start_time, *self._labels)
+        return False
+
+
+class Histogram:
+    """A distribution of observed values in cumulative buckets, recorded without locks."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = _LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # A count per bucket, then the count above the last bucket, then the sum
+        self._shards = _ThreadShards(len(self.buckets) + 2)
+
+    def observe(self, value: float, *labels: str) -> None:
+        values = self._shards.values(labels)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def time(self, *labels: str) -> _Timer:
+        """Return a context manager observing how long its body takes, in seconds."""
+        return _Timer(self, labels)
+
+    def collect(self) -> Dict[Labels, List[float]]:
+        return self._shards.collect()
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, values in sorted(self.collect().items()):
+            count = 0.0
+            for bound, bucket_count in zip(
+                [*map(repr, self.buckets), "+Inf"], values[:-1]
+            ):
+                count += bucket_count
+                bucket_labels = _format_labels(
+                    self.label_names, labels, 'le="' + bound + '"'
+                )
+                lines.append(
+                    f"{self.name}_bucket{bucket_labels} {_format_value(count)}"
+                )
+            label_str = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{label_str} {_format_value(count)}")
+        return lines
+
+
+class Gauge:
+    """Values sampled when the metrics are collected."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = (),
+        values: Optional[Dict[Labels, float]] = None,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.values: Dict[Labels, float] = values if values is not None else {}
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} gauge",
+        ]
+        for labels, value in sorted(self.values.items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            )
+        return lines
+
+
+class DBOSMetrics:
+
+    def __init__(self) -> None:
+        self.meter = metrics.get_meter("dbos-meter")
+        # Collected in-process, and served by the admin server in the Prometheus text format
+        self.workflows_started = Counter(
+            "dbos_workflows_started_total", "Workflow executions started", ["name"]
+        )
+        self.workflows_completed = Counter(
+            "dbos_workflows_completed_total",
+            "Workflow executions that succeeded",
+            ["name"],
+        )
+        self.workflows_failed = Counter(
+            "dbos_workflows_failed_total",
+            "Workflow executions that raised an error",
+            ["name"],
+        )
+        self.step_duration = Histogram(
+            "dbos_step_duration_seconds",
+            "Time spent running steps, including retries",
+            ["name"],
+        )
+        self.transaction_duration = Histogram(
+            "dbos_transaction_duration_seconds",
+            "Time spent running transactions, including serialization retries",
+            ["name"],
+        )
+        self.sys_db_statement_duration = Histogram(
+            "dbos_system_db_statement_duration_seconds",
+            "Time spent executing system database statements",
+            ["operation"],
+        )
+        self.queue_wait = Histogram(
+            "dbos_queue_wait_seconds",
+            "Time from enqueueing a workflow until an executor dequeues it",
+            ["queue"],
+        )
+        self.pool_checkouts = Counter(
+            "dbos_db_pool_checkouts_total",
+            "Database connections checked out from a pool",
+            ["pool"],
+        )
+        self.pool_checkout_wait = Histogram(
+            "dbos_db_pool_checkout_wait_seconds",
+            "Time spent waiting to check out a database connection from a pool",
+            ["pool"],
+        )
+        self.status_cache_hits = Counter(
+            "dbos_workflow_status_cache_hits_total",
+            "Workflow status lookups answered from the terminal status cache",
+        )
+        self.status_cache_misses = Counter(
+            "dbos_workflow_status_cache_misses_total",
+            "Workflow status lookups that had to query the system database",
+        )
+        self._pool_saturation_sources: List[Callable[[], Iterable[Observation]]] = []
+        self.meter.create_observable_gauge(
+            "dbos.db.pool.saturation",
+            callbacks=[self._observe_pool_saturation],
+            unit="1",
+            description="Fraction of a pool's connections (including overflow) that are checked out",
+        )
+
+    def config(self, config: "ConfigFile") -> None:
+        if not isinstance(metrics.get_meter_provider(), MeterProvider):
+            otlp_metrics_endpoint = (
+                config.get("telemetry", {}).get("OTLPExporter", {}).get("metricsEndpoint")  # type: ignore
+            )
+            if otlp_metrics_endpoint:
+                reader = PeriodicExportingMetricReader(
+                    OTLPMetricExporter(endpoint=otlp_metrics_endpoint)
+                )
+                metrics.set_meter_provider(MeterProvider(metric_readers=[reader]))
+
+    def add_pool_saturation_source(
+        self, source: Callable[[], Iterable[Observation]]
+    ) -> None:
+        self._pool_saturation_sources.append(source)
+
+    def _observe_pool_saturation(
+        self, options: Optional[CallbackOptions] = None
+    ) -> Iterable[Observation]:
+        for source in self._pool_saturation_sources:
+            yield from source()
+
+    def render_prometheus(self, gauges: Iterable[Gauge] = ()) -> str:
+        """Render the in-process metrics and the given gauges in the Prometheus text format."""
+        metrics: List[Any] = [
+            self.workflows_started,
+            self.workflows_completed,
+            self.workflows_failed,
+            self.step_duration,
+            self.transaction_duration,
+            self.sys_db_statement_duration,
+            self.queue_wait,
+            self.pool_checkouts,
+            self.pool_checkout_wait,
+            self.status_cache_hits,
+            self.status_cache_misses,
+            *gauges,
+        ]
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+dbos_metrics = DBOSMetrics()
@@ -50,7 +50,12 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # Set when the system tables are colocated in the application database
+            version_table_schema=config.get_main_option("version_table_schema"),
+        )
 
         with context.begin_transaction():
             context.run_migrations()
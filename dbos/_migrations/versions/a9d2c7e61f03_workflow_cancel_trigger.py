@@ -0,0 +1,52 @@
+"""
+Notify when a workflow is cancelled or resumed.
+
+Revision ID: a9d2c7e61f03
+Revises: f4b9b32ba814
+Create Date: 2025-02-05 16:48:12.503117
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a9d2c7e61f03"
+down_revision: Union[str, None] = "f4b9b32ba814"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+      CREATE OR REPLACE FUNCTION dbos.workflow_cancel_function() RETURNS TRIGGER AS $$
+      DECLARE
+          payload text := NEW.workflow_uuid || '::' || NEW.status;
+      BEGIN
+          PERFORM pg_notify('dbos_workflow_cancel_channel', payload);
+          RETURN NEW;
+      END;
+      $$ LANGUAGE plpgsql;
+               """
+    )
+    # Fires when a workflow is cancelled, and when a cancelled workflow is resumed
+    op.execute(
+        """
+      CREATE TRIGGER dbos_workflow_cancel_trigger
+      AFTER UPDATE OF status ON dbos.workflow_status
+      FOR EACH ROW
+      WHEN (
+          OLD.status IS DISTINCT FROM NEW.status
+          AND (NEW.status = 'CANCELLED' OR (OLD.status = 'CANCELLED' AND NEW.status = 'PENDING'))
+      )
+      EXECUTE FUNCTION dbos.workflow_cancel_function();
+               """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TRIGGER IF EXISTS dbos_workflow_cancel_trigger ON dbos.workflow_status;"
+    )
+    op.execute("DROP FUNCTION IF EXISTS dbos.workflow_cancel_function;")
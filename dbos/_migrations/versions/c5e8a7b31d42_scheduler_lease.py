@@ -0,0 +1,32 @@
+"""
+Add a lease table so one executor at a time can be elected to fire schedules.
+
+Revision ID: c5e8a7b31d42
+Revises: a9d2c7e61f03
+Create Date: 2025-02-10 11:02:37.224816
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e8a7b31d42"
+down_revision: Union[str, None] = "a9d2c7e61f03"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduler_lease",
+        sa.Column("lease_name", sa.Text(), primary_key=True, nullable=False),
+        sa.Column("owner", sa.Text(), nullable=False),
+        sa.Column("expires_at_epoch_ms", sa.BigInteger(), nullable=False),
+        schema="dbos",
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scheduler_lease", schema="dbos")
@@ -0,0 +1,47 @@
+"""
+Notify when a terminal workflow status changes.
+
+Revision ID: f4b9b32ba814
+Revises: 04ca4f231047
+Create Date: 2025-02-03 10:21:37.118204
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4b9b32ba814"
+down_revision: Union[str, None] = "04ca4f231047"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+      CREATE OR REPLACE FUNCTION dbos.workflow_status_function() RETURNS TRIGGER AS $$
+      BEGIN
+          PERFORM pg_notify('dbos_workflow_status_channel', NEW.workflow_uuid);
+          RETURN NEW;
+      END;
+      $$ LANGUAGE plpgsql;
+               """
+    )
+    # Processes cache terminal statuses, so only changes to those need a notification
+    op.execute(
+        """
+      CREATE TRIGGER dbos_workflow_status_trigger
+      AFTER UPDATE ON dbos.workflow_status
+      FOR EACH ROW
+      WHEN (OLD.status IN ('SUCCESS', 'ERROR', 'CANCELLED', 'RETRIES_EXCEEDED'))
+      EXECUTE FUNCTION dbos.workflow_status_function();
+               """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TRIGGER IF EXISTS dbos_workflow_status_trigger ON dbos.workflow_status;"
+    )
+    op.execute("DROP FUNCTION IF EXISTS dbos.workflow_status_function;")
@@ -7,7 +7,7 @@ from sqlalchemy.exc import OperationalError
 
 from dbos._utils import GlobalParams
 
-from ._core import P, R, execute_workflow_by_id, start_workflow
+from ._core import P, R, execute_workflow_from_record, start_workflow
 
 if TYPE_CHECKING:
     from ._dbos import DBOS, Workflow, WorkflowHandle
@@ -73,11 +73,17 @@ def queue_thread(stop_event: threading.Event, dbos: "DBOS") -> None:
             return
         for _, queue in dbos._registry.queue_info_map.items():
             try:
-                wf_ids = dbos._sys_db.start_queued_workflows(
+                # Claiming the workflows also returns their statuses and inputs
+                records = dbos._sys_db.start_queued_workflows(
                     queue, GlobalParams.executor_id
                 )
-                for id in wf_ids:
-                    execute_workflow_by_id(dbos, id)
+                for id, record in records.items():
+                    try:
+                        execute_workflow_from_record(dbos, id, record)
+                    except Exception:
+                        dbos.logger.warning(
+                            f"Exception encountered starting dequeued workflow {id}: {traceback.format_exc()}"
+                        )
             except OperationalError as e:
                 # Ignore serialization error
                 if not isinstance(
@@ -2,17 +2,54 @@ import os
 import threading
 import time
 import traceback
-from typing import TYPE_CHECKING, Any, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List
 
 from dbos._utils import GlobalParams
 
-from ._core import execute_workflow_by_id
+from ._core import execute_workflow_by_id, execute_workflow_from_record
 from ._error import DBOSWorkflowFunctionNotFoundError
 from ._sys_db import GetPendingWorkflowsOutput
 
 if TYPE_CHECKING:
     from ._dbos import DBOS, WorkflowHandle
 
+# Statuses and inputs are fetched for this many pending workflows at a time
+_RECOVERY_BATCH_SIZE = 1000
+_DEFAULT_RECOVERY_CONCURRENCY = 8
+
+
+def _recover_batch(
+    dbos: "DBOS", pool: ThreadPoolExecutor, workflow_ids: List[str]
+) -> List[str]:
+    """Recover a batch of workflows concurrently, returning those whose functions are not registered yet."""
+    try:
+        records = dbos._sys_db.get_workflows_with_inputs(workflow_ids)
+    except Exception:
+        dbos.logger.error(
+            f"Exception encountered when fetching workflows to recover: {traceback.format_exc()}"
+        )
+        return workflow_ids
+
+    futures: Dict[str, Future["WorkflowHandle[Any]"]] = {
+        workflow_id: pool.submit(
+            execute_workflow_from_record, dbos, workflow_id, records.get(workflow_id)
+        )
+        for workflow_id in workflow_ids
+    }
+    not_found: List[str] = []
+    for workflow_id, future in futures.items():
+        # A failure only affects its own workflow
+        try:
+            future.result()
+        except DBOSWorkflowFunctionNotFoundError:
+            not_found.append(workflow_id)
+        except Exception:
+            dbos.logger.error(
+                f"Exception encountered when recovering workflow {workflow_id}: {traceback.format_exc()}"
+            )
+    return not_found
+
 
 def startup_recovery_thread(
     dbos: "DBOS", pending_workflows: List[GetPendingWorkflowsOutput]
@@ -20,24 +57,51 @@ def startup_recovery_thread(
     """Attempt to recover local pending workflows on startup using a background thread."""
     stop_event = threading.Event()
     dbos.stop_events.append(stop_event)
-    while not stop_event.is_set() and len(pending_workflows) > 0:
+
+    # Workflows dequeued before the restart go back to their queues instead of running here
+    queued_ids = [
+        pending_workflow.workflow_uuid
+        for pending_workflow in pending_workflows
+        if pending_workflow.queue_name
+        and pending_workflow.queue_name != "_dbos_internal_queue"
+    ]
+    workflow_ids = [
+        pending_workflow.workflow_uuid
+        for pending_workflow in pending_workflows
+        if not pending_workflow.queue_name
+        or pending_workflow.queue_name == "_dbos_internal_queue"
+    ]
+    while not stop_event.is_set() and len(queued_ids) > 0:
         try:
-            for pending_workflow in list(pending_workflows):
-                if (
-                    pending_workflow.queue_name
-                    and pending_workflow.queue_name != "_dbos_internal_queue"
-                ):
-                    dbos._sys_db.clear_queue_assignment(pending_workflow.workflow_uuid)
-                    continue
-                execute_workflow_by_id(dbos, pending_workflow.workflow_uuid)
-                pending_workflows.remove(pending_workflow)
-        except DBOSWorkflowFunctionNotFoundError:
-            time.sleep(1)
-        except Exception as e:
+            dbos._sys_db.clear_queue_assignments(queued_ids)
+            queued_ids = []
+        except Exception:
             dbos.logger.error(
-                f"Exception encountered when recovering workflows: {traceback.format_exc()}"
+                f"Exception encountered when requeueing workflows: {traceback.format_exc()}"
             )
-            raise e
+            time.sleep(1)
+
+    concurrency = (
+        dbos.config.get("runtimeConfig", {}).get("recovery_concurrency")
+        or _DEFAULT_RECOVERY_CONCURRENCY
+    )
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="dbos-recovery"
+    ) as pool:
+        while not stop_event.is_set() and len(workflow_ids) > 0:
+            # Workflows whose functions are not registered yet are retried after the others
+            retry_ids: List[str] = []
+            for i in range(0, len(workflow_ids), _RECOVERY_BATCH_SIZE):
+                if stop_event.is_set():
+                    return
+                retry_ids.extend(
+                    _recover_batch(
+                        dbos, pool, workflow_ids[i : i + _RECOVERY_BATCH_SIZE]
+                    )
+                )
+            workflow_ids = retry_ids
+            if len(workflow_ids) > 0:
+                time.sleep(1)
 
 
 def recover_pending_workflows(
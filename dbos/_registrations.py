@@ -51,6 +51,7 @@ class DBOSFuncInfo:
     func_type: DBOSFuncType = DBOSFuncType.Unknown
     required_roles: Optional[List[str]] = None
     max_recovery_attempts: int = DEFAULT_MAX_RECOVERY_ATTEMPTS
+    relaxed_status: bool = False
 
 
 def get_or_create_class_info(cls: Type[Any]) -> DBOSClassInfo:
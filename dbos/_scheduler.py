@@ -1,57 +1,326 @@
+import heapq
+import itertools
 import threading
+import time
+import uuid
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Literal, Tuple
 
 from ._logger import dbos_logger
 from ._queue import Queue
+from ._registrations import get_dbos_func_name
+from ._utils import GlobalParams
 
 if TYPE_CHECKING:
     from ._dbos import DBOSRegistry
 
-from ._context import SetWorkflowID
-from ._croniter import croniter  # type: ignore
+from ._croniter import CompiledCron  # type: ignore
 
 ScheduledWorkflow = Callable[[datetime, datetime], None]
 
+# What to do with the firings a schedule missed while no scheduler was running:
+#   "skip" drops them, "latest" runs only the most recent one,
+#   and "all" runs them all, up to the most recent `catch_up_limit`.
+SchedulerCatchUp = Literal["skip", "latest", "all"]
+_catch_up_policies = ("skip", "latest", "all")
+
+_DEFAULT_SCHEDULER_LEASE_SECS = 15.0
+
 scheduler_queue: Queue
 
 
-def scheduler_loop(
-    func: ScheduledWorkflow, cron: str, stop_event: threading.Event
-) -> None:
-    try:
-        iter = croniter(cron, datetime.now(timezone.utc), second_at_beginning=True)
-    except Exception as e:
-        dbos_logger.error(
-            f'Cannot run scheduled function {func.__name__}. Invalid crontab "{cron}"'
-        )
-    while not stop_event.is_set():
-        nextExecTime = iter.get_next(datetime)
-        sleepTime = nextExecTime - datetime.now(timezone.utc)
-        if stop_event.wait(timeout=sleepTime.total_seconds()):
-            return
-        with SetWorkflowID(f"sched-{func.__qualname__}-{nextExecTime.isoformat()}"):
+class _Schedule:
+    def __init__(
+        self,
+        func: ScheduledWorkflow,
+        cron: str,
+        catch_up: SchedulerCatchUp,
+        catch_up_limit: int,
+    ) -> None:
+        self.func = func
+        self.cron = CompiledCron(cron, second_at_beginning=True)
+        self.name = get_dbos_func_name(func)
+        self.catch_up = catch_up
+        self.catch_up_limit = catch_up_limit
+        self.next_time = datetime.min
+
+    def start(self, start_time: datetime) -> None:
+        self.next_time = self.cron.get_next(start_time)
+
+    def advance(self) -> None:
+        self.next_time = self.cron.get_next(self.next_time)
+
+    def missed(self, last_run_time: datetime, now: datetime) -> List[datetime]:
+        """Return the fire times after the last run and before now to catch up on, oldest first."""
+        if self.catch_up == "skip":
+            return []
+        limit = 1 if self.catch_up == "latest" else self.catch_up_limit
+        # Walk back from now, so a long downtime costs no more than the limit
+        missed: List[datetime] = []
+        for fire_time in self.cron.iter_prev(now):
+            if fire_time <= last_run_time or len(missed) >= limit:
+                break
+            missed.append(fire_time)
+        missed.reverse()
+        return missed
+
+
+class _SchedulerStopEvent(threading.Event):
+    # Setting the stop event also wakes the scheduler thread, so it stops immediately
+    def __init__(self, scheduler: "Scheduler") -> None:
+        super().__init__()
+        self._scheduler = scheduler
+
+    def set(self) -> None:
+        super().set()
+        self._scheduler._on_stop()
+
+
+class Scheduler:
+    """
+    Fires the workflows of every `@DBOS.scheduled` function from a single thread.
+
+    The schedules are kept in a min-heap ordered by their next fire time. The thread sleeps until
+    the earliest one is due, then enqueues every due workflow in one batch.
+
+    The last run time of each schedule is recorded in the system database. When a schedule
+    starts, the firings it missed since then are enqueued according to its catch-up policy.
+
+    With leader election enabled, only the executor holding the scheduler lease in the system
+    database fires schedules. The holder renews the lease every third of its duration, and the
+    other executors try to take it just as often, so an expired lease is taken over within
+    about 4/3 of the lease duration. A new leader catches up on missed firings.
+    """
+
+    def __init__(self, dbosreg: "DBOSRegistry") -> None:
+        self.dbosreg = dbosreg
+        self._cond = threading.Condition()
+        self.stop_event: threading.Event = _SchedulerStopEvent(self)
+        # Entries are (next fire time, insertion order, schedule); the order breaks ties
+        self._heap: List[Tuple[datetime, int, _Schedule]] = []
+        self._counter = itertools.count()
+        # Schedules added but not started yet; they are started by the scheduler thread
+        self._waiting: List[_Schedule] = []
+        self._leader_election = False
+        self._lease_secs = _DEFAULT_SCHEDULER_LEASE_SECS
+        # Unique to this scheduler, as executors do not always have distinct IDs
+        self._lease_owner = f"{GlobalParams.executor_id}-{uuid.uuid4()}"
+        self._is_leader = False
+        self._lease_checked_at = float("-inf")
+
+    def add(
+        self,
+        func: ScheduledWorkflow,
+        cron: str,
+        catch_up: SchedulerCatchUp = "skip",
+        catch_up_limit: int = 100,
+    ) -> None:
+        schedule = _Schedule(func, cron, catch_up, catch_up_limit)
+        with self._cond:
+            self._waiting.append(schedule)
+            self._cond.notify_all()
+
+    def _push(self, schedule: _Schedule) -> None:
+        heapq.heappush(self._heap, (schedule.next_time, next(self._counter), schedule))
+
+    def _lease_check_in(self) -> float:
+        return self._lease_checked_at + self._lease_secs / 3 - time.monotonic()
+
+    def _take_work(self) -> Tuple[List[_Schedule], List[_Schedule]]:
+        # Wait until schedules are waiting to start or are due, then take them all.
+        # Returns empty lists once stopped, or when the lease is due to be checked.
+        with self._cond:
+            while not self.stop_event.is_set():
+                lease_check_in = self._lease_check_in()
+                if self._leader_election and lease_check_in <= 0:
+                    return [], []
+                if len(self._waiting) > 0:
+                    waiting = self._waiting
+                    self._waiting = []
+                    return waiting, []
+                now = datetime.now(timezone.utc)
+                if len(self._heap) > 0 and self._heap[0][0] <= now:
+                    due: List[_Schedule] = []
+                    while len(self._heap) > 0 and self._heap[0][0] <= now:
+                        due.append(heapq.heappop(self._heap)[2])
+                    return [], due
+                timeout = (
+                    (self._heap[0][0] - now).total_seconds()
+                    if len(self._heap) > 0
+                    else None
+                )
+                if self._leader_election:
+                    timeout = (
+                        lease_check_in
+                        if timeout is None
+                        else min(timeout, lease_check_in)
+                    )
+                self._cond.wait(timeout=timeout)
+            return [], []
+
+    def run(self) -> None:
+        if self.dbosreg.dbos is not None:
+            runtime_config = self.dbosreg.dbos.config.get("runtimeConfig", {})
+            self._leader_election = bool(
+                runtime_config.get("scheduler_leader_election")
+            )
+            self._lease_secs = (
+                runtime_config.get("scheduler_lease_secs")
+                or _DEFAULT_SCHEDULER_LEASE_SECS
+            )
+
+        while not self.stop_event.is_set():
+            waiting, due = self._take_work()
+            if self._check_lease():
+                # Catch up on what was missed while no executor was leading
+                with self._cond:
+                    schedules = [entry[2] for entry in self._heap]
+                self._catch_up(schedules + due, datetime.now(timezone.utc))
+            if len(waiting) > 0:
+                self._start(waiting)
+            if len(due) > 0:
+                if self._leading():
+                    self._fire([(schedule, schedule.next_time) for schedule in due])
+                with self._cond:
+                    for schedule in due:
+                        schedule.advance()
+                        self._push(schedule)
+
+    def _leading(self) -> bool:
+        return not self._leader_election or self._is_leader
+
+    def _check_lease(self) -> bool:
+        # Take or renew the lease when it is due to be checked. Returns whether this scheduler just became the leader.
+        if (
+            not self._leader_election
+            or self.dbosreg.dbos is None
+            or self.stop_event.is_set()
+            or self._lease_check_in() > 0
+        ):
+            return False
+        self._lease_checked_at = time.monotonic()
+        was_leader = self._is_leader
+        try:
+            self._is_leader = self.dbosreg.dbos._sys_db.acquire_scheduler_lease(
+                self._lease_owner, self._lease_secs
+            )
+        except Exception as e:
+            dbos_logger.warning(f"Error acquiring scheduler lease: {e}")
+            self._is_leader = False
+        if self._is_leader != was_leader:
+            dbos_logger.info(
+                f"Executor {GlobalParams.executor_id} "
+                + ("is now" if self._is_leader else "is no longer")
+                + " the scheduler leader"
+            )
+        return self._is_leader and not was_leader
+
+    def _on_stop(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+        # Give up the lease so that another executor takes over without waiting for it to expire
+        if self._is_leader and self.dbosreg.dbos is not None:
+            self._is_leader = False
+            try:
+                self.dbosreg.dbos._sys_db.release_scheduler_lease(self._lease_owner)
+            except Exception as e:
+                dbos_logger.warning(f"Error releasing scheduler lease: {e}")
+
+    def _start(self, schedules: List[_Schedule]) -> None:
+        # Catch up on the firings missed since each schedule last ran, then schedule from now on
+        now = datetime.now(timezone.utc)
+        if self._leading():
+            self._catch_up(schedules, now)
+        for schedule in schedules:
+            schedule.start(now)
+        with self._cond:
+            for schedule in schedules:
+                self._push(schedule)
+
+    def _catch_up(self, schedules: List[_Schedule], now: datetime) -> None:
+        last_run_times: Dict[str, int] = {}
+        if self.dbosreg.dbos is not None and any(
+            schedule.catch_up != "skip" for schedule in schedules
+        ):
             try:
-                scheduler_queue.enqueue(func, nextExecTime, datetime.now(timezone.utc))
+                last_run_times = self.dbosreg.dbos._sys_db.get_scheduler_state(
+                    [schedule.name for schedule in schedules]
+                )
             except Exception as e:
-                dbos_logger.warning(f"Error scheduling workflow: ", e)
+                dbos_logger.warning(f"Error reading scheduler state: {e}")
+        missed: List[Tuple[_Schedule, datetime]] = []
+        for schedule in schedules:
+            if schedule.name in last_run_times:
+                last_run_time = datetime.fromtimestamp(
+                    last_run_times[schedule.name] / 1000, tz=timezone.utc
+                )
+                missed.extend(
+                    (schedule, fire_time)
+                    for fire_time in schedule.missed(last_run_time, now)
+                )
+        if len(missed) > 0:
+            self._fire(missed)
+
+    def _fire(self, firings: List[Tuple[_Schedule, datetime]]) -> None:
+        from ._core import enqueue_workflows
+
+        if self.dbosreg.dbos is None:
+            return
+        now = datetime.now(timezone.utc)
+        calls: List[
+            Tuple["Callable[..., Any]", str, Tuple[Any, ...], Dict[str, Any]]
+        ] = [
+            (
+                schedule.func,
+                f"sched-{schedule.func.__qualname__}-{fire_time.isoformat()}",
+                (fire_time, now),
+                {},
+            )
+            for schedule, fire_time in firings
+        ]
+        last_run_times: Dict[str, int] = {}
+        for schedule, fire_time in firings:
+            last_run_times[schedule.name] = max(
+                last_run_times.get(schedule.name, 0),
+                int(fire_time.timestamp() * 1000),
+            )
+        try:
+            enqueue_workflows(self.dbosreg.dbos, scheduler_queue.name, calls)
+            # Only recorded once enqueued, so failed firings are caught up on later
+            self.dbosreg.dbos._sys_db.update_scheduler_state(last_run_times)
+        except Exception as e:
+            dbos_logger.warning(f"Error scheduling workflows: {e}")
 
 
 def scheduled(
-    dbosreg: "DBOSRegistry", cron: str
+    dbosreg: "DBOSRegistry",
+    cron: str,
+    catch_up: SchedulerCatchUp = "skip",
+    catch_up_limit: int = 100,
 ) -> Callable[[ScheduledWorkflow], ScheduledWorkflow]:
     def decorator(func: ScheduledWorkflow) -> ScheduledWorkflow:
         try:
-            croniter(cron, datetime.now(timezone.utc), second_at_beginning=True)
+            CompiledCron(cron, second_at_beginning=True)
         except Exception as e:
             raise ValueError(
                 f'Invalid crontab "{cron}" for scheduled function function {func.__name__}.'
             )
+        if catch_up not in _catch_up_policies:
+            raise ValueError(
+                f'Invalid catch-up policy "{catch_up}" for scheduled function {func.__name__}.'
+            )
+        if catch_up_limit < 1:
+            raise ValueError(
+                f"Invalid catch-up limit {catch_up_limit} for scheduled function {func.__name__}."
+            )
 
         global scheduler_queue
         scheduler_queue = Queue("_dbos_internal_queue")
-        stop_event = threading.Event()
-        dbosreg.register_poller(stop_event, scheduler_loop, func, cron, stop_event)
+        # All scheduled functions share one scheduler thread
+        if dbosreg.scheduler is None or dbosreg.scheduler.stop_event.is_set():
+            dbosreg.scheduler = Scheduler(dbosreg)
+            dbosreg.register_poller(dbosreg.scheduler.stop_event, dbosreg.scheduler.run)
+        dbosreg.scheduler.add(func, cron, catch_up, catch_up_limit)
         return func
 
     return decorator
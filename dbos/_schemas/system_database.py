@@ -142,6 +142,14 @@ class SystemSchema:
         Column("last_run_time", BigInteger, nullable=False),
     )
 
+    scheduler_lease = Table(
+        "scheduler_lease",
+        metadata_obj,
+        Column("lease_name", Text, primary_key=True, nullable=False),
+        Column("owner", Text, nullable=False),
+        Column("expires_at_epoch_ms", BigInteger, nullable=False),
+    )
+
     workflow_queue = Table(
         "workflow_queue",
         metadata_obj,
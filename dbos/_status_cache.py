@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from ._metrics import dbos_metrics
+
+if TYPE_CHECKING:
+    from ._sys_db import WorkflowStatusInternal
+
+# A workflow in one of these statuses only changes status again if it is cancelled or resumed
+TERMINAL_STATUSES = frozenset(["SUCCESS", "ERROR", "CANCELLED", "RETRIES_EXCEEDED"])
+
+
+class WorkflowStatusCache:
+    """
+    A bounded LRU cache of workflow statuses that are terminal, with a time-to-live.
+
+    Entries must be invalidated whenever the status row changes, so the cache is only used while
+    notifications of other processes' changes are being received. The TTL additionally bounds
+    how long an entry can be stale if an invalidation is missed.
+    """
+
+    def __init__(self, max_entries: int, ttl_secs: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_secs = ttl_secs
+        self._entries: "OrderedDict[str, Tuple[float, WorkflowStatusInternal]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        # Bumped by every invalidation. A read is cached only if its workflow was not invalidated
+        # since the version it started at, so writes to other workflows do not prevent caching.
+        self._version = 0
+        # The version at which each recently invalidated workflow was last invalidated, oldest first.
+        # Reads that started before the floor may have missed a forgotten invalidation.
+        self._invalidated_at: "OrderedDict[str, int]" = OrderedDict()
+        self._floor = 0
+        self._active = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._active and self.max_entries > 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get(self, workflow_id: str) -> "Optional[WorkflowStatusInternal]":
+        with self._lock:
+            entry = self._entries.get(workflow_id)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[workflow_id]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(workflow_id)
+        if entry is None:
+            dbos_metrics.status_cache_misses.inc()
+            return None
+        dbos_metrics.status_cache_hits.inc()
+        return entry[1].copy()
+
+    def put(self, status: "WorkflowStatusInternal", version: int) -> None:
+        """Cache a status read when the cache was at the given version, if it is terminal."""
+        if status["status"] not in TERMINAL_STATUSES:
+            return
+        with self._lock:
+            if (
+                version < self._floor
+                or self._invalidated_at.get(status["workflow_uuid"], 0) > version
+            ):
+                return
+            self._entries[status["workflow_uuid"]] = (
+                time.monotonic() + self.ttl_secs,
+                status.copy(),
+            )
+            self._entries.move_to_end(status["workflow_uuid"])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, workflow_id: str) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.pop(workflow_id, None)
+            self._invalidated_at[workflow_id] = self._version
+            self._invalidated_at.move_to_end(workflow_id)
+            while len(self._invalidated_at) > max(self.max_entries, 1):
+                _, self._floor = self._invalidated_at.popitem(last=False)
+
+    def set_active(self, active: bool) -> None:
+        """Start or stop using the cache, as change notifications start or stop being received."""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._invalidated_at.clear()
+            self._floor = self._version
+            self._active = active
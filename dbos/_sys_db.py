@@ -1,4 +1,5 @@
 import datetime
+import itertools
 import logging
 import os
 import re
@@ -8,6 +9,7 @@ from enum import Enum
 from typing import (
     TYPE_CHECKING,
     Any,
+    Callable,
     Dict,
     List,
     Literal,
@@ -26,10 +28,13 @@ from alembic import command
 from alembic.config import Config
 from sqlalchemy.exc import DBAPIError
 from sqlalchemy.sql import func
+from sqlalchemy.sql.expression import UpdateBase
 
 from dbos._utils import GlobalParams
 
 from . import _serialization
+from ._buffer_spill import WorkflowBufferSpill
+from ._db_pool import create_pooled_engine
 from ._dbos_config import ConfigFile
 from ._error import (
     DBOSConflictingWorkflowError,
@@ -39,8 +44,10 @@ from ._error import (
     DBOSWorkflowConflictIDError,
 )
 from ._logger import dbos_logger
+from ._metrics import dbos_metrics
 from ._registrations import DEFAULT_MAX_RECOVERY_ATTEMPTS
 from ._schemas.system_database import SystemSchema
+from ._status_cache import WorkflowStatusCache
 
 if TYPE_CHECKING:
     from ._queue import Queue
@@ -171,6 +178,437 @@ class WorkflowInformation(TypedDict, total=False):
 _dbos_null_topic = "__null__topic__"
 _buffer_flush_batch_size = 100
 _buffer_flush_interval_secs = 1.0
+_max_buffer_bytes = 32 * 1024 * 1024
+# Rewrite the spill file once it holds this many times the buffer's memory cap
+_spill_compaction_factor = 4
+_status_cache_max_entries = 10000
+_status_cache_ttl_secs = 60.0
+# Postgres accepts at most this many bind parameters in one statement
+_max_bind_params = 65535
+
+# Hot-path statements are built once with bound parameters, so each call skips statement
+# construction and hits the compiled statement cache. The dbos_prepare execution option
+# additionally prepares them server-side on first use on each connection (see _db_pool).
+_prepare: Dict[str, Any] = {"dbos_prepare": True}
+
+_workflow_status_upsert = pg.insert(SystemSchema.workflow_status)
+_insert_workflow_status_sql = (
+    _workflow_status_upsert.on_conflict_do_update(
+        index_elements=["workflow_uuid"],
+        set_=dict(
+            executor_id=_workflow_status_upsert.excluded.executor_id,
+            recovery_attempts=(SystemSchema.workflow_status.c.recovery_attempts + 1),
+            updated_at=func.extract("epoch", func.now()) * 1000,
+        ),
+    )
+    .returning(
+        SystemSchema.workflow_status.c.recovery_attempts,
+        SystemSchema.workflow_status.c.status,
+        SystemSchema.workflow_status.c.name,
+        SystemSchema.workflow_status.c.class_name,
+        SystemSchema.workflow_status.c.config_name,
+        SystemSchema.workflow_status.c.queue_name,
+        # xmax is zero only for a freshly inserted row, not one updated on conflict
+        sa.literal_column("(xmax = 0)").label("inserted"),
+    )
+    .execution_options(**_prepare)
+)
+_update_workflow_status_sql = _workflow_status_upsert.on_conflict_do_update(
+    index_elements=["workflow_uuid"],
+    set_=dict(
+        status=_workflow_status_upsert.excluded.status,
+        output=_workflow_status_upsert.excluded.output,
+        error=_workflow_status_upsert.excluded.error,
+        updated_at=func.extract("epoch", func.now()) * 1000,
+    ),
+).execution_options(**_prepare)
+
+
+def _upsert_workflow_statuses_sql(rows: List[Dict[str, Any]]) -> UpdateBase:
+    # Multi-row form of _update_workflow_status_sql, for flushing the status buffer
+    upsert = pg.insert(SystemSchema.workflow_status).values(rows)
+    return upsert.on_conflict_do_update(
+        index_elements=["workflow_uuid"],
+        set_=dict(
+            status=upsert.excluded.status,
+            output=upsert.excluded.output,
+            error=upsert.excluded.error,
+            updated_at=func.extract("epoch", func.now()) * 1000,
+        ),
+    )
+
+
+# The columns of a WorkflowStatusInternal, in the order _workflow_status_from_row reads them
+_workflow_status_columns = [
+    SystemSchema.workflow_status.c.status,
+    SystemSchema.workflow_status.c.name,
+    SystemSchema.workflow_status.c.request,
+    SystemSchema.workflow_status.c.recovery_attempts,
+    SystemSchema.workflow_status.c.config_name,
+    SystemSchema.workflow_status.c.class_name,
+    SystemSchema.workflow_status.c.authenticated_user,
+    SystemSchema.workflow_status.c.authenticated_roles,
+    SystemSchema.workflow_status.c.assumed_role,
+    SystemSchema.workflow_status.c.queue_name,
+    SystemSchema.workflow_status.c.executor_id,
+    SystemSchema.workflow_status.c.created_at,
+    SystemSchema.workflow_status.c.updated_at,
+    SystemSchema.workflow_status.c.application_version,
+    SystemSchema.workflow_status.c.application_id,
+]
+
+
+def _insert_new_workflow_statuses_sql(rows: List[Dict[str, Any]]) -> UpdateBase:
+    # Inserts only workflows that do not exist yet, returning their IDs
+    return (
+        pg.insert(SystemSchema.workflow_status)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["workflow_uuid"])
+        .returning(SystemSchema.workflow_status.c.workflow_uuid)
+    )
+
+
+def _insert_workflow_inputs_sql(rows: List[Dict[str, Any]]) -> UpdateBase:
+    return (
+        pg.insert(SystemSchema.workflow_inputs)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["workflow_uuid"])
+    )
+
+
+def _enqueue_many_sql(rows: List[Dict[str, Any]]) -> UpdateBase:
+    return pg.insert(SystemSchema.workflow_queue).values(rows).on_conflict_do_nothing()
+
+
+def _upsert_scheduler_state_sql(rows: List[Dict[str, Any]]) -> UpdateBase:
+    # The recorded run time only moves forward, whichever process records it
+    stmt = pg.insert(SystemSchema.scheduler_state).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["workflow_fn_name"],
+        set_={
+            "last_run_time": sa.func.greatest(
+                SystemSchema.scheduler_state.c.last_run_time,
+                stmt.excluded.last_run_time,
+            )
+        },
+    )
+
+
+_epoch_ms_now = sa.text("(EXTRACT(epoch FROM now()) * 1000::numeric)::bigint")
+
+# Takes the lease if it is free, expired or already held by the owner, returning the owner on success
+_acquire_scheduler_lease_sql = (
+    pg.insert(SystemSchema.scheduler_lease)
+    .values(
+        lease_name=sa.bindparam("lease_name"),
+        owner=sa.bindparam("owner"),
+        expires_at_epoch_ms=_epoch_ms_now + sa.bindparam("lease_ms"),
+    )
+    .on_conflict_do_update(
+        index_elements=["lease_name"],
+        set_={
+            "owner": sa.bindparam("owner"),
+            "expires_at_epoch_ms": _epoch_ms_now + sa.bindparam("lease_ms"),
+        },
+        where=sa.or_(
+            SystemSchema.scheduler_lease.c.owner == sa.bindparam("owner"),
+            SystemSchema.scheduler_lease.c.expires_at_epoch_ms < _epoch_ms_now,
+        ),
+    )
+    .returning(SystemSchema.scheduler_lease.c.owner)
+    .execution_options(**_prepare)
+)
+
+_get_workflow_status_sql = (
+    sa.select(*_workflow_status_columns)
+    .where(SystemSchema.workflow_status.c.workflow_uuid == sa.bindparam("wf_id"))
+    .execution_options(**_prepare)
+)
+_workflows_with_inputs_select = sa.select(
+    *_workflow_status_columns,
+    SystemSchema.workflow_status.c.workflow_uuid,
+    SystemSchema.workflow_inputs.c.inputs,
+).select_from(
+    SystemSchema.workflow_status.outerjoin(
+        SystemSchema.workflow_inputs,
+        SystemSchema.workflow_status.c.workflow_uuid
+        == SystemSchema.workflow_inputs.c.workflow_uuid,
+    )
+)
+_get_workflow_with_inputs_sql = _workflows_with_inputs_select.where(
+    SystemSchema.workflow_status.c.workflow_uuid == sa.bindparam("wf_id")
+).execution_options(**_prepare)
+_get_workflows_with_inputs_sql = _workflows_with_inputs_select.where(
+    SystemSchema.workflow_status.c.workflow_uuid.in_(
+        sa.bindparam("wf_ids", expanding=True)
+    )
+)
+_get_status_only_sql = (
+    sa.select(SystemSchema.workflow_status.c.status)
+    .where(SystemSchema.workflow_status.c.workflow_uuid == sa.bindparam("wf_id"))
+    .execution_options(**_prepare)
+)
+_await_workflow_result_sql = (
+    sa.select(
+        SystemSchema.workflow_status.c.status,
+        SystemSchema.workflow_status.c.output,
+        SystemSchema.workflow_status.c.error,
+    )
+    .where(SystemSchema.workflow_status.c.workflow_uuid == sa.bindparam("wf_id"))
+    .execution_options(**_prepare)
+)
+_workflow_inputs_upsert = pg.insert(SystemSchema.workflow_inputs)
+_update_workflow_inputs_sql = (
+    _workflow_inputs_upsert.on_conflict_do_update(
+        index_elements=["workflow_uuid"],
+        set_=dict(workflow_uuid=SystemSchema.workflow_inputs.c.workflow_uuid),
+    )
+    .returning(SystemSchema.workflow_inputs.c.inputs)
+    .execution_options(**_prepare)
+)
+
+
+def _upsert_workflow_inputs_sql(rows: List[Dict[str, Any]]) -> UpdateBase:
+    # Multi-row form of _update_workflow_inputs_sql, for flushing the inputs buffer
+    upsert = pg.insert(SystemSchema.workflow_inputs).values(rows)
+    return upsert.on_conflict_do_update(
+        index_elements=["workflow_uuid"],
+        set_=dict(workflow_uuid=SystemSchema.workflow_inputs.c.workflow_uuid),
+    ).returning(
+        SystemSchema.workflow_inputs.c.workflow_uuid,
+        SystemSchema.workflow_inputs.c.inputs,
+    )
+
+
+_get_workflow_inputs_sql = (
+    sa.select(SystemSchema.workflow_inputs.c.inputs)
+    .where(SystemSchema.workflow_inputs.c.workflow_uuid == sa.bindparam("wf_id"))
+    .execution_options(**_prepare)
+)
+_record_operation_result_sql = pg.insert(
+    SystemSchema.operation_outputs
+).execution_options(**_prepare)
+_check_operation_execution_sql = (
+    sa.select(
+        SystemSchema.operation_outputs.c.output,
+        SystemSchema.operation_outputs.c.error,
+    )
+    .where(
+        SystemSchema.operation_outputs.c.workflow_uuid == sa.bindparam("wf_id"),
+        SystemSchema.operation_outputs.c.function_id == sa.bindparam("fn_id"),
+    )
+    .execution_options(**_prepare)
+)
+_send_notification_sql = pg.insert(SystemSchema.notifications).execution_options(
+    **_prepare
+)
+_workflow_events_upsert = pg.insert(SystemSchema.workflow_events)
+_set_event_sql = _workflow_events_upsert.on_conflict_do_update(
+    index_elements=["workflow_uuid", "key"],
+    set_={"value": _workflow_events_upsert.excluded.value},
+).execution_options(**_prepare)
+_get_event_sql = (
+    sa.select(SystemSchema.workflow_events.c.value)
+    .where(
+        SystemSchema.workflow_events.c.workflow_uuid == sa.bindparam("wf_id"),
+        SystemSchema.workflow_events.c.key == sa.bindparam("event_key"),
+    )
+    .execution_options(**_prepare)
+)
+_enqueue_sql = (
+    pg.insert(SystemSchema.workflow_queue)
+    .on_conflict_do_nothing()
+    .execution_options(**_prepare)
+)
+_delete_from_queue_sql = (
+    sa.delete(SystemSchema.workflow_queue)
+    .where(SystemSchema.workflow_queue.c.workflow_uuid == sa.bindparam("wf_id"))
+    .execution_options(**_prepare)
+)
+_complete_in_queue_sql = (
+    sa.update(SystemSchema.workflow_queue)
+    .where(SystemSchema.workflow_queue.c.workflow_uuid == sa.bindparam("wf_id"))
+    .values(completed_at_epoch_ms=sa.bindparam("completed_at"))
+    .execution_options(**_prepare)
+)
+_set_status_sql = (
+    sa.update(SystemSchema.workflow_status)
+    .where(SystemSchema.workflow_status.c.workflow_uuid == sa.bindparam("wf_id"))
+    .values(status=sa.bindparam("new_status"))
+    .execution_options(**_prepare)
+)
+_set_retries_exceeded_sql = (
+    sa.update(SystemSchema.workflow_status)
+    .where(SystemSchema.workflow_status.c.workflow_uuid == sa.bindparam("wf_id"))
+    .where(SystemSchema.workflow_status.c.status == WorkflowStatusString.PENDING.value)
+    .values(status=WorkflowStatusString.RETRIES_EXCEEDED.value, queue_name=None)
+)
+# Resume does nothing to workflows that have already completed
+_resumable = sa.and_(
+    SystemSchema.workflow_status.c.status != WorkflowStatusString.SUCCESS.value,
+    SystemSchema.workflow_status.c.status != WorkflowStatusString.ERROR.value,
+)
+_resume_delete_from_queue_sql = sa.delete(SystemSchema.workflow_queue).where(
+    SystemSchema.workflow_queue.c.workflow_uuid == sa.bindparam("wf_id"),
+    sa.exists().where(
+        SystemSchema.workflow_status.c.workflow_uuid == sa.bindparam("wf_id"),
+        _resumable,
+    ),
+)
+_resume_status_sql = (
+    sa.update(SystemSchema.workflow_status)
+    .where(SystemSchema.workflow_status.c.workflow_uuid == sa.bindparam("wf_id"))
+    .where(_resumable)
+    .values(status=WorkflowStatusString.PENDING.value, recovery_attempts=0)
+)
+
+
+def _execute_pipelined(
+    c: sa.Connection, statements: List[Tuple[UpdateBase, Dict[str, Any]]]
+) -> None:
+    """
+    Execute statements that return no rows in the connection's current transaction.
+
+    With psycopg pipeline mode, all statements are sent in a single round trip. They still run through
+    `Connection.execute`, so they use the compiled statement cache and are prepared like any other statement.
+    Execution stops at the first failing statement and its error is raised as a SQLAlchemy `DBAPIError`.
+    """
+    if not psycopg.Pipeline.is_supported():
+        for stmt, params in statements:
+            c.execute(stmt, params)
+        return
+
+    driver_conn = cast(psycopg.Connection[Any], c.connection.driver_connection)
+    try:
+        with driver_conn.pipeline():
+            for stmt, params in statements:
+                c.execute(stmt, params)
+    except psycopg.Error as e:
+        # An error received when the pipeline is synced on exit is raised by psycopg directly
+        raise DBAPIError.instance(None, None, e, psycopg.Error) from e
+
+
+def _workflow_status_params(status: WorkflowStatusInternal) -> Dict[str, Any]:
+    return {
+        "workflow_uuid": status["workflow_uuid"],
+        "status": status["status"],
+        "name": status["name"],
+        "class_name": status["class_name"],
+        "config_name": status["config_name"],
+        "output": status["output"],
+        "error": status["error"],
+        "executor_id": status["executor_id"],
+        "application_version": status["app_version"],
+        "application_id": status["app_id"],
+        "request": status["request"],
+        "authenticated_user": status["authenticated_user"],
+        "authenticated_roles": status["authenticated_roles"],
+        "assumed_role": status["assumed_role"],
+        "queue_name": status["queue_name"],
+        "recovery_attempts": (
+            1 if status["status"] != WorkflowStatusString.ENQUEUED.value else 0
+        ),
+    }
+
+
+def _buffered_size(value: Any) -> int:
+    # Approximate memory held by a buffered status or inputs entry
+    if isinstance(value, str):
+        return len(value)
+    return sum(len(v) for v in value.values() if isinstance(v, str))
+
+
+def _execute_multirow(
+    c: sa.Connection,
+    make_statement: Callable[[List[Dict[str, Any]]], UpdateBase],
+    rows: List[Dict[str, Any]],
+) -> List[sa.Row[Any]]:
+    # Insert the rows with as few statements as the bind parameter limit allows
+    returned: List[sa.Row[Any]] = []
+    rows_per_statement = max(1, _max_bind_params // len(rows[0]))
+    for i in range(0, len(rows), rows_per_statement):
+        result = c.execute(make_statement(rows[i : i + rows_per_statement]))
+        if result.returns_rows:
+            returned.extend(result.fetchall())
+    return returned
+
+
+def _workflow_status_from_row(
+    workflow_uuid: str, row: sa.Row[Any]
+) -> WorkflowStatusInternal:
+    return {
+        "workflow_uuid": workflow_uuid,
+        "output": None,
+        "error": None,
+        "status": row[0],
+        "name": row[1],
+        "request": row[2],
+        "recovery_attempts": row[3],
+        "config_name": row[4],
+        "class_name": row[5],
+        "authenticated_user": row[6],
+        "authenticated_roles": row[7],
+        "assumed_role": row[8],
+        "queue_name": row[9],
+        "executor_id": row[10],
+        "created_at": row[11],
+        "updated_at": row[12],
+        "app_version": row[13],
+        "app_id": row[14],
+    }
+
+
+def _workflow_status_and_inputs_from_row(
+    row: sa.Row[Any],
+) -> Tuple[WorkflowStatusInternal, Optional[_serialization.WorkflowInputs]]:
+    # Reads a row of _workflows_with_inputs_select
+    workflow_uuid, inputs = row[-2], row[-1]
+    return (
+        _workflow_status_from_row(workflow_uuid, row),
+        _serialization.deserialize_args(inputs) if inputs is not None else None,
+    )
+
+
+def _before_cursor_execute(
+    conn: sa.Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Optional[sa.engine.interfaces.ExecutionContext],
+    executemany: bool,
+) -> None:
+    if context is not None:
+        context._dbos_start_time = time.perf_counter()  # type: ignore
+
+
+def _after_cursor_execute(
+    conn: sa.Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Optional[sa.engine.interfaces.ExecutionContext],
+    executemany: bool,
+) -> None:
+    start_time: Optional[float] = getattr(context, "_dbos_start_time", None)
+    if start_time is not None:
+        # Statements are labelled by their leading keyword, such as SELECT or INSERT
+        dbos_metrics.sys_db_statement_duration.observe(
+            time.perf_counter() - start_time, statement.split(None, 1)[0].upper()
+        )
+
+
+def _is_colocated(config: ConfigFile) -> bool:
+    return bool(config["database"].get("sys_db_in_app_db"))
+
+
+def _sys_db_name(config: ConfigFile) -> str:
+    if _is_colocated(config):
+        return config["database"]["app_db_name"]
+    return (
+        config["database"]["sys_db_name"]
+        if "sys_db_name" in config["database"] and config["database"]["sys_db_name"]
+        else config["database"]["app_db_name"] + SystemSchema.sysdb_suffix
+    )
 
 
 class SystemDatabase:
@@ -178,11 +616,9 @@ class SystemDatabase:
     def __init__(self, config: ConfigFile):
         self.config = config
 
-        sysdb_name = (
-            config["database"]["sys_db_name"]
-            if "sys_db_name" in config["database"] and config["database"]["sys_db_name"]
-            else config["database"]["app_db_name"] + SystemSchema.sysdb_suffix
-        )
+        # The system tables may live in the application database, sharing its connection pool
+        self.colocated = _is_colocated(config)
+        sysdb_name = _sys_db_name(config)
 
         # If the system database does not already exist, create it
         postgres_db_url = sa.URL.create(
@@ -217,9 +653,37 @@ class SystemDatabase:
         )
 
         # Create a connection pool for the system database
-        self.engine = sa.create_engine(
-            system_db_url, pool_size=20, max_overflow=5, pool_timeout=30
+        transaction_pooling = (
+            config["database"].get("pgbouncer_transaction_mode") or False
         )
+        self.engine = create_pooled_engine(
+            system_db_url,
+            (
+                config["database"].get("app_db_pool")
+                if self.colocated
+                else config["database"].get("sys_db_pool")
+            ),
+            "application" if self.colocated else "system",
+            transaction_pooling=transaction_pooling,
+        )
+        sa.event.listen(self.engine, "before_cursor_execute", _before_cursor_execute)
+        sa.event.listen(self.engine, "after_cursor_execute", _after_cursor_execute)
+
+        # LISTEN needs a session-scoped connection, so it may bypass the pooler and connect to Postgres directly
+        self._listener_url = system_db_url
+        # Statuses are only cached while notifications reliably invalidate them
+        self._notifications_reliable = True
+        if config["database"].get("listener_hostname"):
+            self._listener_url = self._listener_url.set(
+                host=config["database"]["listener_hostname"],
+                port=config["database"].get("listener_port")
+                or config["database"]["port"],
+            )
+        elif transaction_pooling:
+            self._notifications_reliable = False
+            dbos_logger.warning(
+                "pgbouncer_transaction_mode is enabled but no listener_hostname is configured. Notifications for recv and get_event may be lost and fall back to their timeouts, and workflow statuses are not cached."
+            )
 
         # Run a schema migration for the system database
         migration_dir = os.path.join(
@@ -235,6 +699,11 @@ class SystemDatabase:
             self.engine.url.render_as_string(hide_password=False),
         )
         alembic_cfg.set_main_option("sqlalchemy.url", escaped_conn_string)
+        if self.colocated:
+            # Keep the migration version apart from any the application tracks in the same database
+            with self.engine.begin() as c:
+                c.execute(sa.text("CREATE SCHEMA IF NOT EXISTS dbos"))
+            alembic_cfg.set_main_option("version_table_schema", "dbos")
         try:
             command.upgrade(alembic_cfg, "head")
         except Exception as e:
@@ -245,15 +714,60 @@ class SystemDatabase:
         self.notification_conn: Optional[psycopg.connection.Connection] = None
         self.notifications_map: Dict[str, threading.Condition] = {}
         self.workflow_events_map: Dict[str, threading.Condition] = {}
+        # Called with a workflow ID and whether it is now cancelled, when any process cancels or resumes it
+        self.workflow_cancellation_callback: Optional[Callable[[str, bool], None]] = (
+            None
+        )
 
         # Initialize the workflow status and inputs buffers
+        buffer_config = config["database"].get("workflow_buffer") or {}
+        self._flush_batch_size: int = (
+            buffer_config.get("flush_batch_size") or _buffer_flush_batch_size
+        )
+        self._flush_interval_secs: float = (
+            buffer_config.get("flush_interval_secs") or _buffer_flush_interval_secs
+        )
+        self._max_buffer_bytes: int = (
+            buffer_config.get("max_buffer_bytes") or _max_buffer_bytes
+        )
         self._workflow_status_buffer: Dict[str, WorkflowStatusInternal] = {}
         self._workflow_inputs_buffer: Dict[str, str] = {}
+        # Guards the buffers and their approximate size. The flusher waits on it for a batch to
+        # fill, and callers wait on it while the buffers are over their memory cap.
+        self._buffer_cond = threading.Condition()
+        self._buffered_bytes = 0
         # Two sets for tracking which single-transaction workflows have been exported to the status table
         self._exported_temp_txn_wf_status: Set[str] = set()
         self._temp_txn_wf_ids: Set[str] = set()
         self._is_flushing_status_buffer = False
 
+        # Workflows enqueued together get strictly increasing creation times, in order, so a queue
+        # dequeues them in that order even when they are enqueued within the same millisecond
+        self._enqueue_time_lock = threading.Lock()
+        self._last_enqueue_time_ms = 0
+
+        # Cache terminal statuses while the notification listener runs. They are invalidated by this
+        # process's writes and, for other processes' writes, by notifications from a status trigger.
+        cache_config = config["database"].get("workflow_status_cache") or {}
+        max_entries = cache_config.get("max_entries")
+        self._status_cache = WorkflowStatusCache(
+            _status_cache_max_entries if max_entries is None else max_entries,
+            cache_config.get("ttl_secs") or _status_cache_ttl_secs,
+        )
+
+        # Optionally keep the buffered entries in a local spill file, so they survive a crash
+        self._spill: Optional[WorkflowBufferSpill] = None
+        spill_path = buffer_config.get("spill_path")
+        if spill_path:
+            try:
+                self._spill = WorkflowBufferSpill(spill_path)
+            except OSError as e:
+                dbos_logger.warning(
+                    f"Cannot open workflow buffer spill file {spill_path}, continuing without it: {e}"
+                )
+            else:
+                self._replay_spill()
+
         # Now we can run background processes
         self._run_background_processes = True
 
@@ -261,62 +775,38 @@ class SystemDatabase:
     def destroy(self) -> None:
         self.wait_for_buffer_flush()
         self._run_background_processes = False
+        with self._buffer_cond:
+            self._buffer_cond.notify_all()
+        if self._spill is not None:
+            self._spill.close()
+        self._status_cache.set_active(False)
         if self.notification_conn is not None:
             self.notification_conn.close()
         self.engine.dispose()
 
     def wait_for_buffer_flush(self) -> None:
-        # Wait until the buffers are flushed.
-        while self._is_flushing_status_buffer or not self._is_buffers_empty:
-            dbos_logger.debug("Waiting for system buffers to be exported")
-            time.sleep(1)
+        # Wait until the buffers are flushed. The flusher notifies after every flush.
+        with self._buffer_cond:
+            while self._is_flushing_status_buffer or not self._is_buffers_empty:
+                dbos_logger.debug("Waiting for system buffers to be exported")
+                self._buffer_cond.notify_all()
+                self._buffer_cond.wait(self._flush_interval_secs)
 
     def insert_workflow_status(
         self,
         status: WorkflowStatusInternal,
         *,
         max_recovery_attempts: int = DEFAULT_MAX_RECOVERY_ATTEMPTS,
-    ) -> WorkflowStatuses:
+    ) -> Tuple[WorkflowStatuses, bool]:
+        # Also returns whether this call created the status row. A workflow whose row was just
+        # created cannot have recorded any operations, because they all reference the row.
         wf_status: WorkflowStatuses = status["status"]
-
-        cmd = (
-            pg.insert(SystemSchema.workflow_status)
-            .values(
-                workflow_uuid=status["workflow_uuid"],
-                status=status["status"],
-                name=status["name"],
-                class_name=status["class_name"],
-                config_name=status["config_name"],
-                output=status["output"],
-                error=status["error"],
-                executor_id=status["executor_id"],
-                application_version=status["app_version"],
-                application_id=status["app_id"],
-                request=status["request"],
-                authenticated_user=status["authenticated_user"],
-                authenticated_roles=status["authenticated_roles"],
-                assumed_role=status["assumed_role"],
-                queue_name=status["queue_name"],
-                recovery_attempts=(
-                    1 if wf_status != WorkflowStatusString.ENQUEUED.value else 0
-                ),
-            )
-            .on_conflict_do_update(
-                index_elements=["workflow_uuid"],
-                set_=dict(
-                    executor_id=status["executor_id"],
-                    recovery_attempts=(
-                        SystemSchema.workflow_status.c.recovery_attempts + 1
-                    ),
-                    updated_at=func.extract("epoch", func.now()) * 1000,
-                ),
-            )
-        )
-
-        cmd = cmd.returning(SystemSchema.workflow_status.c.recovery_attempts, SystemSchema.workflow_status.c.status, SystemSchema.workflow_status.c.name, SystemSchema.workflow_status.c.class_name, SystemSchema.workflow_status.c.config_name, SystemSchema.workflow_status.c.queue_name)  # type: ignore
+        inserted = False
 
         with self.engine.begin() as c:
-            results = c.execute(cmd)
+            results = c.execute(
+                _insert_workflow_status_sql, _workflow_status_params(status)
+            )
 
         row = results.fetchone()
         if row is not None:
@@ -324,6 +814,9 @@ class SystemDatabase:
             # A mismatch indicates a workflow starting with the same UUID but different functions, which would throw an exception.
             recovery_attempts: int = row[0]
             wf_status = row[1]
+            inserted = bool(row[6])
+            if not inserted:
+                self._status_cache.invalidate(status["workflow_uuid"])
             err_msg: Optional[str] = None
             if row[2] != status["name"]:
                 err_msg = f"Workflow already exists with a different function name: {row[2]}, but the provided function name is: {status['name']}"
@@ -342,33 +835,20 @@ class SystemDatabase:
             # Every time we start executing a workflow (and thus attempt to insert its status), we increment `recovery_attempts` by 1.
             # When this number becomes equal to `maxRetries + 1`, we mark the workflow as `RETRIES_EXCEEDED`.
             if recovery_attempts > max_recovery_attempts + 1:
+                params = {"wf_id": status["workflow_uuid"]}
                 with self.engine.begin() as c:
-                    c.execute(
-                        sa.delete(SystemSchema.workflow_queue).where(
-                            SystemSchema.workflow_queue.c.workflow_uuid
-                            == status["workflow_uuid"]
-                        )
-                    )
-                    c.execute(
-                        sa.update(SystemSchema.workflow_status)
-                        .where(
-                            SystemSchema.workflow_status.c.workflow_uuid
-                            == status["workflow_uuid"]
-                        )
-                        .where(
-                            SystemSchema.workflow_status.c.status
-                            == WorkflowStatusString.PENDING.value
-                        )
-                        .values(
-                            status=WorkflowStatusString.RETRIES_EXCEEDED.value,
-                            queue_name=None,
-                        )
+                    _execute_pipelined(
+                        c,
+                        [
+                            (_delete_from_queue_sql, params),
+                            (_set_retries_exceeded_sql, params),
+                        ],
                     )
                 raise DBOSDeadLetterQueueError(
                     status["workflow_uuid"], max_recovery_attempts
                 )
 
-        return wf_status
+        return wf_status, inserted
 
     def update_workflow_status(
         self,
@@ -376,46 +856,13 @@ class SystemDatabase:
         *,
         conn: Optional[sa.Connection] = None,
     ) -> None:
-        wf_status: WorkflowStatuses = status["status"]
-
-        cmd = (
-            pg.insert(SystemSchema.workflow_status)
-            .values(
-                workflow_uuid=status["workflow_uuid"],
-                status=status["status"],
-                name=status["name"],
-                class_name=status["class_name"],
-                config_name=status["config_name"],
-                output=status["output"],
-                error=status["error"],
-                executor_id=status["executor_id"],
-                application_version=status["app_version"],
-                application_id=status["app_id"],
-                request=status["request"],
-                authenticated_user=status["authenticated_user"],
-                authenticated_roles=status["authenticated_roles"],
-                assumed_role=status["assumed_role"],
-                queue_name=status["queue_name"],
-                recovery_attempts=(
-                    1 if wf_status != WorkflowStatusString.ENQUEUED.value else 0
-                ),
-            )
-            .on_conflict_do_update(
-                index_elements=["workflow_uuid"],
-                set_=dict(
-                    status=status["status"],
-                    output=status["output"],
-                    error=status["error"],
-                    updated_at=func.extract("epoch", func.now()) * 1000,
-                ),
-            )
-        )
-
+        params = _workflow_status_params(status)
         if conn is not None:
-            conn.execute(cmd)
+            conn.execute(_update_workflow_status_sql, params)
         else:
             with self.engine.begin() as c:
-                c.execute(cmd)
+                c.execute(_update_workflow_status_sql, params)
+        self._status_cache.invalidate(status["workflow_uuid"])
 
         # If this is a single-transaction workflow, record that its status has been exported
         if status["workflow_uuid"] in self._temp_txn_wf_ids:
@@ -426,97 +873,63 @@ class SystemDatabase:
         workflow_id: str,
     ) -> None:
         with self.engine.begin() as c:
-            # Remove the workflow from the queues table so it does not block the table
-            c.execute(
-                sa.delete(SystemSchema.workflow_queue).where(
-                    SystemSchema.workflow_queue.c.workflow_uuid == workflow_id
-                )
-            )
-            # Set the workflow's status to CANCELLED
-            c.execute(
-                sa.update(SystemSchema.workflow_status)
-                .where(SystemSchema.workflow_status.c.workflow_uuid == workflow_id)
-                .values(
-                    status=WorkflowStatusString.CANCELLED.value,
-                )
+            _execute_pipelined(
+                c,
+                [
+                    # Remove the workflow from the queues table so it does not block the table
+                    (_delete_from_queue_sql, {"wf_id": workflow_id}),
+                    # Set the workflow's status to CANCELLED
+                    (
+                        _set_status_sql,
+                        {
+                            "wf_id": workflow_id,
+                            "new_status": WorkflowStatusString.CANCELLED.value,
+                        },
+                    ),
+                ],
             )
+        self._status_cache.invalidate(workflow_id)
 
     def resume_workflow(
         self,
         workflow_id: str,
     ) -> None:
+        # Both statements only apply if the workflow exists and is not complete
         with self.engine.begin() as c:
-            # Check the status of the workflow. If it is complete, do nothing.
-            row = c.execute(
-                sa.select(
-                    SystemSchema.workflow_status.c.status,
-                ).where(SystemSchema.workflow_status.c.workflow_uuid == workflow_id)
-            ).fetchone()
-            if (
-                row is None
-                or row[0] == WorkflowStatusString.SUCCESS.value
-                or row[0] == WorkflowStatusString.ERROR.value
-            ):
-                return
-            # Remove the workflow from the queues table so resume can safely be called on an ENQUEUED workflow
-            c.execute(
-                sa.delete(SystemSchema.workflow_queue).where(
-                    SystemSchema.workflow_queue.c.workflow_uuid == workflow_id
-                )
-            )
-            # Set the workflow's status to PENDING and clear its recovery attempts.
-            c.execute(
-                sa.update(SystemSchema.workflow_status)
-                .where(SystemSchema.workflow_status.c.workflow_uuid == workflow_id)
-                .values(status=WorkflowStatusString.PENDING.value, recovery_attempts=0)
+            _execute_pipelined(
+                c,
+                [
+                    # Remove the workflow from the queues table so resume can safely be called on an ENQUEUED workflow
+                    (_resume_delete_from_queue_sql, {"wf_id": workflow_id}),
+                    # Set the workflow's status to PENDING and clear its recovery attempts.
+                    (_resume_status_sql, {"wf_id": workflow_id}),
+                ],
             )
+        self._status_cache.invalidate(workflow_id)
 
     def get_workflow_status(
         self, workflow_uuid: str
     ) -> Optional[WorkflowStatusInternal]:
+        cache_version = self._status_cache.version
+        if self._status_cache.enabled:
+            cached = self._status_cache.get(workflow_uuid)
+            if cached is not None:
+                return cached
         with self.engine.begin() as c:
             row = c.execute(
-                sa.select(
-                    SystemSchema.workflow_status.c.status,
-                    SystemSchema.workflow_status.c.name,
-                    SystemSchema.workflow_status.c.request,
-                    SystemSchema.workflow_status.c.recovery_attempts,
-                    SystemSchema.workflow_status.c.config_name,
-                    SystemSchema.workflow_status.c.class_name,
-                    SystemSchema.workflow_status.c.authenticated_user,
-                    SystemSchema.workflow_status.c.authenticated_roles,
-                    SystemSchema.workflow_status.c.assumed_role,
-                    SystemSchema.workflow_status.c.queue_name,
-                    SystemSchema.workflow_status.c.executor_id,
-                    SystemSchema.workflow_status.c.created_at,
-                    SystemSchema.workflow_status.c.updated_at,
-                    SystemSchema.workflow_status.c.application_version,
-                    SystemSchema.workflow_status.c.application_id,
-                ).where(SystemSchema.workflow_status.c.workflow_uuid == workflow_uuid)
+                _get_workflow_status_sql, {"wf_id": workflow_uuid}
             ).fetchone()
-            if row is None:
-                return None
-            status: WorkflowStatusInternal = {
-                "workflow_uuid": workflow_uuid,
-                "output": None,
-                "error": None,
-                "status": row[0],
-                "name": row[1],
-                "request": row[2],
-                "recovery_attempts": row[3],
-                "config_name": row[4],
-                "class_name": row[5],
-                "authenticated_user": row[6],
-                "authenticated_roles": row[7],
-                "assumed_role": row[8],
-                "queue_name": row[9],
-                "executor_id": row[10],
-                "created_at": row[11],
-                "updated_at": row[12],
-                "app_version": row[13],
-                "app_id": row[14],
-            }
-            return status
+        if row is None:
+            return None
+        status = _workflow_status_from_row(workflow_uuid, row)
+        if self._status_cache.enabled:
+            self._status_cache.put(status, cache_version)
+        return status
+
+    def is_workflow_cancelled(self, workflow_uuid: str) -> bool:
+        with self.engine.begin() as c:
+            status = c.execute(_get_status_only_sql, {"wf_id": workflow_uuid}).scalar()
+        return bool(status == WorkflowStatusString.CANCELLED.value)
 
     def get_workflow_status_within_wf(
         self, workflow_uuid: str, calling_wf: str, calling_wf_fn: int
@@ -549,13 +962,7 @@ class SystemDatabase:
         while True:
             with self.engine.begin() as c:
                 row = c.execute(
-                    sa.select(
-                        SystemSchema.workflow_status.c.status,
-                        SystemSchema.workflow_status.c.output,
-                        SystemSchema.workflow_status.c.error,
-                    ).where(
-                        SystemSchema.workflow_status.c.workflow_uuid == workflow_uuid
-                    )
+                    _await_workflow_result_sql, {"wf_id": workflow_uuid}
                 ).fetchone()
                 if row is not None:
                     status = row[0]
@@ -589,26 +996,29 @@ class SystemDatabase:
             raise _serialization.deserialize_exception(stat["error"])
         return None
 
+    @staticmethod
+    def temp_txn_workflow_statements(
+        status: WorkflowStatusInternal, inputs: str
+    ) -> List[Tuple[UpdateBase, Dict[str, Any]]]:
+        # Statements recording a single-transaction workflow's status and inputs. When the system
+        # tables are colocated, its transaction runs them so they commit together with its output.
+        return [
+            (_update_workflow_status_sql, _workflow_status_params(status)),
+            (
+                _update_workflow_inputs_sql,
+                {"workflow_uuid": status["workflow_uuid"], "inputs": inputs},
+            ),
+        ]
+
     def update_workflow_inputs(
         self, workflow_uuid: str, inputs: str, conn: Optional[sa.Connection] = None
     ) -> None:
-        cmd = (
-            pg.insert(SystemSchema.workflow_inputs)
-            .values(
-                workflow_uuid=workflow_uuid,
-                inputs=inputs,
-            )
-            .on_conflict_do_update(
-                index_elements=["workflow_uuid"],
-                set_=dict(workflow_uuid=SystemSchema.workflow_inputs.c.workflow_uuid),
-            )
-            .returning(SystemSchema.workflow_inputs.c.inputs)
-        )
+        params = {"workflow_uuid": workflow_uuid, "inputs": inputs}
         if conn is not None:
-            row = conn.execute(cmd).fetchone()
+            row = conn.execute(_update_workflow_inputs_sql, params).fetchone()
         else:
             with self.engine.begin() as c:
-                row = c.execute(cmd).fetchone()
+                row = c.execute(_update_workflow_inputs_sql, params).fetchone()
         if row is not None and row[0] != inputs:
             dbos_logger.warning(
                 f"Workflow inputs for {workflow_uuid} changed since the first call! Use the original inputs."
@@ -625,9 +1035,7 @@ class SystemDatabase:
     ) -> Optional[_serialization.WorkflowInputs]:
         with self.engine.begin() as c:
             row = c.execute(
-                sa.select(SystemSchema.workflow_inputs.c.inputs).where(
-                    SystemSchema.workflow_inputs.c.workflow_uuid == workflow_uuid
-                )
+                _get_workflow_inputs_sql, {"wf_id": workflow_uuid}
             ).fetchone()
             if row is None:
                 return None
@@ -636,6 +1044,33 @@ class SystemDatabase:
             )
             return inputs
 
+    def get_workflow_with_inputs(
+        self, workflow_uuid: str
+    ) -> Optional[
+        Tuple[WorkflowStatusInternal, Optional[_serialization.WorkflowInputs]]
+    ]:
+        """Fetch a workflow's status and inputs in one query, or None if it does not exist."""
+        with self.engine.begin() as c:
+            row = c.execute(
+                _get_workflow_with_inputs_sql, {"wf_id": workflow_uuid}
+            ).fetchone()
+        if row is None:
+            return None
+        return _workflow_status_and_inputs_from_row(row)
+
+    def get_workflows_with_inputs(self, workflow_uuids: List[str]) -> Dict[
+        str,
+        Tuple[WorkflowStatusInternal, Optional[_serialization.WorkflowInputs]],
+    ]:
+        """Fetch the statuses and inputs of many workflows in one query, omitting workflows that do not exist."""
+        if len(workflow_uuids) == 0:
+            return {}
+        with self.engine.begin() as c:
+            rows = c.execute(
+                _get_workflows_with_inputs_sql, {"wf_ids": workflow_uuids}
+            ).fetchall()
+        return {row[-2]: _workflow_status_and_inputs_from_row(row) for row in rows}
+
     def get_workflows(self, input: GetWorkflowsInput) -> GetWorkflowsOutput:
         query = sa.select(SystemSchema.workflow_status.c.workflow_uuid).order_by(
             SystemSchema.workflow_status.c.created_at.asc()
@@ -757,18 +1192,18 @@ class SystemDatabase:
         error = result["error"]
         output = result["output"]
         assert error is None or output is None, "Only one of error or output can be set"
-        sql = pg.insert(SystemSchema.operation_outputs).values(
-            workflow_uuid=result["workflow_uuid"],
-            function_id=result["function_id"],
-            output=output,
-            error=error,
-        )
+        params = {
+            "workflow_uuid": result["workflow_uuid"],
+            "function_id": result["function_id"],
+            "output": output,
+            "error": error,
+        }
         try:
             if conn is not None:
-                conn.execute(sql)
+                conn.execute(_record_operation_result_sql, params)
             else:
                 with self.engine.begin() as c:
-                    c.execute(sql)
+                    c.execute(_record_operation_result_sql, params)
         except DBAPIError as dbapi_error:
             if dbapi_error.orig.sqlstate == "23505":  # type: ignore
                 raise DBOSWorkflowConflictIDError(result["workflow_uuid"])
@@ -777,21 +1212,15 @@ class SystemDatabase:
     def check_operation_execution(
         self, workflow_uuid: str, function_id: int, conn: Optional[sa.Connection] = None
     ) -> Optional[RecordedResult]:
-        sql = sa.select(
-            SystemSchema.operation_outputs.c.output,
-            SystemSchema.operation_outputs.c.error,
-        ).where(
-            SystemSchema.operation_outputs.c.workflow_uuid == workflow_uuid,
-            SystemSchema.operation_outputs.c.function_id == function_id,
-        )
+        params = {"wf_id": workflow_uuid, "fn_id": function_id}
 
         # If in a transaction, use the provided connection
         rows: Sequence[Any]
         if conn is not None:
-            rows = conn.execute(sql).all()
+            rows = conn.execute(_check_operation_execution_sql, params).all()
         else:
             with self.engine.begin() as c:
-                rows = c.execute(sql).all()
+                rows = c.execute(_check_operation_execution_sql, params).all()
         if len(rows) == 0:
             return None
         result: RecordedResult = {
@@ -809,40 +1238,45 @@ class SystemDatabase:
         topic: Optional[str] = None,
     ) -> None:
         topic = topic if topic is not None else _dbos_null_topic
-        with self.engine.begin() as c:
-            recorded_output = self.check_operation_execution(
-                workflow_uuid, function_id, conn=c
-            )
-            if recorded_output is not None:
+        # Record the operation first, in the same pipelined transaction as the message.
+        # If it was already recorded, the send is a replay and the transaction is rolled back.
+        try:
+            with self.engine.begin() as c:
+                _execute_pipelined(
+                    c,
+                    [
+                        (
+                            _record_operation_result_sql,
+                            {
+                                "workflow_uuid": workflow_uuid,
+                                "function_id": function_id,
+                                "output": None,
+                                "error": None,
+                            },
+                        ),
+                        (
+                            _send_notification_sql,
+                            {
+                                "destination_uuid": destination_uuid,
+                                "topic": topic,
+                                "message": _serialization.serialize(message),
+                            },
+                        ),
+                    ],
+                )
+        except DBAPIError as dbapi_error:
+            if dbapi_error.orig.sqlstate == "23505":  # type: ignore
                 dbos_logger.debug(
                     f"Replaying send, id: {function_id}, destination_uuid: {destination_uuid}, topic: {topic}"
                 )
                 return  # Already sent before
-            else:
-                dbos_logger.debug(
-                    f"Running send, id: {function_id}, destination_uuid: {destination_uuid}, topic: {topic}"
-                )
-
-            try:
-                c.execute(
-                    pg.insert(SystemSchema.notifications).values(
-                        destination_uuid=destination_uuid,
-                        topic=topic,
-                        message=_serialization.serialize(message),
-                    )
-                )
-            except DBAPIError as dbapi_error:
-                # Foreign key violation
-                if dbapi_error.orig.sqlstate == "23503":  # type: ignore
-                    raise DBOSNonExistentWorkflowError(destination_uuid)
-                raise
-            output: OperationResultInternal = {
-                "workflow_uuid": workflow_uuid,
-                "function_id": function_id,
-                "output": None,
-                "error": None,
-            }
-            self.record_operation_result(output, conn=c)
+            # Foreign key violation
+            if dbapi_error.orig.sqlstate == "23503":  # type: ignore
+                raise DBOSNonExistentWorkflowError(destination_uuid)
+            raise
+        dbos_logger.debug(
+            f"Running send, id: {function_id}, destination_uuid: {destination_uuid}, topic: {topic}"
+        )
 
     def recv(
         self,
@@ -944,7 +1378,7 @@ class SystemDatabase:
             try:
                 # since we're using the psycopg connection directly, we need a url without the "+pycopg" suffix
                 url = sa.URL.create(
-                    "postgresql", **self.engine.url.translate_connect_args()
+                    "postgresql", **self._listener_url.translate_connect_args()
                 )
                 # Listen to notifications
                 self.notification_conn = psycopg.connect(
@@ -953,6 +1387,9 @@ class SystemDatabase:
 
                 self.notification_conn.execute("LISTEN dbos_notifications_channel")
                 self.notification_conn.execute("LISTEN dbos_workflow_events_channel")
+                self.notification_conn.execute("LISTEN dbos_workflow_status_channel")
+                self.notification_conn.execute("LISTEN dbos_workflow_cancel_channel")
+                self._status_cache.set_active(self._notifications_reliable)
 
                 while self._run_background_processes:
                     gen = self.notification_conn.notifies()
@@ -985,9 +1422,20 @@ class SystemDatabase:
                                 dbos_logger.debug(
                                     f"Signaled workflow_events condition for {notify.payload}"
                                 )
+                        elif channel == "dbos_workflow_status_channel":
+                            self._status_cache.invalidate(notify.payload)
+                        elif channel == "dbos_workflow_cancel_channel":
+                            wf_id, _, new_status = notify.payload.rpartition("::")
+                            if wf_id and self.workflow_cancellation_callback:
+                                self.workflow_cancellation_callback(
+                                    wf_id,
+                                    new_status == WorkflowStatusString.CANCELLED.value,
+                                )
                         else:
                             dbos_logger.error(f"Unknown channel: {channel}")
             except Exception as e:
+                # Changes made while the listener is disconnected would be missed
+                self._status_cache.set_active(False)
                 if self._run_background_processes:
                     dbos_logger.error(f"Notification listener error: {e}")
                     time.sleep(1)
@@ -1035,35 +1483,37 @@ class SystemDatabase:
         key: str,
         message: Any,
     ) -> None:
-        with self.engine.begin() as c:
-            recorded_output = self.check_operation_execution(
-                workflow_uuid, function_id, conn=c
-            )
-            if recorded_output is not None:
+        # As in send, a conflict recording the operation means this is a replay
+        try:
+            with self.engine.begin() as c:
+                _execute_pipelined(
+                    c,
+                    [
+                        (
+                            _record_operation_result_sql,
+                            {
+                                "workflow_uuid": workflow_uuid,
+                                "function_id": function_id,
+                                "output": None,
+                                "error": None,
+                            },
+                        ),
+                        (
+                            _set_event_sql,
+                            {
+                                "workflow_uuid": workflow_uuid,
+                                "key": key,
+                                "value": _serialization.serialize(message),
+                            },
+                        ),
+                    ],
+                )
+        except DBAPIError as dbapi_error:
+            if dbapi_error.orig.sqlstate == "23505":  # type: ignore
                 dbos_logger.debug(f"Replaying set_event, id: {function_id}, key: {key}")
                 return  # Already sent before
-            else:
-                dbos_logger.debug(f"Running set_event, id: {function_id}, key: {key}")
-
-            c.execute(
-                pg.insert(SystemSchema.workflow_events)
-                .values(
-                    workflow_uuid=workflow_uuid,
-                    key=key,
-                    value=_serialization.serialize(message),
-                )
-                .on_conflict_do_update(
-                    index_elements=["workflow_uuid", "key"],
-                    set_={"value": _serialization.serialize(message)},
-                )
-            )
-            output: OperationResultInternal = {
-                "workflow_uuid": workflow_uuid,
-                "function_id": function_id,
-                "output": None,
-                "error": None,
-            }
-            self.record_operation_result(output, conn=c)
+            raise
+        dbos_logger.debug(f"Running set_event, id: {function_id}, key: {key}")
 
     def get_event(
         self,
@@ -1072,12 +1522,7 @@ class SystemDatabase:
         timeout_seconds: float = 60,
         caller_ctx: Optional[GetEventWorkflowContext] = None,
     ) -> Any:
-        get_sql = sa.select(
-            SystemSchema.workflow_events.c.value,
-        ).where(
-            SystemSchema.workflow_events.c.workflow_uuid == target_uuid,
-            SystemSchema.workflow_events.c.key == key,
-        )
+        get_params = {"wf_id": target_uuid, "event_key": key}
         # Check for previous executions only if it's in a workflow
         if caller_ctx is not None:
             recorded_output = self.check_operation_execution(
@@ -1104,7 +1549,7 @@ class SystemDatabase:
         # Check if the key is already in the database. If not, wait for the notification.
         init_recv: Sequence[Any]
         with self.engine.begin() as c:
-            init_recv = c.execute(get_sql).fetchall()
+            init_recv = c.execute(_get_event_sql, get_params).fetchall()
 
         value: Any = None
         if len(init_recv) > 0:
@@ -1124,7 +1569,7 @@ class SystemDatabase:
 
             # Read the value from the database
             with self.engine.begin() as c:
-                final_recv = c.execute(get_sql).fetchall()
+                final_recv = c.execute(_get_event_sql, get_params).fetchall()
                 if len(final_recv) > 0:
                     value = _serialization.deserialize(final_recv[0][0])
         condition.release()
@@ -1144,92 +1589,260 @@ class SystemDatabase:
             )
         return value
 
-    def _flush_workflow_status_buffer(self) -> None:
+    def _flush_workflow_status_buffer(self) -> int:
         """Export the workflow status buffer to the database, up to the batch size."""
-        if len(self._workflow_status_buffer) == 0:
-            return
+        with self._buffer_cond:
+            # Take the oldest entries in the buffer (FIFO)
+            batch = {
+                wf_id: self._workflow_status_buffer.pop(wf_id)
+                for wf_id in list(
+                    itertools.islice(
+                        self._workflow_status_buffer, self._flush_batch_size
+                    )
+                )
+            }
+            self._buffered_bytes -= sum(_buffered_size(s) for s in batch.values())
+        if len(batch) == 0:
+            return 0
 
-        # Record the exported status so far, and add them back on errors.
-        exported_status: Dict[str, WorkflowStatusInternal] = {}
-        with self.engine.begin() as c:
-            exported = 0
-            status_iter = iter(list(self._workflow_status_buffer))
-            wf_id: Optional[str] = None
-            while (
-                exported < _buffer_flush_batch_size
-                and (wf_id := next(status_iter, None)) is not None
-            ):
-                # Pop the first key in the buffer (FIFO)
-                status = self._workflow_status_buffer.pop(wf_id, None)
-                if status is None:
-                    continue
-                exported_status[wf_id] = status
-                try:
-                    self.update_workflow_status(status, conn=c)
-                    exported += 1
-                except Exception as e:
-                    dbos_logger.error(f"Error while flushing status buffer: {e}")
-                    c.rollback()
-                    # Add the exported status back to the buffer, so they can be retried next time
-                    self._workflow_status_buffer.update(exported_status)
-                    break
-
-    def _flush_workflow_inputs_buffer(self) -> None:
+        try:
+            with self.engine.begin() as c:
+                _execute_multirow(
+                    c,
+                    _upsert_workflow_statuses_sql,
+                    [_workflow_status_params(status) for status in batch.values()],
+                )
+        except Exception as e:
+            dbos_logger.error(f"Error while flushing status buffer: {e}")
+            # Add the statuses back to the buffer, so they can be retried next time
+            with self._buffer_cond:
+                for wf_id, status in batch.items():
+                    if wf_id not in self._workflow_status_buffer:
+                        self._add_buffered_status(status)
+            raise
+
+        # Record which single-transaction workflows have had their status exported
+        for wf_id in batch:
+            self._status_cache.invalidate(wf_id)
+            if wf_id in self._temp_txn_wf_ids:
+                self._exported_temp_txn_wf_status.add(wf_id)
+        return len(batch)
+
+    def _flush_workflow_inputs_buffer(self) -> int:
         """Export the workflow inputs buffer to the database, up to the batch size."""
-        if len(self._workflow_inputs_buffer) == 0:
-            return
+        with self._buffer_cond:
+            # Skip exporting inputs if the status has not been exported yet
+            ready = (
+                wf_id
+                for wf_id in self._workflow_inputs_buffer
+                if wf_id in self._exported_temp_txn_wf_status
+            )
+            batch = {
+                wf_id: self._workflow_inputs_buffer.pop(wf_id)
+                for wf_id in list(itertools.islice(ready, self._flush_batch_size))
+            }
+            self._buffered_bytes -= sum(_buffered_size(i) for i in batch.values())
+        if len(batch) == 0:
+            return 0
 
-        # Record exported inputs so far, and add them back on errors.
-        exported_inputs: Dict[str, str] = {}
-        with self.engine.begin() as c:
-            exported = 0
-            input_iter = iter(list(self._workflow_inputs_buffer))
-            wf_id: Optional[str] = None
-            while (
-                exported < _buffer_flush_batch_size
-                and (wf_id := next(input_iter, None)) is not None
-            ):
-                if wf_id not in self._exported_temp_txn_wf_status:
-                    # Skip exporting inputs if the status has not been exported yet
-                    continue
-                inputs = self._workflow_inputs_buffer.pop(wf_id, None)
-                if inputs is None:
-                    continue
-                exported_inputs[wf_id] = inputs
-                try:
-                    self.update_workflow_inputs(wf_id, inputs, conn=c)
-                    exported += 1
-                except Exception as e:
-                    dbos_logger.error(f"Error while flushing inputs buffer: {e}")
-                    c.rollback()
-                    # Add the exported inputs back to the buffer, so they can be retried next time
-                    self._workflow_inputs_buffer.update(exported_inputs)
-                    break
+        try:
+            with self.engine.begin() as c:
+                rows = _execute_multirow(
+                    c,
+                    _upsert_workflow_inputs_sql,
+                    [
+                        {"workflow_uuid": wf_id, "inputs": inputs}
+                        for wf_id, inputs in batch.items()
+                    ],
+                )
+        except Exception as e:
+            dbos_logger.error(f"Error while flushing inputs buffer: {e}")
+            # Add the inputs back to the buffer, so they can be retried next time
+            with self._buffer_cond:
+                for wf_id, inputs in batch.items():
+                    if wf_id not in self._workflow_inputs_buffer:
+                        self._add_buffered_inputs(wf_id, inputs)
+            raise
+
+        for wf_id, recorded_inputs in rows:
+            if recorded_inputs != batch[wf_id]:
+                dbos_logger.warning(
+                    f"Workflow inputs for {wf_id} changed since the first call! Use the original inputs."
+                )
+        for wf_id in batch:
+            # Clean up the single-transaction tracking sets
+            self._exported_temp_txn_wf_status.discard(wf_id)
+            self._temp_txn_wf_ids.discard(wf_id)
+        return len(batch)
 
     def flush_workflow_buffers(self) -> None:
-        """Flush the workflow status and inputs buffers periodically, via a background thread."""
+        """Flush the workflow status and inputs buffers in batches, via a background thread."""
+        flushed = 0
         while self._run_background_processes:
+            with self._buffer_cond:
+                # Give a partial batch up to the flush interval to fill. Also wait if nothing could be
+                # flushed last time, which happens when the buffered inputs still await their statuses.
+                if flushed == 0 or not self._is_batch_ready:
+                    self._buffer_cond.wait(self._flush_interval_secs)
+            flushed = 0
             try:
                 self._is_flushing_status_buffer = True
                 # Must flush the status buffer first, as the inputs table has a foreign key constraint on the status table.
-                self._flush_workflow_status_buffer()
-                self._flush_workflow_inputs_buffer()
+                flushed += self._flush_workflow_status_buffer()
+                flushed += self._flush_workflow_inputs_buffer()
                 self._is_flushing_status_buffer = False
-                if self._is_buffers_empty:
-                    # Only sleep if both buffers are empty
-                    time.sleep(_buffer_flush_interval_secs)
             except Exception as e:
                 dbos_logger.error(f"Error while flushing buffers: {e}")
-                time.sleep(_buffer_flush_interval_secs)
+                time.sleep(self._flush_interval_secs)
                 # Will retry next time
+            finally:
+                with self._buffer_cond:
+                    if flushed > 0:
+                        self._compact_spill()
+                    # Wake callers waiting for the buffers to drain
+                    self._buffer_cond.notify_all()
+
+    def _wait_for_buffer_capacity(self) -> None:
+        # Apply backpressure: while the buffers are over their memory cap, hold the caller until the flusher drains them
+        with self._buffer_cond:
+            while (
+                self._buffered_bytes >= self._max_buffer_bytes
+                and self._run_background_processes
+            ):
+                self._buffer_cond.notify_all()
+                self._buffer_cond.wait(self._flush_interval_secs)
 
     def buffer_workflow_status(self, status: WorkflowStatusInternal) -> None:
-        self._workflow_status_buffer[status["workflow_uuid"]] = status
+        if status["workflow_uuid"] not in self._temp_txn_wf_ids:
+            # A single-transaction workflow already waited when buffering its inputs, and its
+            # buffered inputs cannot be flushed until its status is buffered too
+            self._wait_for_buffer_capacity()
+        with self._buffer_cond:
+            offset = self._add_buffered_status(status)
+        self._sync_spill(offset)
 
     def buffer_workflow_inputs(self, workflow_id: str, inputs: str) -> None:
         # inputs is a serialized WorkflowInputs string
+        self._wait_for_buffer_capacity()
+        with self._buffer_cond:
+            offset = self._add_buffered_inputs(workflow_id, inputs)
+            self._temp_txn_wf_ids.add(workflow_id)
+        self._sync_spill(offset)
+
+    def _add_buffered_status(self, status: WorkflowStatusInternal) -> int:
+        # Must hold _buffer_cond. Returns the spill offset to sync, if spilling.
+        offset = 0
+        if self._spill is not None:
+            offset = self._spill.append({"status": status})
+        previous = self._workflow_status_buffer.get(status["workflow_uuid"])
+        if previous is not None:
+            self._buffered_bytes -= _buffered_size(previous)
+        self._workflow_status_buffer[status["workflow_uuid"]] = status
+        self._buffered_bytes += _buffered_size(status)
+        if self._is_batch_ready:
+            self._buffer_cond.notify_all()
+        return offset
+
+    def _add_buffered_inputs(self, workflow_id: str, inputs: str) -> int:
+        # Must hold _buffer_cond. Returns the spill offset to sync, if spilling.
+        offset = 0
+        if self._spill is not None:
+            offset = self._spill.append({"inputs": [workflow_id, inputs]})
+        previous = self._workflow_inputs_buffer.get(workflow_id)
+        if previous is not None:
+            self._buffered_bytes -= _buffered_size(previous)
         self._workflow_inputs_buffer[workflow_id] = inputs
-        self._temp_txn_wf_ids.add(workflow_id)
+        self._buffered_bytes += _buffered_size(inputs)
+        if self._is_batch_ready:
+            self._buffer_cond.notify_all()
+        return offset
+
+    def _sync_spill(self, offset: int) -> None:
+        # Syncing outside the buffer lock lets concurrent callers share one sync
+        if self._spill is not None:
+            self._spill.sync(offset)
+
+    def _compact_spill(self) -> None:
+        # Must hold _buffer_cond. Drop flushed entries from the spill file: all of them once the
+        # buffers are empty, or by rewriting the remaining ones when the file grows too large.
+        if self._spill is None:
+            return
+        if self._is_buffers_empty:
+            self._spill.reset()
+        elif self._spill.size > _spill_compaction_factor * self._max_buffer_bytes:
+            self._spill.reset()
+            offset = 0
+            for status in self._workflow_status_buffer.values():
+                offset = self._spill.append({"status": status})
+            for wf_id, inputs in self._workflow_inputs_buffer.items():
+                offset = self._spill.append({"inputs": [wf_id, inputs]})
+            self._spill.sync(offset)
+
+    def _replay_spill(self) -> None:
+        """Flush the entries a previous process left in the spill file, before accepting new ones."""
+        assert self._spill is not None
+        records = self._spill.records()
+        if len(records) == 0:
+            self._spill.reset()
+            return
+        dbos_logger.info(
+            f"Replaying {len(records)} buffered workflow entries from {self._spill.path}"
+        )
+        spill, self._spill = self._spill, None
+        with self._buffer_cond:
+            for record in records:
+                if "status" in record:
+                    self._add_buffered_status(record["status"])
+                else:
+                    self._add_buffered_inputs(*record["inputs"])
+        # Inputs can be flushed once their workflow's status is in the database
+        self._temp_txn_wf_ids.update(self._workflow_inputs_buffer)
+        pending = [
+            wf_id
+            for wf_id in self._workflow_inputs_buffer
+            if wf_id not in self._workflow_status_buffer
+        ]
+        if len(pending) > 0:
+            with self.engine.begin() as c:
+                exported = c.execute(
+                    sa.select(SystemSchema.workflow_status.c.workflow_uuid).where(
+                        SystemSchema.workflow_status.c.workflow_uuid.in_(pending)
+                    )
+                ).scalars()
+                self._exported_temp_txn_wf_status.update(exported)
+        try:
+            while (
+                self._flush_workflow_status_buffer()
+                + self._flush_workflow_inputs_buffer()
+                > 0
+            ):
+                pass
+        finally:
+            self._spill = spill
+        with self._buffer_cond:
+            for wf_id in list(self._workflow_inputs_buffer):
+                # These workflows did not finish before the crash and will not record a status
+                self._buffered_bytes -= _buffered_size(
+                    self._workflow_inputs_buffer.pop(wf_id)
+                )
+                self._temp_txn_wf_ids.discard(wf_id)
+            self._spill.reset()
+
+    @property
+    def _is_batch_ready(self) -> bool:
+        return (
+            len(self._workflow_status_buffer) >= self._flush_batch_size
+            or len(self._workflow_inputs_buffer) >= self._flush_batch_size
+            or self._buffered_bytes >= self._max_buffer_bytes
+        )
+
+    def buffer_sizes(self) -> Dict[str, float]:
+        """Return the number of buffered statuses and inputs, and their approximate size in bytes."""
+        return {
+            "statuses": len(self._workflow_status_buffer),
+            "inputs": len(self._workflow_inputs_buffer),
+            "bytes": self._buffered_bytes,
+        }
 
     @property
     def _is_buffers_empty(self) -> bool:
@@ -1241,15 +1854,129 @@ class SystemDatabase:
     def enqueue(self, workflow_id: str, queue_name: str) -> None:
         with self.engine.begin() as c:
             c.execute(
-                pg.insert(SystemSchema.workflow_queue)
-                .values(
-                    workflow_uuid=workflow_id,
-                    queue_name=queue_name,
+                _enqueue_sql, {"workflow_uuid": workflow_id, "queue_name": queue_name}
+            )
+
+    def _enqueue_times(self, count: int) -> List[int]:
+        with self._enqueue_time_lock:
+            start_ms = max(int(time.time() * 1000), self._last_enqueue_time_ms + 1)
+            self._last_enqueue_time_ms = start_ms + count - 1
+        return list(range(start_ms, start_ms + count))
+
+    def enqueue_workflows(
+        self, workflows: List[Tuple[WorkflowStatusInternal, str]]
+    ) -> List[str]:
+        """
+        Record and enqueue many new workflows, given their statuses and serialized inputs, in one transaction.
+
+        Workflows whose IDs already exist are left untouched. Returns the IDs of the workflows enqueued.
+        """
+        if len(workflows) == 0:
+            return []
+        with self.engine.begin() as c:
+            rows = _execute_multirow(
+                c,
+                _insert_new_workflow_statuses_sql,
+                [_workflow_status_params(status) for status, _ in workflows],
+            )
+            inserted = {row[0] for row in rows}
+            new_workflows = [
+                (status, inputs)
+                for status, inputs in workflows
+                if status["workflow_uuid"] in inserted
+            ]
+            if len(new_workflows) > 0:
+                _execute_multirow(
+                    c,
+                    _insert_workflow_inputs_sql,
+                    [
+                        {"workflow_uuid": status["workflow_uuid"], "inputs": inputs}
+                        for status, inputs in new_workflows
+                    ],
+                )
+                _execute_multirow(
+                    c,
+                    _enqueue_many_sql,
+                    [
+                        {
+                            "workflow_uuid": status["workflow_uuid"],
+                            "queue_name": status["queue_name"],
+                            "created_at_epoch_ms": created_at_ms,
+                        }
+                        for (status, _), created_at_ms in zip(
+                            new_workflows, self._enqueue_times(len(new_workflows))
+                        )
+                    ],
+                )
+        return [status["workflow_uuid"] for status, _ in new_workflows]
+
+    def get_scheduler_state(self, workflow_fn_names: List[str]) -> Dict[str, int]:
+        """Return the last recorded run time, in epoch milliseconds, of each scheduled function that has one."""
+        if len(workflow_fn_names) == 0:
+            return {}
+        with self.engine.begin() as c:
+            rows = c.execute(
+                sa.select(
+                    SystemSchema.scheduler_state.c.workflow_fn_name,
+                    SystemSchema.scheduler_state.c.last_run_time,
+                ).where(
+                    SystemSchema.scheduler_state.c.workflow_fn_name.in_(
+                        workflow_fn_names
+                    )
+                )
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def update_scheduler_state(self, last_run_times: Dict[str, int]) -> None:
+        """Record the latest run times, in epoch milliseconds, of scheduled functions."""
+        if len(last_run_times) == 0:
+            return
+        with self.engine.begin() as c:
+            _execute_multirow(
+                c,
+                _upsert_scheduler_state_sql,
+                [
+                    {"workflow_fn_name": name, "last_run_time": last_run_time}
+                    for name, last_run_time in last_run_times.items()
+                ],
+            )
+
+    def acquire_scheduler_lease(self, owner: str, lease_secs: float) -> bool:
+        """
+        Take or renew the scheduler lease for this owner, unless another owner holds it.
+
+        The lease expires lease_secs after it is taken, measured by the database's clock.
+        """
+        with self.engine.begin() as c:
+            row = c.execute(
+                _acquire_scheduler_lease_sql,
+                {
+                    "lease_name": "scheduler",
+                    "owner": owner,
+                    "lease_ms": int(lease_secs * 1000),
+                },
+            ).fetchone()
+        return row is not None
+
+    def release_scheduler_lease(self, owner: str) -> None:
+        """Give up the scheduler lease if this owner holds it, so another owner can take it at once."""
+        with self.engine.begin() as c:
+            c.execute(
+                sa.delete(SystemSchema.scheduler_lease).where(
+                    SystemSchema.scheduler_lease.c.lease_name == "scheduler",
+                    SystemSchema.scheduler_lease.c.owner == owner,
                 )
-                .on_conflict_do_nothing()
             )
 
-    def start_queued_workflows(self, queue: "Queue", executor_id: str) -> List[str]:
+    def start_queued_workflows(self, queue: "Queue", executor_id: str) -> Dict[
+        str,
+        Tuple[WorkflowStatusInternal, Optional[_serialization.WorkflowInputs]],
+    ]:
+        """
+        Claim workflows from a queue for this executor, within the queue's limits.
+
+        Returns the status and inputs of each claimed workflow, in the order they were enqueued.
+        """
         start_time_ms = int(time.time() * 1000)
         if queue.limiter is not None:
             limiter_period_ms = int(queue.limiter["period"] * 1000)
@@ -1273,7 +2000,7 @@ class SystemDatabase:
                 )
                 num_recent_queries = c.execute(query).fetchone()[0]  # type: ignore
                 if num_recent_queries >= queue.limiter["limit"]:
-                    return []
+                    return {}
 
             # Dequeue functions eligible for this worker and ordered by the time at which they were enqueued.
             # If there is a global or local concurrency limit N, select only the N oldest enqueued
@@ -1332,6 +2059,7 @@ class SystemDatabase:
                     SystemSchema.workflow_queue.c.workflow_uuid,
                     SystemSchema.workflow_queue.c.started_at_epoch_ms,
                     SystemSchema.workflow_queue.c.executor_id,
+                    SystemSchema.workflow_queue.c.created_at_epoch_ms,
                 )
                 .where(SystemSchema.workflow_queue.c.queue_name == queue.name)
                 .where(SystemSchema.workflow_queue.c.completed_at_epoch_ms == None)
@@ -1351,19 +2079,26 @@ class SystemDatabase:
                 dbos_logger.debug(
                     f"[{queue.name}] dequeueing {len(dequeued_ids)} task(s)"
                 )
-            ret_ids: list[str] = []
-
-            for id in dequeued_ids:
-                # If we have a limiter, stop starting functions when the number
-                # of functions started this period exceeds the limit.
-                if queue.limiter is not None:
-                    if len(ret_ids) + num_recent_queries >= queue.limiter["limit"]:
-                        break
-
-                # To start a function, first set its status to PENDING and update its executor ID
-                c.execute(
-                    SystemSchema.workflow_status.update()
-                    .where(SystemSchema.workflow_status.c.workflow_uuid == id)
+            # If we have a limiter, stop starting functions when the number
+            # of functions started this period exceeds the limit.
+            if queue.limiter is not None:
+                dequeued_ids = dequeued_ids[
+                    : max(0, queue.limiter["limit"] - num_recent_queries)
+                ]
+            created_at_ms = {row[0]: row[3] for row in rows[: len(dequeued_ids)]}
+
+            records: Dict[
+                str,
+                Tuple[WorkflowStatusInternal, Optional[_serialization.WorkflowInputs]],
+            ] = {}
+            if len(dequeued_ids) > 0:
+                # To start the functions, set their status to PENDING and their executor ID, returning
+                # their statuses and inputs so they can be dispatched without reading them again
+                claimed = (
+                    sa.update(SystemSchema.workflow_status)
+                    .where(
+                        SystemSchema.workflow_status.c.workflow_uuid.in_(dequeued_ids)
+                    )
                     .where(
                         SystemSchema.workflow_status.c.status
                         == WorkflowStatusString.ENQUEUED.value
@@ -1372,15 +2107,50 @@ class SystemDatabase:
                         status=WorkflowStatusString.PENDING.value,
                         executor_id=executor_id,
                     )
+                    .returning(
+                        *_workflow_status_columns,
+                        SystemSchema.workflow_status.c.workflow_uuid,
+                    )
+                    .cte("claimed")
                 )
+                rows = c.execute(
+                    sa.select(
+                        claimed, SystemSchema.workflow_inputs.c.inputs
+                    ).select_from(
+                        claimed.outerjoin(
+                            SystemSchema.workflow_inputs,
+                            claimed.c.workflow_uuid
+                            == SystemSchema.workflow_inputs.c.workflow_uuid,
+                        )
+                    )
+                ).fetchall()
+                claimed_records = {
+                    row[-2]: _workflow_status_and_inputs_from_row(row) for row in rows
+                }
+                # A dequeued function whose status was not ENQUEUED is still started, as it always was
+                unclaimed_ids = [id for id in dequeued_ids if id not in claimed_records]
+                if len(unclaimed_ids) > 0:
+                    rows = c.execute(
+                        _get_workflows_with_inputs_sql, {"wf_ids": unclaimed_ids}
+                    ).fetchall()
+                    claimed_records.update(
+                        (row[-2], _workflow_status_and_inputs_from_row(row))
+                        for row in rows
+                    )
+                records = {
+                    id: claimed_records[id]
+                    for id in dequeued_ids
+                    if id in claimed_records
+                }
 
-                # Then give it a start time and assign the executor ID
+                # Then give them a start time and assign the executor ID
                 c.execute(
                     SystemSchema.workflow_queue.update()
-                    .where(SystemSchema.workflow_queue.c.workflow_uuid == id)
+                    .where(
+                        SystemSchema.workflow_queue.c.workflow_uuid.in_(dequeued_ids)
+                    )
                     .values(started_at_epoch_ms=start_time_ms, executor_id=executor_id)
                 )
-                ret_ids.append(id)
 
             # If we have a limiter, garbage-collect all completed functions started
             # before the period. If there's no limiter, there's no need--they were
@@ -1396,44 +2166,62 @@ class SystemDatabase:
                     )
                 )
 
-            # Return the IDs of all functions we started
-            return ret_ids
+        # Only the functions actually started, once their start has committed, have waited
+        for id in records:
+            dbos_metrics.queue_wait.observe(
+                max(0, start_time_ms - created_at_ms[id]) / 1000, queue.name
+            )
+
+        # Return the statuses and inputs of all functions we started
+        return records
+
+    def get_queue_depths(self) -> Dict[str, int]:
+        """Return the number of workflows in each queue that have not completed, including those running."""
+        with self.engine.begin() as c:
+            rows = c.execute(
+                sa.select(SystemSchema.workflow_queue.c.queue_name, sa.func.count())
+                .where(SystemSchema.workflow_queue.c.completed_at_epoch_ms.is_(None))
+                .group_by(SystemSchema.workflow_queue.c.queue_name)
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
 
     def remove_from_queue(self, workflow_id: str, queue: "Queue") -> None:
         with self.engine.begin() as c:
             if queue.limiter is None:
-                c.execute(
-                    sa.delete(SystemSchema.workflow_queue).where(
-                        SystemSchema.workflow_queue.c.workflow_uuid == workflow_id
-                    )
-                )
+                c.execute(_delete_from_queue_sql, {"wf_id": workflow_id})
             else:
                 c.execute(
-                    sa.update(SystemSchema.workflow_queue)
-                    .where(SystemSchema.workflow_queue.c.workflow_uuid == workflow_id)
-                    .values(completed_at_epoch_ms=int(time.time() * 1000))
+                    _complete_in_queue_sql,
+                    {"wf_id": workflow_id, "completed_at": int(time.time() * 1000)},
                 )
 
     def clear_queue_assignment(self, workflow_id: str) -> None:
+        self.clear_queue_assignments([workflow_id])
+
+    def clear_queue_assignments(self, workflow_ids: List[str]) -> None:
+        """Return workflows dequeued by this executor to their queues, so any executor can run them."""
+        if len(workflow_ids) == 0:
+            return
         with self.engine.begin() as c:
             c.execute(
                 sa.update(SystemSchema.workflow_queue)
-                .where(SystemSchema.workflow_queue.c.workflow_uuid == workflow_id)
+                .where(SystemSchema.workflow_queue.c.workflow_uuid.in_(workflow_ids))
                 .values(executor_id=None, started_at_epoch_ms=None)
             )
             c.execute(
                 sa.update(SystemSchema.workflow_status)
-                .where(SystemSchema.workflow_status.c.workflow_uuid == workflow_id)
+                .where(SystemSchema.workflow_status.c.workflow_uuid.in_(workflow_ids))
                 .values(executor_id=None, status=WorkflowStatusString.ENQUEUED.value)
             )
+        for workflow_id in workflow_ids:
+            self._status_cache.invalidate(workflow_id)
 
 
 def reset_system_database(config: ConfigFile) -> None:
-    sysdb_name = (
-        config["database"]["sys_db_name"]
-        if "sys_db_name" in config["database"] and config["database"]["sys_db_name"]
-        else config["database"]["app_db_name"] + SystemSchema.sysdb_suffix
-    )
+    sysdb_name = _sys_db_name(config)
+    if _is_colocated(config):
+        _drop_colocated_system_tables(config, sysdb_name)
+        return
     postgres_db_url = sa.URL.create(
         "postgresql+psycopg",
         username=config["database"]["username"],
@@ -1469,3 +2257,35 @@ def reset_system_database(config: ConfigFile) -> None:
     except sa.exc.SQLAlchemyError as e:
         dbos_logger.error(f"Error resetting system database: {str(e)}")
         raise e
+
+
+def _drop_colocated_system_tables(config: ConfigFile, app_db_name: str) -> None:
+    # The system tables share the application database, so drop only them and their migration history
+    app_db_url = sa.URL.create(
+        "postgresql+psycopg",
+        username=config["database"]["username"],
+        password=config["database"]["password"],
+        host=config["database"]["hostname"],
+        port=config["database"]["port"],
+        database=app_db_name,
+    )
+    try:
+        engine = sa.create_engine(app_db_url)
+        with engine.begin() as conn:
+            for table in reversed(SystemSchema.metadata_obj.sorted_tables):
+                conn.execute(sa.text(f"DROP TABLE IF EXISTS dbos.{table.name} CASCADE"))
+            conn.execute(sa.text("DROP FUNCTION IF EXISTS dbos.notifications_function"))
+            conn.execute(
+                sa.text("DROP FUNCTION IF EXISTS dbos.workflow_events_function")
+            )
+            conn.execute(
+                sa.text("DROP FUNCTION IF EXISTS dbos.workflow_status_function")
+            )
+            conn.execute(
+                sa.text("DROP FUNCTION IF EXISTS dbos.workflow_cancel_function")
+            )
+            conn.execute(sa.text("DROP TABLE IF EXISTS dbos.alembic_version"))
+        engine.dispose()
+    except sa.exc.SQLAlchemyError as e:
+        dbos_logger.error(f"Error resetting system database: {str(e)}")
+        raise e
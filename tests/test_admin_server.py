@@ -3,6 +3,7 @@ import threading
 import time
 import uuid
 
+import pytest
 import requests
 import sqlalchemy as sa
 
@@ -64,6 +65,102 @@ def test_admin_endpoints(dbos: DBOS) -> None:
         assert event.is_set(), "Event is not set!"
 
 
+def test_admin_metrics(dbos: DBOS) -> None:
+    queue = Queue("metrics-queue")
+
+    @DBOS.transaction()
+    def test_transaction() -> None:
+        DBOS.sql_session.execute(sa.text("SELECT 1"))
+
+    @DBOS.step()
+    def test_step() -> None:
+        return
+
+    @DBOS.workflow()
+    def test_workflow() -> None:
+        test_transaction()
+        test_step()
+
+    @DBOS.workflow()
+    def failing_workflow() -> None:
+        raise Exception("failed")
+
+    test_workflow()
+    queue.enqueue(test_workflow).get_result()
+    try:
+        failing_workflow()
+    except Exception:
+        pass
+
+    response = requests.get("http://localhost:3001/dbos-metrics", timeout=5)
+    assert response.status_code == 200
+    assert response.headers["Content-type"].startswith("text/plain")
+    samples = {}
+    for line in response.text.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+
+    name = test_workflow.__qualname__
+    assert samples[f'dbos_workflows_started_total{{name="{name}"}}'] >= 2
+    assert samples[f'dbos_workflows_completed_total{{name="{name}"}}'] >= 2
+    failed_name = failing_workflow.__qualname__
+    assert samples[f'dbos_workflows_failed_total{{name="{failed_name}"}}'] >= 1
+    step_name = test_step.__qualname__
+    assert samples[f'dbos_step_duration_seconds_count{{name="{step_name}"}}'] >= 2
+    txn_name = test_transaction.__qualname__
+    assert samples[f'dbos_transaction_duration_seconds_count{{name="{txn_name}"}}'] >= 2
+    assert (
+        samples['dbos_system_db_statement_duration_seconds_count{operation="INSERT"}']
+        > 0
+    )
+    assert samples['dbos_queue_wait_seconds_count{queue="metrics-queue"}'] >= 1
+    assert samples['dbos_db_pool_checkouts_total{pool="system"}'] > 0
+    assert samples['dbos_db_pool_checkout_wait_seconds_count{pool="system"}'] > 0
+    assert "# TYPE dbos_workflow_status_cache_hits_total counter" in response.text
+    assert "# TYPE dbos_workflow_status_cache_misses_total counter" in response.text
+    assert samples['dbos_db_pool_capacity{pool="system"}'] > 0
+    assert samples["dbos_executor_threads"] > 0
+    assert "dbos_workflow_buffer_bytes" in samples
+
+
+def test_admin_perf(dbos: DBOS) -> None:
+    event = threading.Event()
+
+    @DBOS.workflow()
+    def test_workflow() -> None:
+        event.wait()
+
+    response = requests.get("http://localhost:3001/dbos-perf", timeout=5)
+    assert response.status_code == 200
+    idle = response.json()
+    assert set(idle.keys()) == {"idle", "active", "utilization"}
+    assert idle["utilization"] < 0.1
+
+    # Workflows running on the thread pool count as active
+    handles = [DBOS.start_workflow(test_workflow) for _ in range(8)]
+    try:
+        time.sleep(1)
+        response = requests.get("http://localhost:3001/dbos-perf", timeout=5)
+        assert response.status_code == 200
+        busy = response.json()
+        assert busy["active"] > 0
+        assert busy["idle"] > 0
+        assert 0 < busy["utilization"] < 1
+        assert busy["utilization"] == pytest.approx(
+            busy["active"] / (busy["active"] + busy["idle"])
+        )
+
+        response = requests.get("http://localhost:3001/dbos-metrics", timeout=5)
+        assert "dbos_executor_active_tasks 8" in response.text.splitlines()
+    finally:
+        event.set()
+    for handle in handles:
+        handle.get_result()
+    response = requests.get("http://localhost:3001/dbos-perf", timeout=5)
+    assert response.json()["active"] >= busy["active"]
+
+
 def test_admin_recovery(config: ConfigFile) -> None:
     os.environ["DBOS__VMID"] = "testexecutor"
     os.environ["DBOS__APPVERSION"] = "testversion"
@@ -8,8 +8,7 @@ import sqlalchemy as sa
 
 # Public API
 from dbos import DBOS, SetWorkflowID
-from dbos._dbos_config import ConfigFile
-from dbos._error import DBOSException
+from dbos._context import DBOSContextEnsure, assert_current_dbos_context
 
 
 @pytest.mark.asyncio
@@ -294,16 +293,103 @@ async def test_sleep(dbos: DBOS) -> None:
         assert time.time() - start_time < 0.3
 
 
-def test_async_tx_raises(config: ConfigFile) -> None:
+@pytest.mark.asyncio
+async def test_async_transaction(dbos: DBOS) -> None:
+    txn_counter: int = 0
+    wf_counter: int = 0
+
+    @DBOS.workflow()
+    async def test_workflow(var1: str, var2: str) -> str:
+        nonlocal wf_counter
+        wf_counter += 1
+        res1 = await test_transaction(var1)
+        res2 = await test_transaction(var2)
+        DBOS.logger.info("I'm test_workflow")
+        return res1 + res2
+
+    @DBOS.transaction(isolation_level="REPEATABLE READ")
+    async def test_transaction(var: str) -> str:
+        rows = (await DBOS.async_sql_session.execute(sa.text("SELECT 1"))).fetchall()
+        nonlocal txn_counter
+        txn_counter += 1
+        DBOS.logger.info("I'm test_transaction")
+        return var + f"txn{txn_counter}{rows[0][0]}"
 
-    with pytest.raises(DBOSException) as exc_info:
+    wfuuid = f"test_async_transaction-{time.time_ns()}"
+    with SetWorkflowID(wfuuid):
+        result = await test_workflow("alice", "bob")
+        assert result == "alicetxn11bobtxn21"
+    dbos._sys_db.wait_for_buffer_flush()
 
-        @DBOS.transaction()
-        async def test_async_tx() -> None:
-            pass
+    with SetWorkflowID(wfuuid):
+        result = await test_workflow("alice", "bob")
+        assert result == "alicetxn11bobtxn21"
 
-    # destroy call needed to avoid "functions were registered but DBOS() was not called" warning
-    DBOS.destroy(destroy_registry=True)
+    assert wf_counter == 2
+    assert txn_counter == 2
+
+    # Run it as a temporary workflow, outside of a workflow
+    temp_uuid = f"test_async_transaction_temp-{time.time_ns()}"
+    with SetWorkflowID(temp_uuid):
+        result = await test_transaction("carol")
+        assert result == "caroltxn31"
+    dbos._sys_db.wait_for_buffer_flush()
+
+    with SetWorkflowID(temp_uuid):
+        result = await test_transaction("carol")
+        assert result == "caroltxn31"
+    assert txn_counter == 3
+
+    # Run it from a thread-executed workflow with its own event loop
+    handle = dbos.start_workflow(test_workflow, "dave", "eve")
+    assert handle.get_result() == "davetxn41evetxn51"
+    assert txn_counter == 5
+
+
+@pytest.mark.asyncio
+async def test_async_transaction_error(dbos: DBOS) -> None:
+    txn_counter: int = 0
+
+    @DBOS.transaction()
+    async def test_transaction(var: str) -> str:
+        await DBOS.async_sql_session.execute(sa.text("SELECT 1"))
+        nonlocal txn_counter
+        txn_counter += 1
+        raise Exception(var)
+
+    wfuuid = f"test_async_transaction_error-{time.time_ns()}"
+    with pytest.raises(Exception) as exc_info:
+        with SetWorkflowID(wfuuid):
+            await test_transaction("oops")
+    assert "oops" in str(exc_info.value)
+    assert txn_counter == 1
+
+    # The recorded error is replayed without running the transaction again
+    with pytest.raises(Exception) as exc_info:
+        with SetWorkflowID(wfuuid):
+            await test_transaction("oops")
+    assert "oops" in str(exc_info.value)
+    assert txn_counter == 1
+
+
+@pytest.mark.asyncio
+async def test_async_transaction_role(dbos: DBOS) -> None:
+    @DBOS.workflow()
+    async def test_workflow() -> Optional[str]:
+        role = await test_transaction()
+        assert DBOS.assumed_role is None
+        return role
+
+    @DBOS.required_roles(["user"])
+    @DBOS.transaction()
+    async def test_transaction() -> Optional[str]:
+        await DBOS.async_sql_session.execute(sa.text("SELECT 1"))
+        return DBOS.assumed_role
+
+    # The role is assumed while the transaction body runs, not only when it is called
+    with DBOSContextEnsure():
+        assert_current_dbos_context().authenticated_roles = ["user"]
+        assert (await test_workflow()) == "user"
 
 
 @pytest.mark.asyncio
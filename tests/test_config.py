@@ -1,12 +1,15 @@
 # type: ignore
 
 import os
+import time
 from unittest.mock import mock_open
 
 import pytest
+import sqlalchemy as sa
 
 # Public API
-from dbos import load_config
+from dbos import DBOS, load_config
+from dbos._db_pool import _observe_pool_saturation
 from dbos._dbos_config import set_env_vars
 from dbos._error import DBOSInitializationError
 
@@ -422,3 +425,159 @@ def test_no_db_wizard(mocker):
     with pytest.raises(DBOSInitializationError) as exc_info:
         load_config(mock_filename)
     assert "Could not connect" in str(exc_info.value)
+
+
+def test_config_pool_settings(mocker):
+    mock_config = """
+        name: "some-app"
+        language: "python"
+        runtimeConfig:
+            start:
+                - "python3 main.py"
+        database:
+          hostname: 'localhost'
+          port: 5432
+          username: 'postgres'
+          password: ${PGPASSWORD}
+          pgbouncer_transaction_mode: true
+          listener_hostname: 'postgres-direct'
+          listener_port: 5433
+          app_db_pool:
+            pool_size: 4
+            max_overflow: 0
+            pool_timeout: 5
+            pool_pre_ping: true
+            pool_recycle: 600
+          sys_db_pool:
+            pool_size: 8
+            query_cache_size: 100
+            prepare_threshold: null
+        telemetry:
+          OTLPExporter:
+            metricsEndpoint: 'http://localhost:4318/v1/metrics'
+    """
+    mocker.patch(
+        "builtins.open", side_effect=generate_mock_open(mock_filename, mock_config)
+    )
+
+    configFile = load_config(mock_filename)
+    assert configFile["database"]["app_db_pool"]["pool_size"] == 4
+    assert configFile["database"]["app_db_pool"]["pool_pre_ping"] is True
+    assert configFile["database"]["sys_db_pool"]["pool_size"] == 8
+    assert configFile["database"]["sys_db_pool"]["prepare_threshold"] is None
+    assert configFile["database"]["pgbouncer_transaction_mode"] is True
+    assert configFile["database"]["listener_hostname"] == "postgres-direct"
+    assert configFile["database"]["listener_port"] == 5433
+    assert (
+        configFile["telemetry"]["OTLPExporter"]["metricsEndpoint"]
+        == "http://localhost:4318/v1/metrics"
+    )
+
+
+def test_config_bad_pool_settings(mocker):
+    mock_config = """
+        name: "some-app"
+        language: "python"
+        runtimeConfig:
+            start:
+                - "python3 main.py"
+        database:
+          app_db_pool:
+            pool_size: 'large'
+    """
+    mocker.patch(
+        "builtins.open", side_effect=generate_mock_open(mock_filename, mock_config)
+    )
+
+    with pytest.raises(DBOSInitializationError) as exc_info:
+        load_config(mock_filename)
+    assert "Validation error" in str(exc_info.value)
+
+
+def test_pool_settings_applied(config, cleanup_test_databases):
+    config["database"]["app_db_pool"] = {"pool_size": 3, "max_overflow": 1}
+    config["database"]["sys_db_pool"] = {"pool_size": 7, "pool_timeout": 2}
+    DBOS.destroy(destroy_registry=True)
+    dbos = DBOS(config=config)
+    DBOS.launch()
+    try:
+        assert dbos._app_db.engine.pool.size() == 3
+        assert dbos._app_db.engine.pool._max_overflow == 1
+        assert dbos._sys_db.engine.pool.size() == 7
+        assert dbos._sys_db.engine.pool._timeout == 2
+
+        # Saturation is reported per pool as the fraction of checked out connections
+        with dbos._app_db.engine.connect():
+            saturation = {
+                o.attributes["pool"]: o.value for o in _observe_pool_saturation()
+            }
+            assert saturation["application"] == pytest.approx(1 / 4)
+    finally:
+        DBOS.destroy(destroy_registry=True)
+
+
+def test_pgbouncer_transaction_mode(config, cleanup_test_databases):
+    config["database"]["pgbouncer_transaction_mode"] = True
+    config["database"]["listener_hostname"] = "127.0.0.1"
+    DBOS.destroy(destroy_registry=True)
+
+    @DBOS.workflow()
+    def test_workflow() -> str:
+        return DBOS.recv("topic", timeout_seconds=10)
+
+    dbos = DBOS(config=config)
+    DBOS.launch()
+    try:
+        for engine in [dbos._app_db.engine, dbos._sys_db.engine]:
+            with engine.connect() as conn:
+                assert conn.connection.driver_connection.prepare_threshold is None
+        assert dbos._sys_db._listener_url.host == "127.0.0.1"
+
+        # Hot-path statements are not prepared server-side
+        with dbos._sys_db.engine.connect() as conn:
+            dbos._sys_db.check_operation_execution("nonexistent", 1, conn=conn)
+            prepared = conn.execute(
+                sa.text("SELECT count(*) FROM pg_prepared_statements")
+            ).scalar()
+            assert prepared == 0
+
+        # Notifications are delivered through the listener connection
+        handle = DBOS.start_workflow(test_workflow)
+        start_time = time.time()
+        DBOS.send(handle.workflow_id, "hello", "topic")
+        assert handle.get_result() == "hello"
+        assert time.time() - start_time < 5
+    finally:
+        DBOS.destroy(destroy_registry=True)
+
+
+def test_pgbouncer_transaction_mode_no_listener_hostname(
+    config, cleanup_test_databases
+):
+    config["database"]["pgbouncer_transaction_mode"] = True
+    DBOS.destroy(destroy_registry=True)
+
+    dbos = DBOS(config=config)
+    DBOS.launch()
+    try:
+        deadline = time.time() + 5
+        while dbos._sys_db.notification_conn is None and time.time() < deadline:
+            time.sleep(0.1)
+        assert dbos._sys_db.notification_conn is not None
+        time.sleep(0.5)
+        # Notifications through the transaction pooler may be lost, so statuses are not cached
+        assert not dbos._sys_db._status_cache.enabled
+    finally:
+        DBOS.destroy(destroy_registry=True)
+
+
+def test_sys_db_statements_prepared(sys_db):
+    with sys_db.engine.connect() as conn:
+        sys_db.check_operation_execution("nonexistent", 1, conn=conn)
+        sys_db.check_operation_execution("nonexistent", 2, conn=conn)
+        statements = conn.execute(
+            sa.text("SELECT statement FROM pg_prepared_statements")
+        ).fetchall()
+        # Prepared on first use, and reused afterwards
+        assert len(statements) == 1
+        assert "operation_outputs" in statements[0][0]
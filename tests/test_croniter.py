@@ -29,6 +29,7 @@ import dateutil.tz
 import pytz
 
 from dbos._croniter import (
+    CompiledCron,
     CroniterBadCronError,
     CroniterBadDateError,
     CroniterNotAlphaError,
@@ -2219,5 +2220,82 @@ class CroniterTest(TestCase):
         self.assertEqual(uretn, uretan)
 
 
+class CompiledCronTest(TestCase):
+
+    EXPRESSIONS = [
+        "* * * * * *",
+        "*/5 * * * * *",
+        "15,45 * * * * *",
+        "30 0 0 * * *",
+        "0 9 * * mon-fri",
+        "*/7 3-5 */3 1,6 *",
+        "0 0 L * *",
+        "0 12 L,15 * *",
+        "0 0 31 * *",
+        "0 0 29 2 *",
+        "0 0 13 * fri",
+        "0 0 1,15 * 7",
+        "0 0 * * 5-7",
+        "H H * * *",
+        # Delegated to croniter
+        "0 0 * * fri#2",
+        "0 0 * * L5",
+    ]
+
+    def testMatchesCroniter(self):
+        start = datetime(2024, 2, 28, 23, 59, 58, tzinfo=dateutil.tz.tzutc())
+        for offset in [timedelta(0), timedelta(microseconds=500000)] + [
+            timedelta(days=d, seconds=d * 3607) for d in range(1, 400, 37)
+        ]:
+            t = start + offset
+            for expr in self.EXPRESSIONS:
+                second_at_beginning = len(expr.split()) == 6
+                compiled = CompiledCron(
+                    expr, second_at_beginning=second_at_beginning, hash_id="hash"
+                )
+                it = croniter(
+                    expr, t, second_at_beginning=second_at_beginning, hash_id="hash"
+                )
+                self.assertEqual(
+                    compiled.next_n(t, 10),
+                    [it.get_next(datetime) for _ in range(10)],
+                )
+                it = croniter(
+                    expr, t, second_at_beginning=second_at_beginning, hash_id="hash"
+                )
+                self.assertEqual(
+                    compiled.prev_n(t, 10),
+                    [it.get_prev(datetime) for _ in range(10)],
+                )
+
+    def testCompiled(self):
+        self.assertTrue(
+            CompiledCron("*/5 * * * * *", second_at_beginning=True).compiled
+        )
+        self.assertFalse(CompiledCron("0 0 * * fri#2").compiled)
+        self.assertRaises(CroniterBadCronError, CompiledCron, "* * * *")
+
+    def testNaiveAndTimezone(self):
+        compiled = CompiledCron("0 9 * * *")
+        self.assertEqual(
+            compiled.get_next(datetime(2024, 7, 12, 9, 0)), datetime(2024, 7, 13, 9, 0)
+        )
+        self.assertEqual(
+            compiled.get_prev(datetime(2024, 7, 12, 9, 0)), datetime(2024, 7, 11, 9, 0)
+        )
+        # Other time zones follow croniter, including across DST changes
+        tz = pytz.timezone("Europe/Paris")
+        t = tz.localize(datetime(2024, 3, 30, 12, 0))
+        it = croniter("0 9 * * *", t)
+        self.assertEqual(
+            compiled.next_n(t, 3), [it.get_next(datetime) for _ in range(3)]
+        )
+
+    def testNoMatch(self):
+        compiled = CompiledCron("0 0 30 2 *")
+        self.assertRaises(CroniterBadDateError, compiled.get_next, datetime(2024, 1, 1))
+        self.assertRaises(CroniterBadDateError, compiled.get_prev, datetime(2024, 1, 1))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -16,9 +16,14 @@ from dbos import DBOS, ConfigFile, SetWorkflowID, WorkflowHandle, WorkflowStatus
 
 # Private API because this is a test
 from dbos._context import assert_current_dbos_context, get_local_dbos_context
-from dbos._error import DBOSConflictingRegistrationError, DBOSMaxStepRetriesExceeded
+from dbos._error import (
+    DBOSConflictingRegistrationError,
+    DBOSMaxStepRetriesExceeded,
+    DBOSNonExistentWorkflowError,
+)
+from dbos._recovery import startup_recovery_thread
 from dbos._schemas.system_database import SystemSchema
-from dbos._sys_db import GetWorkflowsInput
+from dbos._sys_db import GetPendingWorkflowsOutput, GetWorkflowsInput
 from dbos._utils import GlobalParams
 
 
@@ -461,6 +466,71 @@ def test_recovery_workflow_step(dbos: DBOS) -> None:
     assert stat.recovery_attempts == 2
 
 
+def test_startup_recovery(dbos: DBOS) -> None:
+    wf_counter: int = 0
+
+    @DBOS.workflow()
+    def test_workflow(var: str) -> str:
+        nonlocal wf_counter
+        wf_counter += 1
+        return var
+
+    wfuuids = [str(uuid.uuid4()) for _ in range(20)]
+    for wfuuid in wfuuids:
+        with SetWorkflowID(wfuuid):
+            assert test_workflow(wfuuid) == wfuuid
+    dbos._sys_db.wait_for_buffer_flush()
+
+    # Change the workflow statuses to pending
+    with dbos._sys_db.engine.begin() as c:
+        c.execute(
+            sa.update(SystemSchema.workflow_status)
+            .values({"status": "PENDING"})
+            .where(SystemSchema.workflow_status.c.workflow_uuid.in_(wfuuids))
+        )
+
+    # Recovery fetches the workflows in bulk and runs them concurrently.
+    # A workflow that cannot be recovered does not stop the others.
+    pending = [
+        GetPendingWorkflowsOutput(workflow_uuid=wfuuid)
+        for wfuuid in [str(uuid.uuid4())] + wfuuids
+    ]
+    startup_recovery_thread(dbos, pending)
+    for wfuuid in wfuuids:
+        assert DBOS.retrieve_workflow(wfuuid).get_result() == wfuuid
+    assert wf_counter == 40
+
+
+def test_get_workflows_with_inputs(dbos: DBOS) -> None:
+
+    @DBOS.workflow()
+    def test_workflow(var: str, *, suffix: str) -> str:
+        return var + suffix
+
+    wfuuids = [str(uuid.uuid4()) for _ in range(3)]
+    for i, wfuuid in enumerate(wfuuids):
+        with SetWorkflowID(wfuuid):
+            assert test_workflow(str(i), suffix="!") == f"{i}!"
+    dbos._sys_db.wait_for_buffer_flush()
+
+    # One query fetches a workflow's status and inputs together
+    record = dbos._sys_db.get_workflow_with_inputs(wfuuids[0])
+    assert record is not None
+    status, inputs = record
+    assert status["workflow_uuid"] == wfuuids[0]
+    assert status["status"] == WorkflowStatusString.SUCCESS.value
+    assert inputs == {"args": ("0",), "kwargs": {"suffix": "!"}}
+    assert dbos._sys_db.get_workflow_with_inputs(str(uuid.uuid4())) is None
+
+    # As does one query for a batch, which omits workflows that do not exist
+    records = dbos._sys_db.get_workflows_with_inputs(wfuuids + [str(uuid.uuid4())])
+    assert set(records) == set(wfuuids)
+    for i, wfuuid in enumerate(wfuuids):
+        status, inputs = records[wfuuid]
+        assert status["name"] == record[0]["name"]
+        assert inputs is not None and inputs["args"] == (str(i),)
+
+
 def test_workflow_returns_none(dbos: DBOS) -> None:
     wf_counter: int = 0
 
@@ -1354,3 +1424,114 @@ def test_recovery_appversion(config: ConfigFile) -> None:
     # The workflow should not recover
     workflow_handles = DBOS.recover_pending_workflows()
     assert len(workflow_handles) == 0
+
+
+def test_send_nonexistent_destination(dbos: DBOS) -> None:
+    @DBOS.workflow()
+    def test_send_workflow(dest_uuid: str) -> None:
+        DBOS.send(dest_uuid, "hello")
+
+    with pytest.raises(DBOSNonExistentWorkflowError):
+        test_send_workflow(str(uuid.uuid4()))
+
+
+def test_first_execution_skips_step_checks(dbos: DBOS) -> None:
+    step_counter: int = 0
+    first_executions: list[bool] = []
+
+    @DBOS.workflow()
+    def test_workflow(var: str) -> str:
+        first_executions.append(assert_current_dbos_context().is_first_execution)
+        test_step(var)
+        test_step(var)
+        return var
+
+    @DBOS.step()
+    def test_step(var: str) -> str:
+        nonlocal step_counter
+        step_counter += 1
+        return var
+
+    checked: list[int] = []
+    check_operation_execution = dbos._sys_db.check_operation_execution
+
+    def counting_check(workflow_uuid: str, function_id: int) -> Optional[object]:
+        checked.append(function_id)
+        return check_operation_execution(workflow_uuid, function_id)
+
+    dbos._sys_db.check_operation_execution = counting_check  # type: ignore
+
+    # A fresh execution does not look up recorded step outputs
+    wfuuid = str(uuid.uuid4())
+    with SetWorkflowID(wfuuid):
+        assert test_workflow("bob") == "bob"
+    assert first_executions == [True]
+    assert checked == []
+    assert step_counter == 2
+
+    # Re-executing the same workflow ID replays the recorded steps
+    with SetWorkflowID(wfuuid):
+        assert test_workflow("bob") == "bob"
+    assert first_executions == [True, False]
+    assert checked == [1, 2]
+    assert step_counter == 2
+
+    # So does recovery
+    dbos._sys_db.wait_for_buffer_flush()
+    with dbos._sys_db.engine.begin() as c:
+        c.execute(
+            sa.update(SystemSchema.workflow_status)
+            .values({"status": "PENDING"})
+            .where(SystemSchema.workflow_status.c.workflow_uuid == wfuuid)
+        )
+    workflow_handles = DBOS.recover_pending_workflows()
+    assert len(workflow_handles) == 1
+    assert workflow_handles[0].get_result() == "bob"
+    assert first_executions == [True, False, False]
+    assert checked == [1, 2, 1, 2]
+    assert step_counter == 2
+
+
+def test_relaxed_status_workflow(dbos: DBOS) -> None:
+    wf_counter: int = 0
+
+    @DBOS.workflow(relaxed_status=True)
+    def relaxed_workflow(fail: bool) -> str:
+        nonlocal wf_counter
+        wf_counter += 1
+        if fail:
+            raise Exception("relaxed error")
+        return "done"
+
+    # A failing relaxed workflow buffers its error status instead of writing it synchronously
+    wfuuid = str(uuid.uuid4())
+    with dbos._sys_db._buffer_cond:
+        with SetWorkflowID(wfuuid):
+            with pytest.raises(Exception) as exc_info:
+                relaxed_workflow(True)
+        assert "relaxed error" == str(exc_info.value)
+        assert wfuuid in dbos._sys_db._workflow_status_buffer
+        status = dbos._sys_db.get_workflow_status(wfuuid)
+        assert status is not None
+        assert status["status"] == WorkflowStatusString.PENDING.value
+
+    dbos._sys_db.wait_for_buffer_flush()
+    status = dbos._sys_db.get_workflow_status(wfuuid)
+    assert status is not None
+    assert status["status"] == WorkflowStatusString.ERROR.value
+
+    # Its recorded error is returned without running it again
+    handle = DBOS.execute_workflow_id(wfuuid)
+    with pytest.raises(Exception) as exc_info:
+        handle.get_result()
+    assert "relaxed error" == str(exc_info.value)
+    assert wf_counter == 1
+
+    # Started workflows use the relaxed mode too
+    wfuuid = str(uuid.uuid4())
+    with SetWorkflowID(wfuuid):
+        handle = DBOS.start_workflow(relaxed_workflow, True)
+    with pytest.raises(Exception) as exc_info:
+        handle.get_result()
+    dbos._sys_db.wait_for_buffer_flush()
+    assert handle.get_status().status == WorkflowStatusString.ERROR.value
@@ -4,9 +4,19 @@ import time
 from typing import NoReturn
 
 import pytest
-from confluent_kafka import KafkaError, Producer
+import sqlalchemy as sa
+from confluent_kafka import Consumer, KafkaError, Producer, TopicPartition
 
-from dbos import DBOS, KafkaMessage
+from dbos import DBOS, KafkaMessage, Queue
+from dbos._error import DBOSException
+from dbos._kafka import (
+    _batch_workflow_id,
+    _enqueue_message_batches,
+    _enqueue_messages,
+    _in_order_kafka_queues,
+)
+from dbos._schemas.system_database import SystemSchema
+from dbos._sys_db import WorkflowStatusString
 
 # These tests require local Kafka to run.
 # Without it, they're automatically skipped.
@@ -57,6 +67,23 @@ def send_test_messages(server: str, topic: str) -> bool:
         pass
 
 
+def consumed_test_messages(topic: str, num_messages: int) -> list[KafkaMessage]:
+    return [
+        KafkaMessage(
+            headers=None,
+            key=f"test message key {i}",
+            latency=None,
+            leader_epoch=None,
+            offset=i,
+            partition=0,
+            timestamp=(0, 0),
+            topic=topic,
+            value=f"test message value {i}",
+        )
+        for i in range(num_messages)
+    ]
+
+
 def test_kafka(dbos: DBOS) -> None:
     event = threading.Event()
     kafka_count = 0
@@ -123,6 +150,66 @@ def test_kafka_in_order(dbos: DBOS) -> None:
     time.sleep(2)  # Wait for things to clean up
 
 
+def test_kafka_in_order_batch(dbos: DBOS) -> None:
+    # Enqueues a consumed batch directly, so it runs without Kafka
+    topic = f"dbos-kafka-{random.randrange(1_000_000_000)}"
+    num_messages = 5
+    offsets: list[int] = []
+    event = threading.Event()
+
+    @DBOS.workflow()
+    def test_kafka_workflow(msg: KafkaMessage) -> None:
+        assert msg.offset is not None
+        offsets.append(msg.offset)
+        if len(offsets) == num_messages:
+            event.set()
+
+    _in_order_kafka_queues[topic] = Queue(
+        f"_dbos_kafka_queue_topic_{topic}", concurrency=1
+    )
+    try:
+        messages = consumed_test_messages(topic, num_messages)
+        # The whole batch is enqueued in one statement, and must still run in offset order
+        _enqueue_messages(
+            dbos._registry, test_kafka_workflow, messages, "dbos-test", True
+        )
+        assert event.wait(timeout=20)
+        assert offsets == list(range(num_messages))
+    finally:
+        del _in_order_kafka_queues[topic]
+
+
+def test_kafka_batch_conflict(dbos: DBOS) -> None:
+    # Enqueues a consumed batch directly, so it runs without Kafka
+    topic = f"dbos-kafka-{random.randrange(1_000_000_000)}"
+
+    @DBOS.workflow()
+    def test_kafka_workflow(msgs: list[KafkaMessage]) -> None:
+        pass
+
+    _in_order_kafka_queues[topic] = Queue(
+        f"_dbos_kafka_queue_topic_{topic}", concurrency=1
+    )
+    try:
+        messages = consumed_test_messages(topic, NUM_EVENTS)
+        # A workflow with the batch's ID but no recorded messages
+        with dbos._sys_db.engine.begin() as c:
+            c.execute(
+                sa.insert(SystemSchema.workflow_status).values(
+                    workflow_uuid=_batch_workflow_id(messages, "dbos-test"),
+                    status=WorkflowStatusString.SUCCESS.value,
+                    name=test_kafka_workflow.__qualname__,
+                )
+            )
+        # The batch fails, to be retried by the consumer loop, rather than retrying forever
+        with pytest.raises(DBOSException):
+            _enqueue_message_batches(
+                dbos._registry, test_kafka_workflow, messages, "dbos-test", True
+            )
+    finally:
+        del _in_order_kafka_queues[topic]
+
+
 def test_kafka_no_groupid(dbos: DBOS) -> None:
     event = threading.Event()
     kafka_count = 0
@@ -156,3 +243,161 @@ def test_kafka_no_groupid(dbos: DBOS) -> None:
     wait = event.wait(timeout=10)
     assert wait
     assert kafka_count == 6
+
+
+def test_kafka_batch_consume(dbos: DBOS) -> None:
+    event = threading.Event()
+    kafka_count = 0
+    server = "localhost:9092"
+    topic = f"dbos-kafka-{random.randrange(1_000_000_000)}"
+
+    if not send_test_messages(server, topic):
+        pytest.skip("Kafka not available")
+
+    # The messages are consumed and enqueued together
+    @DBOS.kafka_consumer(
+        {
+            "bootstrap.servers": server,
+            "group.id": "dbos-test",
+            "auto.offset.reset": "earliest",
+        },
+        [topic],
+        max_batch_size=10,
+        batch_linger_secs=0.5,
+    )
+    @DBOS.workflow()
+    def test_kafka_workflow(msg: KafkaMessage) -> None:
+        nonlocal kafka_count
+        kafka_count += 1
+        assert b"test message key" in msg.key  # type: ignore
+        assert b"test message value" in msg.value  # type: ignore
+        assert DBOS.workflow_id == (
+            f"kafka-unique-id-{msg.topic}-{msg.partition}-dbos-test-{msg.offset}"
+        )
+        if kafka_count == 3:
+            event.set()
+
+    wait = event.wait(timeout=10)
+    assert wait
+    assert kafka_count == 3
+
+
+def test_kafka_batch_workflow(dbos: DBOS) -> None:
+    event = threading.Event()
+    kafka_count = 0
+    server = "localhost:9092"
+    topic = f"dbos-kafka-{random.randrange(1_000_000_000)}"
+
+    if not send_test_messages(server, topic):
+        pytest.skip("Kafka not available")
+
+    # Each workflow receives the consumed messages of one partition
+    @DBOS.kafka_consumer(
+        {
+            "bootstrap.servers": server,
+            "group.id": "dbos-test",
+            "auto.offset.reset": "earliest",
+        },
+        [topic],
+        max_batch_size=10,
+        batch_linger_secs=0.5,
+        batch=True,
+    )
+    @DBOS.workflow()
+    def test_kafka_workflow(msgs: list[KafkaMessage]) -> None:
+        nonlocal kafka_count
+        assert len(msgs) > 0
+        assert [msg.offset for msg in msgs] == sorted(msg.offset for msg in msgs)  # type: ignore
+        for msg in msgs:
+            assert msg.partition == msgs[0].partition
+            assert b"test message key" in msg.key  # type: ignore
+            assert b"test message value" in msg.value  # type: ignore
+        assert DBOS.workflow_id == (
+            f"kafka-batch-id-{topic}-{msgs[0].partition}-dbos-test-{msgs[0].offset}"
+        )
+        kafka_count += len(msgs)
+        if kafka_count == 3:
+            event.set()
+
+    wait = event.wait(timeout=10)
+    assert wait
+    assert kafka_count == 3
+
+
+def test_kafka_manual_commit(dbos: DBOS) -> None:
+    event = threading.Event()
+    kafka_count = 0
+    server = "localhost:9092"
+    topic = f"dbos-kafka-{random.randrange(1_000_000_000)}"
+    group_id = f"dbos-test-{random.randrange(1_000_000_000)}"
+
+    if not send_test_messages(server, topic):
+        pytest.skip("Kafka not available")
+
+    # Offsets are committed once the messages are enqueued
+    @DBOS.kafka_consumer(
+        {
+            "bootstrap.servers": server,
+            "group.id": group_id,
+            "auto.offset.reset": "earliest",
+        },
+        [topic],
+        manual_commit=True,
+    )
+    @DBOS.workflow()
+    def test_kafka_workflow(msg: KafkaMessage) -> None:
+        nonlocal kafka_count
+        kafka_count += 1
+        if kafka_count == 3:
+            event.set()
+
+    wait = event.wait(timeout=10)
+    assert wait
+    assert kafka_count == 3
+
+    consumer = Consumer({"bootstrap.servers": server, "group.id": group_id})
+    try:
+        committed = 0
+        for _ in range(10):
+            partitions = consumer.committed([TopicPartition(topic, 0)], timeout=5)
+            committed = max(partitions[0].offset, 0)
+            if committed == 3:
+                break
+            time.sleep(1)
+        assert committed == 3
+    finally:
+        consumer.close()
+
+
+def test_kafka_consumer_threads(dbos: DBOS) -> None:
+    event = threading.Event()
+    kafka_count = 0
+    lock = threading.Lock()
+    server = "localhost:9092"
+    topic = f"dbos-kafka-{random.randrange(1_000_000_000)}"
+
+    if not send_test_messages(server, topic):
+        pytest.skip("Kafka not available")
+
+    # The consumers share the topic's partitions, so each message is processed once
+    @DBOS.kafka_consumer(
+        {
+            "bootstrap.servers": server,
+            "group.id": "dbos-test",
+            "auto.offset.reset": "earliest",
+        },
+        [topic],
+        consumer_threads=2,
+    )
+    @DBOS.workflow()
+    def test_kafka_workflow(msg: KafkaMessage) -> None:
+        nonlocal kafka_count
+        with lock:
+            kafka_count += 1
+            if kafka_count == 3:
+                event.set()
+
+    wait = event.wait(timeout=10)
+    assert wait
+    time.sleep(2)
+    assert kafka_count == 3
@@ -18,6 +18,7 @@ from dbos import (
     SetWorkflowID,
     WorkflowHandle,
 )
+from dbos._core import enqueue_workflows
 from dbos._schemas.system_database import SystemSchema
 from dbos._sys_db import WorkflowStatusString
 from tests.conftest import default_config, queue_entries_are_cleaned_up
@@ -972,3 +973,87 @@ def test_dlq_enqueued_workflows(dbos: DBOS) -> None:
 
     # Verify all queue entries eventually get cleaned up.
     assert queue_entries_are_cleaned_up(dbos)
+
+
+def test_start_queued_workflows_returns_records(dbos: DBOS) -> None:
+    @DBOS.workflow()
+    def test_workflow(var: str, n: int = 0) -> str:
+        return var * n
+
+    queue = Queue("test_start_queue")
+    # Unregister the queue so only this test dequeues from it
+    del dbos._registry.queue_info_map[queue.name]
+
+    wf_ids = []
+    for i in range(3):
+        wf_ids.append(queue.enqueue(test_workflow, f"arg{i}", n=i).get_workflow_id())
+        time.sleep(0.01)
+
+    # A dequeued workflow whose status is no longer ENQUEUED is still started
+    with dbos._sys_db.engine.begin() as c:
+        c.execute(
+            sa.update(SystemSchema.workflow_status)
+            .where(SystemSchema.workflow_status.c.workflow_uuid == wf_ids[1])
+            .values(status=WorkflowStatusString.PENDING.value)
+        )
+
+    records = dbos._sys_db.start_queued_workflows(queue, "test-executor")
+    assert list(records.keys()) == wf_ids
+    for i, wf_id in enumerate(wf_ids):
+        status, inputs = records[wf_id]
+        assert status["workflow_uuid"] == wf_id
+        assert status["status"] == WorkflowStatusString.PENDING.value
+        assert status["name"] == test_workflow.__qualname__
+        assert status["queue_name"] == queue.name
+        assert inputs is not None
+        assert list(inputs["args"]) == [f"arg{i}"]
+        assert inputs["kwargs"] == {"n": i}
+    # Only the workflows still ENQUEUED are claimed by this executor
+    assert records[wf_ids[0]][0]["executor_id"] == "test-executor"
+    assert records[wf_ids[1]][0]["executor_id"] != "test-executor"
+    assert records[wf_ids[2]][0]["executor_id"] == "test-executor"
+
+    # All of them are marked as started, so they are not dequeued again
+    with dbos._sys_db.engine.begin() as c:
+        rows = c.execute(
+            sa.select(
+                SystemSchema.workflow_queue.c.started_at_epoch_ms,
+                SystemSchema.workflow_queue.c.executor_id,
+            ).where(SystemSchema.workflow_queue.c.workflow_uuid.in_(wf_ids))
+        ).fetchall()
+    assert len(rows) == 3
+    for row in rows:
+        assert row[0] is not None
+        assert row[1] == "test-executor"
+    assert dbos._sys_db.start_queued_workflows(queue, "test-executor") == {}
+
+
+def test_enqueue_workflows_in_order(dbos: DBOS) -> None:
+    @DBOS.workflow()
+    def test_workflow(var: str) -> str:
+        return var
+
+    queue = Queue("test_enqueue_order_queue")
+    # Unregister the queue so the workflows stay enqueued
+    del dbos._registry.queue_info_map[queue.name]
+
+    wf_ids = [str(uuid.uuid4()) for _ in range(10)]
+    enqueue_workflows(
+        dbos, queue.name, [(test_workflow, id, (id,), {}) for id in wf_ids]
+    )
+
+    # Workflows enqueued together are dequeued in the order given
+    with dbos._sys_db.engine.begin() as c:
+        rows = c.execute(
+            sa.select(
+                SystemSchema.workflow_queue.c.workflow_uuid,
+                SystemSchema.workflow_queue.c.created_at_epoch_ms,
+            )
+            .where(SystemSchema.workflow_queue.c.queue_name == queue.name)
+            .order_by(SystemSchema.workflow_queue.c.created_at_epoch_ms)
+        ).fetchall()
+    assert [row[0] for row in rows] == wf_ids
+    created_at = [row[1] for row in rows]
+    assert created_at == sorted(set(created_at))
+    records = dbos._sys_db.start_queued_workflows(queue, "test-executor")
+    assert list(records.keys()) == wf_ids
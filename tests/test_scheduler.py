@@ -1,12 +1,24 @@
+import threading
 import time
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from typing import Callable
 
 import pytest
+import sqlalchemy as sa
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 
 # Public API
-from dbos import DBOS
+from dbos import DBOS, ConfigFile
+from dbos._schemas.system_database import SystemSchema
+
+
+def wait_until(condition: Callable[[], bool], max_tries: int = 10) -> bool:
+    for _ in range(max_tries):
+        if condition():
+            return True
+        time.sleep(1)
+    return condition()
 
 
 def simulate_db_restart(engine: Engine, downtime: float) -> None:
@@ -264,3 +276,121 @@ def my_function():
     # Use exec to run the code and catch the expected exception
     with pytest.raises(ValueError, match="Invalid crontab"):
         exec(code)
+
+
+def test_many_schedules_one_thread(dbos: DBOS) -> None:
+    counters: dict[int, int] = {}
+    threads_before = threading.active_count()
+
+    def make_workflow(i: int) -> None:
+        def test_workflow(scheduled: datetime, actual: datetime) -> None:
+            counters[i] = counters.get(i, 0) + 1
+
+        test_workflow.__qualname__ = f"test_workflow_{i}"
+        DBOS.scheduled("* * * * * *")(DBOS.workflow()(test_workflow))
+
+    for i in range(20):
+        make_workflow(i)
+
+    # All schedules are fired by the single scheduler thread
+    assert dbos._registry.scheduler is not None
+    assert threading.active_count() <= threads_before + 1
+
+    time.sleep(4)
+    assert len(counters) == 20
+    for count in counters.values():
+        assert count > 2 and count <= 4
+
+
+def test_scheduler_catch_up(dbos: DBOS) -> None:
+    caught_up: dict[str, int] = {"skip": 0, "latest": 0, "all": 0}
+    start_time = datetime.now(timezone.utc)
+
+    def record(policy: str, scheduled: datetime) -> None:
+        if scheduled < start_time:
+            caught_up[policy] += 1
+
+    @DBOS.workflow()
+    def skip_workflow(scheduled: datetime, actual: datetime) -> None:
+        record("skip", scheduled)
+
+    @DBOS.workflow()
+    def latest_workflow(scheduled: datetime, actual: datetime) -> None:
+        record("latest", scheduled)
+
+    @DBOS.workflow()
+    def all_workflow(scheduled: datetime, actual: datetime) -> None:
+        record("all", scheduled)
+
+    # Simulate all three functions having last run a minute ago
+    last_run_time = int((start_time - timedelta(minutes=1)).timestamp() * 1000)
+    names = [
+        skip_workflow.__qualname__,
+        latest_workflow.__qualname__,
+        all_workflow.__qualname__,
+    ]
+    dbos._sys_db.update_scheduler_state({name: last_run_time for name in names})
+
+    DBOS.scheduled("* * * * * *", catch_up="skip")(skip_workflow)
+    DBOS.scheduled("* * * * * *", catch_up="latest")(latest_workflow)
+    DBOS.scheduled("* * * * * *", catch_up="all", catch_up_limit=5)(all_workflow)
+
+    expected = {"skip": 0, "latest": 1, "all": 5}
+    assert wait_until(lambda: caught_up == expected)
+    time.sleep(1)
+    assert caught_up == expected
+
+    # Each firing advances the recorded last run time
+    state = dbos._sys_db.get_scheduler_state(names)
+    assert len(state) == 3
+    for name in names:
+        assert state[name] > int(start_time.timestamp() * 1000)
+
+    with pytest.raises(ValueError, match="Invalid catch-up policy"):
+        DBOS.scheduled("* * * * * *", catch_up="never")(all_workflow)  # type: ignore
+
+
+def test_scheduler_leader_election(
+    config: ConfigFile, cleanup_test_databases: None
+) -> None:
+    scheduled_times: list[datetime] = []
+
+    config["runtimeConfig"]["scheduler_leader_election"] = True
+    config["runtimeConfig"]["scheduler_lease_secs"] = 1.5
+    DBOS.destroy(destroy_registry=True)
+    dbos = DBOS(config=config)
+
+    @DBOS.scheduled("* * * * * *")
+    @DBOS.workflow()
+    def test_workflow(scheduled: datetime, actual: datetime) -> None:
+        scheduled_times.append(scheduled)
+
+    DBOS.launch()
+    assert wait_until(lambda: len(scheduled_times) >= 1)
+
+    # Another executor takes over the lease, so this one stands by
+    with dbos._sys_db.engine.begin() as c:
+        c.execute(
+            sa.update(SystemSchema.scheduler_lease).values(
+                owner="other-executor",
+                expires_at_epoch_ms=int(time.time() * 1000) + 60000,
+            )
+        )
+    # The lease is checked every 0.5 seconds
+    standby_time = datetime.now(timezone.utc) + timedelta(seconds=1)
+    time.sleep(3)
+    assert all(t < standby_time for t in scheduled_times)
+
+    # Once the other executor gives up the lease, this one takes over
+    dbos._sys_db.release_scheduler_lease("other-executor")
+    assert wait_until(lambda: any(t > standby_time for t in scheduled_times))
+    scheduler = dbos._registry.scheduler
+    assert scheduler is not None and scheduler._is_leader
+    assert not dbos._sys_db.acquire_scheduler_lease("other-executor", 60)
+
+    # Stopping gives up the lease, so another executor can take it at once
+    sys_db = dbos._sys_db
+    for event in dbos.stop_events:
+        event.set()
+    assert sys_db.acquire_scheduler_lease("other-executor", 60)
+    DBOS.destroy(destroy_registry=True)
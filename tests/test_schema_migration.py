@@ -1,5 +1,6 @@
 import os
 import re
+import uuid
 
 import pytest
 import sqlalchemy as sa
@@ -7,7 +8,7 @@ from alembic import command
 from alembic.config import Config
 
 # Public API
-from dbos import DBOS, ConfigFile
+from dbos import DBOS, ConfigFile, SetWorkflowID
 
 # Private API because this is a unit test
 from dbos._schemas.system_database import SystemSchema
@@ -142,3 +143,102 @@ def test_reset(config: ConfigFile, postgres_db_engine: sa.Engine) -> None:
     # Verify that resetting after launch throws
     with pytest.raises(AssertionError):
         DBOS.reset_system_database()
+
+
+def test_colocated_system_tables(
+    config: ConfigFile, cleanup_test_databases: None
+) -> None:
+    config["database"]["sys_db_in_app_db"] = True
+    DBOS.destroy(destroy_registry=True)
+    dbos = DBOS(config=config)
+
+    @DBOS.transaction()
+    def test_transaction(var: str) -> str:
+        rows = DBOS.sql_session.execute(sa.text("SELECT 1")).fetchall()
+        return var + str(rows[0][0])
+
+    @DBOS.transaction()
+    def test_transaction_error(var: str) -> str:
+        raise Exception(var)
+
+    @DBOS.step()
+    def test_step(var: str) -> str:
+        return var + "2"
+
+    @DBOS.workflow()
+    def test_workflow(var: str) -> str:
+        return test_step(test_transaction(var))
+
+    DBOS.launch()
+
+    # The system tables live in the application database and share its pool
+    assert dbos._sys_db.engine is dbos._app_db.engine
+    assert dbos._sys_db.engine.url.database == config["database"]["app_db_name"]
+    with dbos._app_db.engine.connect() as c:
+        assert c.execute(sa.text("SELECT to_regclass('dbos.alembic_version')")).scalar()
+        assert not c.execute(
+            sa.text("SELECT to_regclass('public.alembic_version')")
+        ).scalar()
+
+    assert test_workflow("bob") == "bob12"
+
+    # A single-transaction workflow commits its status and inputs with its output
+    wfid = str(uuid.uuid4())
+    with SetWorkflowID(wfid):
+        assert test_transaction("alice") == "alice1"
+    assert wfid not in dbos._sys_db._workflow_inputs_buffer
+    assert wfid not in dbos._sys_db._workflow_status_buffer
+    with dbos._app_db.engine.connect() as c:
+        row = c.execute(
+            sa.select(SystemSchema.workflow_status.c.status).where(
+                SystemSchema.workflow_status.c.workflow_uuid == wfid
+            )
+        ).fetchone()
+        assert row is not None and row[0] == "SUCCESS"
+        assert dbos._sys_db.get_workflow_inputs(wfid) == {
+            "args": ("alice",),
+            "kwargs": {},
+        }
+
+    # Replaying it keeps the recorded result
+    with SetWorkflowID(wfid):
+        assert test_transaction("alice") == "alice1"
+    assert DBOS.retrieve_workflow(wfid).get_result() == "alice1"
+
+    # A failed one falls back to buffering its inputs
+    errid = str(uuid.uuid4())
+    with SetWorkflowID(errid):
+        with pytest.raises(Exception) as exc_info:
+            test_transaction_error("carol")
+        assert "carol" in str(exc_info.value)
+    dbos._sys_db.wait_for_buffer_flush()
+    assert DBOS.get_workflow_status(errid).status == "ERROR"  # type: ignore
+    assert dbos._sys_db.get_workflow_inputs(errid) is not None
+
+    # Resetting drops only the system tables
+    DBOS.destroy()
+    dbos = DBOS(config=config)
+    DBOS.reset_system_database()
+    engine = sa.create_engine(
+        sa.URL.create(
+            "postgresql+psycopg",
+            username=config["database"]["username"],
+            password=config["database"]["password"],
+            host=config["database"]["hostname"],
+            port=config["database"]["port"],
+            database=config["database"]["app_db_name"],
+        )
+    )
+    with engine.connect() as c:
+        assert not c.execute(
+            sa.text("SELECT to_regclass('dbos.workflow_status')")
+        ).scalar()
+        assert c.execute(
+            sa.text("SELECT to_regclass('dbos.transaction_outputs')")
+        ).scalar()
+    engine.dispose()
+
+    DBOS.launch()
+    with dbos._sys_db.engine.connect() as c:
+        assert c.execute(SystemSchema.workflow_status.select()).fetchall() == []
+    DBOS.destroy(destroy_registry=True)
@@ -2,6 +2,10 @@ import threading
 import time
 import uuid
 from datetime import datetime, timedelta, timezone
+from typing import cast
+
+import pytest
+import sqlalchemy as sa
 
 # Public API
 from dbos import (
@@ -12,6 +16,10 @@ from dbos import (
     WorkflowStatusString,
     _workflow_commands,
 )
+from dbos._error import DBOSWorkflowCancelledError
+from dbos._metrics import dbos_metrics
+from dbos._status_cache import WorkflowStatusCache
+from dbos._sys_db import WorkflowStatusInternal
 
 
 def test_basic(dbos: DBOS, config: ConfigFile) -> None:
@@ -143,3 +151,167 @@ def test_two_transactions_cancel(dbos: DBOS, config: ConfigFile) -> None:
     assert (
         tr_completed == 2
     ), f"Expected steps_completed to be 2, but got {tr_completed}"
+
+
+def test_resume_completed_workflow(dbos: DBOS) -> None:
+
+    @DBOS.workflow()
+    def simple_workflow() -> str:
+        return "done"
+
+    wfuuid = str(uuid.uuid4())
+    with SetWorkflowID(wfuuid):
+        assert simple_workflow() == "done"
+    dbos._sys_db.wait_for_buffer_flush()
+
+    # Resuming a completed workflow leaves its status untouched
+    dbos.resume_workflow(wfuuid)
+    status = dbos.get_workflow_status(wfuuid)
+    assert status is not None
+    assert status.status == WorkflowStatusString.SUCCESS.value
+
+    # Cancelling and resuming a nonexistent workflow does nothing
+    dbos._sys_db.cancel_workflow(str(uuid.uuid4()))
+    dbos._sys_db.resume_workflow(str(uuid.uuid4()))
+
+
+def test_terminal_status_cache(dbos: DBOS) -> None:
+
+    @DBOS.workflow()
+    def simple_workflow() -> str:
+        return "done"
+
+    wfuuid = str(uuid.uuid4())
+    with SetWorkflowID(wfuuid):
+        assert simple_workflow() == "done"
+    dbos._sys_db.wait_for_buffer_flush()
+
+    # Once a workflow completes, its status is served from the cache.
+    # The cache is used once the notification listener is connected.
+    cache = dbos._sys_db._status_cache
+    deadline = time.time() + 5
+    while not cache.enabled and time.time() < deadline:
+        time.sleep(0.1)
+    hits = dbos_metrics.status_cache_hits.collect().get((), 0)
+    for _ in range(3):
+        status = dbos.get_workflow_status(wfuuid)
+        assert status is not None
+        assert status.status == WorkflowStatusString.SUCCESS.value
+    assert dbos_metrics.status_cache_hits.collect()[()] == hits + 2
+
+    # This process's own writes invalidate the cached status
+    dbos.cancel_workflow(wfuuid)
+    status = dbos.get_workflow_status(wfuuid)
+    assert status is not None
+    assert status.status == WorkflowStatusString.CANCELLED.value
+
+    # So do notifications of other processes' writes
+    with dbos._sys_db.engine.begin() as c:
+        c.execute(
+            sa.text(
+                "UPDATE dbos.workflow_status SET status = 'ERROR' WHERE workflow_uuid = :id"
+            ),
+            {"id": wfuuid},
+        )
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        status = dbos.get_workflow_status(wfuuid)
+        assert status is not None
+        if status.status == WorkflowStatusString.ERROR.value:
+            break
+        time.sleep(0.1)
+    assert status.status == WorkflowStatusString.ERROR.value
+
+
+def test_status_cache_invalidation() -> None:
+    cache = WorkflowStatusCache(max_entries=2, ttl_secs=60)
+    cache.set_active(True)
+
+    def success(workflow_id: str) -> WorkflowStatusInternal:
+        return cast(
+            WorkflowStatusInternal,
+            {
+                "workflow_uuid": workflow_id,
+                "status": WorkflowStatusString.SUCCESS.value,
+            },
+        )
+
+    # A read overlapping a write to another workflow is cached
+    version = cache.version
+    cache.invalidate("other")
+    cache.put(success("a"), version)
+    assert cache.get("a") is not None
+
+    # A read overlapping a write to the same workflow is not
+    version = cache.version
+    cache.invalidate("b")
+    cache.put(success("b"), version)
+    assert cache.get("b") is None
+
+    # Nor is one older than the invalidations still remembered
+    version = cache.version
+    for workflow_id in ["c", "d", "e"]:
+        cache.invalidate(workflow_id)
+    cache.put(success("c"), version)
+    assert cache.get("c") is None
+
+
+def test_cancel_from_other_process(dbos: DBOS) -> None:
+    steps_completed = 0
+    step_event = threading.Event()
+    main_event = threading.Event()
+
+    @DBOS.step()
+    def step() -> None:
+        nonlocal steps_completed
+        steps_completed += 1
+
+    @DBOS.workflow()
+    def simple_workflow() -> None:
+        step()
+        main_event.set()
+        step_event.wait()
+        step()
+
+    def cancel_in_db(workflow_id: str) -> None:
+        # Cancel the workflow the way another process would, without this process's registry
+        with dbos._sys_db.engine.begin() as c:
+            c.execute(
+                sa.text(
+                    "UPDATE dbos.workflow_status SET status = 'CANCELLED' WHERE workflow_uuid = :id"
+                ),
+                {"id": workflow_id},
+            )
+
+    # The cancellation is delivered by notification before the next step
+    handle = dbos.start_workflow(simple_workflow)
+    main_event.wait()
+    cancel_in_db(handle.workflow_id)
+    deadline = time.time() + 5
+    while not dbos._registry.is_workflow_cancelled(handle.workflow_id):
+        assert time.time() < deadline
+        time.sleep(0.1)
+    step_event.set()
+    with pytest.raises(DBOSWorkflowCancelledError):
+        handle.get_result()
+    assert steps_completed == 1
+
+    # Without the notification, the step checks the database once the interval has passed
+    dbos._sys_db.workflow_cancellation_callback = None
+    dbos._cancellation_check_interval_secs = 0
+    steps_completed = 0
+    step_event.clear()
+    main_event.clear()
+    handle = dbos.start_workflow(simple_workflow)
+    main_event.wait()
+    cancel_in_db(handle.workflow_id)
+    step_event.set()
+    with pytest.raises(DBOSWorkflowCancelledError):
+        handle.get_result()
+    assert steps_completed == 1
+    # The cancellation is forgotten once the workflow is no longer running here
+    assert not dbos._registry.is_workflow_cancelled(handle.workflow_id)
+
+    # Cancellations of workflows not running in this process are not tracked
+    dbos._registry.set_workflow_cancelled(str(uuid.uuid4()), True)
+    assert len(dbos._registry.workflow_cancelled_map) == 0